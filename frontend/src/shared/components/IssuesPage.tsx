@@ -42,8 +42,15 @@ export default function IssuesPage() {
     loadTickets();
   }, []);
 
-  const handleViewTicket = (ticket: any) => {
-    setSelectedTicket(ticket);
+  const handleViewTicket = async (ticket: any) => {
+    try {
+      // List rows omit comments; fetch full ticket details with comments
+      const res = await fetch(`${API_URL}/support-tickets/${ticket.id}/`, { headers: authHeaders() });
+      setSelectedTicket(res.ok ? await res.json() : ticket);
+    } catch (error) {
+      // Fallback to basic ticket data
+      setSelectedTicket(ticket);
+    }
     setShowTicketDialog(true);
   };
 
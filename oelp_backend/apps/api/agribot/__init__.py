@@ -0,0 +1 @@
+"""Agribot: farm context, prompt building and AI provider access for AgribotView."""
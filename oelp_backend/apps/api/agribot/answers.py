@@ -0,0 +1,48 @@
+"""
+Cache of Agribot answers to general questions.
+
+Advice such as "tips for growing wheat" does not depend on who asks, so the
+answer is generated without farm data and shared by every user of the worker.
+Questions about the asker's own farm are never cached.
+"""
+from __future__ import annotations
+
+import re
+from typing import Optional, Tuple
+
+from django.conf import settings
+
+from apps.utils.cache_utils import LRUTTLCache
+
+from .intent import FARM_SPECIFIC
+
+answer_cache = LRUTTLCache(
+    maxsize=getattr(settings, "AGRIBOT_ANSWER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "AGRIBOT_ANSWER_CACHE_TTL", 3600),
+)
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_question(message: str) -> str:
+    """Lower-cased, punctuation-free, single-spaced form of ``message``."""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", message.lower())).strip()
+
+
+def answer_key(message: str, intent: str) -> Tuple[bool, str]:
+    """(needs farm context, normalized question); ``intent`` comes from the intent router."""
+    return intent == FARM_SPECIFIC, normalize_question(message)
+
+
+def cached_answer(key: Tuple[bool, str]) -> Optional[str]:
+    needs_context, _ = key
+    if needs_context:
+        return None
+    return answer_cache.get(key)
+
+
+def remember_answer(key: Tuple[bool, str], text: str) -> None:
+    needs_context, _ = key
+    if not needs_context:
+        answer_cache.set(key, text)
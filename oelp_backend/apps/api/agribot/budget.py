@@ -0,0 +1,123 @@
+"""
+Token-budgeted rendering of the farm context for one question.
+
+The farmer/plan/totals header is always sent. Field blocks and catalog crop
+names are then ranked by how much the question mentions them (field names,
+crops, varieties, soil types, irrigation methods, farms, locations) and
+added greedily while they fit in AGRIBOT_CONTEXT_TOKEN_BUDGET. Tokens are
+estimated at four characters each, which is close enough for the Llama and
+GPT tokenizers on English text and needs no tokenizer at runtime.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+
+from .prompts import build_system_prompt, render_field, render_header
+
+CHARS_PER_TOKEN = 4
+
+# How much a question mentioning a field attribute raises that field's rank
+FIELD_WEIGHTS = {
+    "name": 5.0,
+    "crop": 3.0,
+    "crop_variety": 3.0,
+    "soil_type": 2.0,
+    "irrigation_method": 2.0,
+    "farm": 1.0,
+    "location": 1.0,
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _terms(text) -> FrozenSet[str]:
+    """Words of ``text``, with a plural "s" dropped so "tomatoes" meets "tomato"."""
+    words = set(_WORD.findall(str(text or "").lower()))
+    for word in list(words):
+        if len(word) > 3 and word.endswith("s"):
+            words.add(word[:-1])
+            if word.endswith("es"):
+                words.add(word[:-2])
+    return frozenset(words)
+
+
+def _mentions(value, question: FrozenSet[str]) -> float:
+    """1 when every word of ``value`` is in the question, a fraction for a partial match."""
+    words = set(_WORD.findall(str(value or "").lower()))
+    if not words:
+        return 0.0
+    found = len(words & question)
+    return 1.0 if found == len(words) else 0.25 * found / len(words)
+
+
+def field_relevance(field: Dict, question: FrozenSet[str]) -> float:
+    return sum(weight * _mentions(field.get(attr), question) for attr, weight in FIELD_WEIGHTS.items())
+
+
+def rank_fields(fields: List[Dict], question: FrozenSet[str]) -> List[Dict]:
+    """Most relevant first; ties keep active fields ahead, then the stored order."""
+    order = sorted(
+        range(len(fields)),
+        key=lambda i: (-field_relevance(fields[i], question), not fields[i].get("is_active"), i),
+    )
+    return [fields[i] for i in order]
+
+
+def rank_crops(farm_data: Dict, question: FrozenSet[str]) -> List[str]:
+    """Catalog crops the question names, then the ones being grown, then the rest."""
+    growing = set(farm_data["crops_growing"])
+    crops = farm_data["all_available_crops"]
+    order = sorted(
+        range(len(crops)),
+        key=lambda i: (-_mentions(crops[i], question), crops[i] not in growing, i),
+    )
+    return [crops[i] for i in order]
+
+
+def build_context(farm_data: Dict, question: str, budget: Optional[int] = None) -> Tuple[str, int]:
+    """
+    The farm-specific system prompt for ``question`` and the number of tokens
+    its farm context used (at most ``budget`` unless the header alone is larger).
+    """
+    if budget is None:
+        budget = getattr(settings, "AGRIBOT_CONTEXT_TOKEN_BUDGET", 1200)
+    terms = _terms(question)
+    fields = farm_data["fields"]
+    used = estimate_tokens(render_header(farm_data, []))
+    # Room for the "N fields not shown" line, in case not every field fits
+    note = f"\n({len(fields)} less relevant fields not shown)\n"
+    reserved = estimate_tokens(note)
+
+    # Fields first: they answer most farm questions. Greedy, so a large block
+    # that does not fit leaves room for smaller ones after it.
+    blocks = []
+    for field in rank_fields(fields, terms):
+        block = render_field(len(blocks) + 1, field)
+        cost = estimate_tokens(block)
+        if used + cost + reserved <= budget:
+            blocks.append(block)
+            used += cost
+
+    crops = []
+    for crop in rank_crops(farm_data, terms):
+        cost = estimate_tokens(f"{crop}, ")
+        if used + cost + reserved > budget:
+            break
+        crops.append(crop)
+        used += cost
+
+    user_context = render_header(farm_data, crops) + "".join(blocks)
+    if not fields:
+        user_context += "No fields registered yet.\n"
+    elif len(blocks) < len(fields):
+        note = f"\n({len(fields) - len(blocks)} less relevant fields not shown)\n"
+        user_context += note
+        used += estimate_tokens(note)
+    return build_system_prompt(farm_data, user_context), used
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import logging
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from apps.models_app.crop_variety import Crop
+from apps.models_app.farm import Farm
+from apps.models_app.field import CropLifecycleDates, Field, FieldIrrigationMethod
+from apps.models_app.user_plan import UserPlan
+
+logger = logging.getLogger(__name__)
+
+CROP_CATALOG_KEY = "agribot-crop-catalog"
+# Part of every context key, so a crop catalog change retires all cached contexts at once
+CROP_CATALOG_VERSION_KEY = "agribot-crop-catalog-version"
+
+
+def _catalog_version() -> int:
+    version = cache.get(CROP_CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CROP_CATALOG_VERSION_KEY, 1, None)
+        version = cache.get(CROP_CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def _context_key(user_id) -> str:
+    return f"agribot-context:{_catalog_version()}:{user_id}"
+
+
+def _subscription_key(user_id) -> str:
+    return f"agribot-subscription:{user_id}"
+
+
+def _context_ttl() -> int:
+    return getattr(settings, "AGRIBOT_CONTEXT_CACHE_TTL", 900)
+
+
+def subscription_snapshot(user) -> Dict:
+    """Plain-data view of the user's active plan (the same rules as get_user_subscription_features)."""
+    active_plan = (
+        UserPlan.objects.filter(user=user, is_active=True, expire_at__gt=timezone.now())
+        .select_related("plan")
+        .order_by("-created_at")
+        .first()
+    )
+    if not active_plan:
+        return {"plan_name": "Free", "plan_type": "free", "features": ["Basic Reports"], "user_plan_id": None, "expire_at": None}
+    plan = active_plan.plan
+    features = list(plan.plan_features.values_list("feature__name", flat=True))
+    return {
+        "plan_name": plan.name,
+        "plan_type": plan.type,
+        "features": features,
+        "user_plan_id": active_plan.pk,
+        "expire_at": active_plan.expire_at,
+    }
+
+
+def _timeout_for(subscription: Dict) -> int:
+    """Cache timeout that also ends when the active plan expires."""
+    timeout = _context_ttl()
+    expire_at = subscription.get("expire_at")
+    if expire_at is not None:
+        timeout = max(1, min(timeout, int((expire_at - timezone.now()).total_seconds())))
+    return timeout
+
+
+def get_subscription(user) -> Dict:
+    """
+    Cached ``subscription_snapshot``: what every Agribot turn needs, without
+    building the farm context that only farm-specific questions use.
+    """
+    key = _subscription_key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = subscription_snapshot(user)
+        cache.set(key, data, _timeout_for(data))
+    return data
+
+
+def crop_catalog() -> List[str]:
+    """Every crop name; shared by all users and dropped when a crop changes."""
+    names = cache.get(CROP_CATALOG_KEY)
+    if names is None:
+        names = list(Crop.objects.order_by("id").values_list("name", flat=True).distinct())
+        cache.set(CROP_CATALOG_KEY, names, _context_ttl())
+    return names
+
+
+def build_farm_context(user) -> Dict:
+    """
+    The farm data Agribot answers from, read in a fixed number of queries
+    (irrigation methods and lifecycles are prefetched rather than queried per field).
+    """
+    fields = (
+        Field.objects.filter(user=user)
+        .select_related("farm", "crop", "crop_variety", "soil_type")
+        .prefetch_related(
+            Prefetch(
+                "fieldirrigationmethod_set",
+                queryset=FieldIrrigationMethod.objects.select_related("irrigation_method").order_by("id"),
+                to_attr="prefetched_irrigation_methods",
+            ),
+            Prefetch(
+                "croplifecycledates_set",
+                queryset=CropLifecycleDates.objects.order_by("-id"),
+                to_attr="prefetched_lifecycles",
+            ),
+        )
+        .order_by("id")
+    )
+    fields_data = []
+    total_acres = 0
+    crops_list: List[str] = []
+    for field in fields:
+        fim = field.prefetched_irrigation_methods[0] if field.prefetched_irrigation_methods else None
+        lifecycle = field.prefetched_lifecycles[0] if field.prefetched_lifecycles else None
+        size_acres = None
+        hectares = (field.area or {}).get("hectares") if isinstance(field.area, dict) else None
+        if isinstance(hectares, (int, float)):
+            size_acres = round(float(hectares) * 2.47105, 4)
+            total_acres += size_acres
+        fields_data.append({
+            "name": field.name,
+            "farm": field.farm.name if field.farm else None,
+            "crop": field.crop.name if field.crop else None,
+            "crop_variety": field.crop_variety.name if field.crop_variety else None,
+            "soil_type": field.soil_type.name if field.soil_type else None,
+            "irrigation_method": fim.irrigation_method.name if fim and fim.irrigation_method else None,
+            "size_acres": size_acres,
+            "location": field.location_name,
+            "is_active": field.is_active,
+            "sowing_date": str(lifecycle.sowing_date) if lifecycle and lifecycle.sowing_date else None,
+            "harvesting_date": str(lifecycle.harvesting_date) if lifecycle and lifecycle.harvesting_date else None,
+        })
+        # Collect unique crops (only if crop is assigned)
+        if field.crop and field.crop.name and field.crop.name not in crops_list:
+            crops_list.append(field.crop.name)
+
+    return {
+        "user": {"name": user.full_name or user.username or "User", "email": user.email},
+        "subscription": subscription_snapshot(user),
+        "farms": list(Farm.objects.filter(user=user).values("id", "name")),
+        "fields": fields_data,
+        "total_acres": round(total_acres, 2),
+        "crops_growing": crops_list,
+        "all_available_crops": crop_catalog(),
+        "total_fields": len(fields_data),
+        "active_fields": len([f for f in fields_data if f.get("is_active")]),
+    }
+
+
+def _empty_context(user) -> Dict:
+    return {
+        "user": {"name": user.full_name or user.username or "User", "email": getattr(user, "email", "")},
+        "subscription": {"plan_name": "Free", "plan_type": "free", "features": [], "user_plan_id": None, "expire_at": None},
+        "farms": [],
+        "fields": [],
+        "total_acres": 0,
+        "crops_growing": [],
+        "all_available_crops": [],
+        "total_fields": 0,
+        "active_fields": 0,
+    }
+
+
+def get_farm_context(user) -> Dict:
+    """
+    Cached farm context for ``user`` (the prompt is rendered per question by
+    ``budget.build_context``). Kept until a signal drops it, the TTL passes or the active plan expires.
+    """
+    key = _context_key(user.pk)
+    data = cache.get(key)
+    if data is not None:
+        return data
+    try:
+        data = build_farm_context(user)
+    except Exception:
+        logger.exception("Error fetching user farm data")
+        # Don't crash and don't cache: let the AI answer without farm data
+        data = _empty_context(user)
+        try:
+            data["subscription"] = subscription_snapshot(user)
+        except Exception:
+            pass
+        return data
+    cache.set(key, data, _timeout_for(data["subscription"]))
+    return data
+
+
+def invalidate_farm_context(*user_ids) -> None:
+    user_ids = {uid for uid in user_ids if uid is not None}
+    keys = [_context_key(uid) for uid in user_ids] + [_subscription_key(uid) for uid in user_ids]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_crop_catalog() -> None:
+    cache.delete(CROP_CATALOG_KEY)
+    try:
+        cache.incr(CROP_CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CROP_CATALOG_VERSION_KEY, 2, None)
@@ -0,0 +1,108 @@
+"""
+Local intent router for Agribot messages.
+
+Sorts a message into off-topic, farm-specific (the answer needs the asker's
+farm data) or general (advice anyone could be given). Term lists are compiled
+into two word-boundary regexes once, at import; classifying a message is two
+regex scans plus a sum. ``intent_benchmark.jsonl`` next to this module is the
+labeled set (``manage.py benchmark_agribot_intents`` reports accuracy).
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Tuple
+
+OFF_TOPIC = "off_topic"
+FARM_SPECIFIC = "farm_specific"
+GENERAL = "general"
+
+# Agricultural vocabulary -> weight towards "on topic". A message is on topic
+# once the weights of its distinct terms add up to ON_TOPIC_SCORE; weak terms
+# ("type", "water", "plan") only count together with something else, and the
+# negative phrases cancel a farming word used in another sense ("power plant").
+TOPIC_TERMS: Dict[str, float] = {
+    **dict.fromkeys([
+        "farm", "farming", "farmer", "crop", "field", "soil", "irrigation", "irrigate", "harvest",
+        "harvesting", "sowing", "sow", "agriculture", "agricultural", "agri", "agribot", "fertilizer",
+        "fertiliser", "manure", "compost", "pest", "pesticide", "disease", "yield", "acre", "hectare",
+        "cultivation", "cultivate", "plant", "planting", "watering", "livestock", "cattle", "poultry",
+        "cotton", "wheat", "rice", "paddy", "corn", "maize", "vegetable", "fruit", "grain", "seed",
+        "seedling", "grow", "growing", "tomato", "potato", "sugarcane", "millet", "pulses", "drip",
+        "sprinkler", "tractor", "weed", "greenhouse", "orchard", "agronomy", "ph", "nitrogen", "npk",
+        "mulch", "weather", "season", "rain", "rainfall", "organic", "variety",
+    ], 1.0),
+    **dict.fromkeys([
+        "type", "suitable", "sustainable", "subscription", "plan", "water", "land",
+    ], 0.5),
+    **dict.fromkeys([
+        "power plant", "visit",
+    ], -1.0),
+}
+
+# Cues that the question is about the asker's own data -> weight towards "farm specific".
+# "I am growing tomatoes, any tips?" has none of them: it is a general question, and
+# so is "how do I grow beans" (a bare "do I" is how advice is asked for; "do I have" is
+# caught by "i have").
+FARM_CUES: Dict[str, float] = {
+    "my": 1.0,
+    "mine": 1.0,
+    "our": 1.0,
+    "ours": 1.0,
+    "am i": 1.0,
+    "have i": 1.0,
+    "did i": 1.0,
+    "i have": 1.0,
+    "i own": 1.0,
+    "subscription": 1.0,
+}
+
+ON_TOPIC_SCORE = 1.0
+FARM_SPECIFIC_SCORE = 1.0
+# A farm cue is itself weak evidence the message is about the platform ("what's my plan?")
+FARM_CUE_TOPIC_WEIGHT = 0.5
+
+
+def _compile(terms) -> "re.Pattern[str]":
+    # Longest first so multi-word cues win over their prefixes; an optional
+    # plural suffix lets "crops"/"tomatoes" match "crop"/"tomato"
+    alternation = "|".join(re.escape(term).replace(r"\ ", r"\s+") for term in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})(?:e?s)?\b", re.IGNORECASE)
+
+
+class IntentRouter:
+    def __init__(self, topic_terms: Dict[str, float], farm_cues: Dict[str, float]):
+        self.topic_terms = {term.lower(): weight for term, weight in topic_terms.items()}
+        self.farm_cues = {cue.lower(): weight for cue, weight in farm_cues.items()}
+        self._topic = _compile(self.topic_terms)
+        self._cues = _compile(self.farm_cues)
+
+    @staticmethod
+    def _weight(match: str, weights: Dict[str, float]) -> float:
+        term = " ".join(match.lower().split())
+        if term in weights:
+            return weights[term]
+        for suffix in ("es", "s"):
+            if term.endswith(suffix) and term[: -len(suffix)] in weights:
+                return weights[term[: -len(suffix)]]
+        return 0.0
+
+    def scores(self, message: str) -> Tuple[float, float]:
+        """(topic score, farm-specific score) of ``message``; each distinct term counts once."""
+        topic = sum(self._weight(m, self.topic_terms) for m in {m.lower() for m in self._topic.findall(message)})
+        farm = sum(self._weight(m, self.farm_cues) for m in {m.lower() for m in self._cues.findall(message)})
+        return topic, farm
+
+    def classify(self, message: str) -> str:
+        topic, farm = self.scores(message)
+        if farm >= FARM_SPECIFIC_SCORE:
+            topic += FARM_CUE_TOPIC_WEIGHT
+        if topic < ON_TOPIC_SCORE:
+            return OFF_TOPIC
+        return FARM_SPECIFIC if farm >= FARM_SPECIFIC_SCORE else GENERAL
+
+
+router = IntentRouter(TOPIC_TERMS, FARM_CUES)
+
+
+def classify(message: str) -> str:
+    return router.classify(message)
@@ -0,0 +1,277 @@
+"""
+AI provider access for Agribot.
+
+Each provider keeps one pooled keep-alive ``requests.Session``. ``dispatch``
+tries the candidate (provider, model) pairs in preference order, hedging: the
+next candidate starts when the previous one fails or has not answered within
+AGRIBOT_HEDGE_DELAY seconds, and the whole call is bounded by
+AGRIBOT_DEADLINE. Models that answer 404/410 or a quota error are skipped for
+AGRIBOT_BREAKER_COOLDOWN seconds (the breaker lives in the cache, so all
+workers share it).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Outcome codes of a single attempt
+OK = "ok"
+UNAVAILABLE = "unavailable"  # 404/410: the model is gone, trip the breaker
+QUOTA = "quota"  # quota/billing error, trip the breaker
+FAILED = "failed"  # anything else; worth trying again on the next request
+
+# Error codes returned to AgribotView (they match the response "error" values)
+CONFIG_ERROR = "config_error"
+QUOTA_EXCEEDED = "quota_exceeded"
+TIMEOUT_ERROR = "timeout_error"
+SERVICE_UNAVAILABLE = "service_unavailable"
+
+MAX_TOKENS = 500
+TEMPERATURE = 0.7
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+class Provider:
+    """One AI API: where it lives, which models to try and how to talk to it."""
+
+    name = ""
+    # Whether the API can send the reply as server-sent events (see agribot/streaming.py)
+    streams = False
+    default_url = ""
+    url_setting = ""
+    models: List[str] = []
+
+    def __init__(self):
+        self._session = None
+        self._lock = threading.Lock()
+
+    def api_key(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def base_url(self) -> str:
+        return _setting(self.url_setting, self.default_url).rstrip("/")
+
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    size = _setting("AGRIBOT_MAX_CONCURRENCY", 8)
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def request(self, model: str, system_prompt: str, message: str) -> Tuple[str, dict]:
+        """The (url, json body) for one completion request."""
+        raise NotImplementedError
+
+    def parse(self, data) -> Optional[str]:
+        """The reply text from a 200 response, or None when it is unusable."""
+        raise NotImplementedError
+
+    def attempt(self, model: str, system_prompt: str, message: str, timeout: float) -> Tuple[str, Optional[str]]:
+        url, body = self.request(model, system_prompt, message)
+        response = self.session().post(
+            url,
+            headers={"Authorization": f"Bearer {self.api_key()}", "Content-Type": "application/json"},
+            json=body,
+            timeout=timeout,
+        )
+        if response.status_code == 200:
+            text = self.parse(response.json())
+            return (OK, text) if text else (FAILED, None)
+        try:
+            data = response.json()
+        except Exception:
+            data = None
+        return self.failure(response.status_code, data), None
+
+    def failure(self, status_code: int, data) -> str:
+        """Outcome code for a non-200 response with JSON body ``data``."""
+        if status_code in (404, 410):
+            return UNAVAILABLE
+        error = data.get("error", "") if isinstance(data, dict) else ""
+        error_msg = error.get("message", "") if isinstance(error, dict) else str(error)
+        if "quota" in error_msg.lower() or "billing" in error_msg.lower():
+            return QUOTA
+        return FAILED
+
+
+class ChatCompletionsProvider(Provider):
+    """OpenAI-style /chat/completions APIs (Groq and OpenAI)."""
+
+    streams = True
+
+    def request(self, model, system_prompt, message):
+        return f"{self.base_url()}/chat/completions", {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": message},
+            ],
+            "max_tokens": MAX_TOKENS,
+            "temperature": TEMPERATURE,
+        }
+
+    def parse(self, data):
+        return data.get("choices", [{}])[0].get("message", {}).get("content", "I'm sorry, I couldn't generate a response.")
+
+
+class GroqProvider(ChatCompletionsProvider):
+    # Free and fast, no credit card required
+    name = "groq"
+    default_url = "https://api.groq.com/openai/v1"
+    url_setting = "AGRIBOT_GROQ_URL"
+    models = ["llama-3.1-8b-instant", "llama-3.2-3b-preview", "mixtral-8x7b-32768"]
+
+    def api_key(self):
+        return os.getenv("GROQ_API_KEY")
+
+
+class HuggingFaceProvider(Provider):
+    name = "huggingface"
+    default_url = "https://api-inference.huggingface.co"
+    url_setting = "AGRIBOT_HUGGINGFACE_URL"
+    models = [
+        "google/flan-t5-large",  # Reliable text generation
+        "microsoft/DialoGPT-large",  # Conversational
+        "facebook/blenderbot-400M-distill",  # Chat model
+    ]
+
+    def api_key(self):
+        return os.getenv("HUGGINGFACE_API_KEY") or os.getenv("HF_API_KEY")
+
+    def request(self, model, system_prompt, message):
+        return f"{self.base_url()}/models/{model}", {
+            "inputs": f"{system_prompt}\n\nUser: {message}\n\nAssistant:",
+            "parameters": {"max_new_tokens": MAX_TOKENS, "temperature": TEMPERATURE, "return_full_text": False},
+        }
+
+    def parse(self, data):
+        # Hugging Face returns generated text
+        if isinstance(data, list) and len(data) > 0:
+            text = data[0].get("generated_text", "").strip()
+        elif isinstance(data, dict):
+            text = data.get("generated_text", "").strip()
+        else:
+            text = str(data).strip()
+        if "Assistant:" in text:
+            text = text.split("Assistant:")[-1].strip()
+        # Too short to be an answer: let the next model try
+        return text if len(text) >= 10 else None
+
+
+class OpenAIProvider(ChatCompletionsProvider):
+    name = "openai"
+    default_url = "https://api.openai.com/v1"
+    url_setting = "AGRIBOT_OPENAI_URL"
+    models = ["gpt-3.5-turbo"]
+
+    def api_key(self):
+        return os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_KEY")
+
+
+# In order of preference: Groq > Hugging Face > OpenAI
+PROVIDERS: List[Provider] = [GroqProvider(), HuggingFaceProvider(), OpenAIProvider()]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_setting("AGRIBOT_MAX_CONCURRENCY", 8), thread_name_prefix="agribot"
+                )
+    return _executor
+
+
+def _breaker_key(provider: Provider, model: str) -> str:
+    return f"agribot-breaker:{provider.name}:{model}"
+
+
+def is_open(provider: Provider, model: str) -> bool:
+    return cache.get(_breaker_key(provider, model)) is not None
+
+
+def trip(provider: Provider, model: str, outcome: str) -> None:
+    cache.set(_breaker_key(provider, model), outcome, _setting("AGRIBOT_BREAKER_COOLDOWN", 600))
+
+
+def candidates() -> List[Tuple[Provider, str]]:
+    """Configured (provider, model) pairs whose breaker is closed, in preference order."""
+    pairs = []
+    for provider in PROVIDERS:
+        if not provider.api_key():
+            continue
+        pairs.extend((provider, model) for model in provider.models if not is_open(provider, model))
+    return pairs
+
+
+def _run(provider: Provider, model: str, system_prompt: str, message: str, timeout: float):
+    try:
+        return provider.attempt(model, system_prompt, message, timeout)
+    except requests.exceptions.Timeout:
+        return FAILED, None
+    except Exception as e:
+        logger.warning("Agribot %s/%s request failed: %s", provider.name, model, e)
+        return FAILED, None
+
+
+def dispatch(system_prompt: str, message: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Ask the providers for a reply. Returns ``(text, None)`` on success or
+    ``(None, error_code)`` once every candidate failed or the deadline passed.
+    """
+    if not any(provider.api_key() for provider in PROVIDERS):
+        return None, CONFIG_ERROR
+    queue = candidates()
+    deadline = time.monotonic() + _setting("AGRIBOT_DEADLINE", 25)
+    hedge_delay = _setting("AGRIBOT_HEDGE_DELAY", 3)
+    executor = _get_executor()
+    pending: Dict = {}
+    next_launch = 0.0
+    quota_hit = False
+
+    while queue or pending:
+        now = time.monotonic()
+        if now >= deadline:
+            return None, TIMEOUT_ERROR
+        if queue and (not pending or now >= next_launch):
+            provider, model = queue.pop(0)
+            future = executor.submit(_run, provider, model, system_prompt, message, deadline - now)
+            pending[future] = (provider, model)
+            next_launch = now + hedge_delay
+            continue
+        wait_for = deadline - now
+        if queue:
+            wait_for = min(wait_for, next_launch - now)
+        done, _ = wait(list(pending), timeout=max(wait_for, 0), return_when=FIRST_COMPLETED)
+        for future in done:
+            provider, model = pending.pop(future)
+            outcome, text = future.result()
+            if outcome == OK:
+                return text, None
+            if outcome in (UNAVAILABLE, QUOTA):
+                trip(provider, model, outcome)
+                quota_hit = quota_hit or outcome == QUOTA
+    return None, QUOTA_EXCEEDED if quota_hit else SERVICE_UNAVAILABLE
@@ -0,0 +1,138 @@
+"""
+Async, token-by-token variant of ``providers.dispatch`` for the SSE endpoint.
+
+Candidates are tried in the same order and share the same circuit breaker,
+but one at a time: once a model has sent its first token the reply is
+committed to it. Waiting on the upstream happens on the event loop, so no
+worker thread is held. APIs that cannot stream (Hugging Face) send their
+whole reply as one chunk.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import weakref
+from typing import AsyncIterator, Dict
+
+import httpx
+from asgiref.sync import sync_to_async
+
+from . import providers
+from .providers import CONFIG_ERROR, FAILED, QUOTA, QUOTA_EXCEEDED, SERVICE_UNAVAILABLE, TIMEOUT_ERROR
+
+# One pooled client per provider and event loop (a client cannot outlive its loop)
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class StreamError(Exception):
+    """No reply could be streamed; ``code`` is one of the providers error codes."""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+class _AttemptFailed(Exception):
+    def __init__(self, outcome: str):
+        super().__init__(outcome)
+        self.outcome = outcome
+
+
+def _client(provider: providers.Provider) -> httpx.AsyncClient:
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(provider.name)
+    if client is None:
+        size = providers._setting("AGRIBOT_MAX_CONCURRENCY", 8)
+        client = clients[provider.name] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=size * 4, max_keepalive_connections=size)
+        )
+    return client
+
+
+async def _within(deadline: float, awaitable):
+    """Await ``awaitable``, giving up with httpx.ReadTimeout once ``deadline`` (loop time) passes."""
+    remaining = deadline - asyncio.get_running_loop().time()
+    if remaining <= 0:
+        raise httpx.ReadTimeout("Agribot deadline passed")
+    try:
+        return await asyncio.wait_for(awaitable, remaining)
+    except asyncio.TimeoutError:
+        raise httpx.ReadTimeout("Agribot deadline passed") from None
+
+
+async def _attempt(provider, model: str, system_prompt: str, message: str, deadline: float) -> AsyncIterator[str]:
+    url, body = provider.request(model, system_prompt, message)
+    if provider.streams:
+        body = {**body, "stream": True}
+    headers = {"Authorization": f"Bearer {provider.api_key()}", "Content-Type": "application/json"}
+    # httpx timeouts apply to each network operation, so a reply that keeps
+    # trickling in would never hit them; every read is bounded by the deadline
+    timeout = deadline - asyncio.get_running_loop().time()
+    async with _client(provider).stream("POST", url, headers=headers, json=body, timeout=timeout) as response:
+        if response.status_code != 200:
+            await _within(deadline, response.aread())
+            try:
+                data = response.json()
+            except Exception:
+                data = None
+            raise _AttemptFailed(provider.failure(response.status_code, data))
+        if not provider.streams:
+            await _within(deadline, response.aread())
+            text = provider.parse(response.json())
+            if not text:
+                raise _AttemptFailed(FAILED)
+            yield text
+            return
+        lines = response.aiter_lines()
+        while True:
+            try:
+                line = await _within(deadline, lines.__anext__())
+            except StopAsyncIteration:
+                break
+            if not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            delta = json.loads(payload).get("choices", [{}])[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+async def stream_reply(system_prompt: str, message: str) -> AsyncIterator[str]:
+    """Yield the reply's text chunks; raises StreamError when none can be produced."""
+    if not any(provider.api_key() for provider in providers.PROVIDERS):
+        raise StreamError(CONFIG_ERROR)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + providers._setting("AGRIBOT_DEADLINE", 25)
+    quota_hit = False
+    for provider, model in await sync_to_async(providers.candidates)():
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        started = False
+        try:
+            async for text in _attempt(provider, model, system_prompt, message, deadline):
+                started = True
+                yield text
+        except _AttemptFailed as failed:
+            if failed.outcome in (providers.UNAVAILABLE, QUOTA):
+                await sync_to_async(providers.trip)(provider, model, failed.outcome)
+                quota_hit = quota_hit or failed.outcome == QUOTA
+            continue
+        except httpx.TimeoutException:
+            if started:
+                raise StreamError(TIMEOUT_ERROR)
+            continue
+        except (httpx.HTTPError, ValueError):
+            # A half-sent reply must not be completed by another model
+            if started:
+                raise StreamError(SERVICE_UNAVAILABLE)
+            continue
+        if started:
+            return
+    if quota_hit:
+        raise StreamError(QUOTA_EXCEEDED)
+    raise StreamError(TIMEOUT_ERROR if loop.time() >= deadline else SERVICE_UNAVAILABLE)
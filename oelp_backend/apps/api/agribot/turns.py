@@ -0,0 +1,142 @@
+"""
+One Agribot chat turn, shared by AgribotView and the streaming endpoint:
+``start_turn`` runs the checks that happen before the AI is asked (plan,
+off-topic, answer cache, top-up quota) and ``finish_turn`` books a successful
+answer.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+
+from apps.models_app.feature import Feature
+from apps.models_app.user_plan import PlanFeatureUsage
+
+from .answers import answer_key, cached_answer, remember_answer
+from .budget import build_context
+from .context import get_farm_context, get_subscription
+from .intent import FARM_SPECIFIC, OFF_TOPIC, classify
+from .prompts import ERROR_REPLIES, GENERAL_SYSTEM_PROMPT, OFF_TOPIC_REPLY
+
+logger = logging.getLogger(__name__)
+
+
+class TurnRejected(Exception):
+    """The turn ends before the AI is asked; ``payload``/``status`` are the response."""
+
+    def __init__(self, payload: Dict, status_code: int = status.HTTP_200_OK):
+        super().__init__(payload.get("error"))
+        self.payload = payload
+        self.status_code = status_code
+
+
+class AgribotTurn:
+    def __init__(self, message: str, key: Tuple[bool, str], system_prompt: str = "",
+                 usage: Optional[PlanFeatureUsage] = None, cached_response: Optional[str] = None,
+                 context_tokens: int = 0):
+        self.message = message
+        self.key = key
+        self.system_prompt = system_prompt
+        self.usage = usage
+        self.cached_response = cached_response
+        # Estimated tokens of farm data in system_prompt (0 for general questions)
+        self.context_tokens = context_tokens
+
+
+def error_reply(error: str) -> Dict:
+    """Response body for a provider error code from ``providers.dispatch``."""
+    return {"response": ERROR_REPLIES.get(error, ERROR_REPLIES["service_unavailable"]), "error": error}
+
+
+def _daily_usage(user_plan_id) -> Optional[PlanFeatureUsage]:
+    """Today's AI prompt counter for a top-up plan; raises TurnRejected once it is used up."""
+    try:
+        ai_feature = Feature.objects.get(name="AI Assistant")
+        usage, created = PlanFeatureUsage.objects.get_or_create(
+            user_plan_id=user_plan_id,
+            feature=ai_feature,
+            defaults={"max_count": 8, "used_count": 0, "duration_days": 1}
+        )
+        # Reset daily count if it's a new day (simplified - check if created today)
+        if created or usage.updated_at.date() < date.today():
+            usage.used_count = 0
+            usage.save()
+    except Feature.DoesNotExist:
+        # Feature doesn't exist, allow but don't track
+        return None
+    except Exception as e:
+        # If tracking fails, still allow but log
+        logger.error(f"Error tracking AI usage: {str(e)}")
+        return None
+    if usage.used_count >= usage.max_count:
+        raise TurnRejected({
+            "detail": f"You have reached your daily limit of {usage.max_count} AI prompts. Please try again tomorrow or upgrade to Enterprise for unlimited access.",
+            "error": "limit_exceeded",
+            "remaining": 0
+        }, status.HTTP_429_TOO_MANY_REQUESTS)
+    return usage
+
+
+def start_turn(user, message: str) -> AgribotTurn:
+    message = (message or "").strip()
+    if not message:
+        raise TurnRejected({"detail": "Message is required"}, status.HTTP_400_BAD_REQUEST)
+
+    # The plan is cached per user and dropped by signals when it changes
+    sub_info = get_subscription(user)
+    plan_name = sub_info.get("plan_name", "Free")
+    plan_type = sub_info.get("plan_type", "free")
+
+    if "AI Assistant" not in sub_info.get("features", []):
+        raise TurnRejected({
+            "detail": "AI Assistant is only available with TopUp or Enterprise plans. Please upgrade your subscription.",
+            "error": "feature_not_available"
+        }, status.HTTP_403_FORBIDDEN)
+
+    intent = classify(message)
+    if intent == OFF_TOPIC:
+        raise TurnRejected({"response": OFF_TOPIC_REPLY, "error": "off_topic"})
+
+    # General questions are answered from the shared answer cache without touching the quota
+    key = answer_key(message, intent)
+    cached = cached_answer(key)
+    if cached is not None:
+        return AgribotTurn(message, key, cached_response=cached)
+
+    # Top-up plans get a few prompts per day; enterprise is unlimited
+    usage = None
+    is_topup = plan_name.lower() == "topupplan" or plan_type == "topup"
+    if is_topup and sub_info.get("user_plan_id"):
+        usage = _daily_usage(sub_info["user_plan_id"])
+
+    # Only farm-specific questions pay for (and send) the farm context
+    context_tokens = 0
+    if intent == FARM_SPECIFIC:
+        system_prompt, context_tokens = build_context(get_farm_context(user), message)
+        logger.debug("Agribot farm context for user %s: %s tokens", user.pk, context_tokens)
+    else:
+        system_prompt = GENERAL_SYSTEM_PROMPT
+    return AgribotTurn(message, key, system_prompt, usage, context_tokens=context_tokens)
+
+
+def finish_turn(turn: AgribotTurn, text: str) -> Optional[int]:
+    """Remember the answer and count it against the quota; returns the prompts left today."""
+    remember_answer(turn.key, text)
+    usage = turn.usage
+    if usage is None:
+        return None
+    # Count in the database, not on the row loaded before the answer was streamed:
+    # concurrent turns would otherwise overwrite each other's increments
+    try:
+        PlanFeatureUsage.objects.filter(pk=usage.pk, used_count__lt=F("max_count")).update(
+            used_count=F("used_count") + 1, updated_at=timezone.now()
+        )
+        usage.refresh_from_db(fields=["used_count", "max_count"])
+    except Exception:
+        logger.exception("Error booking AI usage")
+    return max(usage.max_count - usage.used_count, 0)
@@ -0,0 +1,74 @@
+"""
+Streaming Agribot endpoint. It is an async view: served from the ASGI entry
+point it relays provider tokens as server-sent events without holding a
+worker thread while the upstream generates.
+"""
+from __future__ import annotations
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+
+from apps.api.auth import resolve_token_user, token_from_request
+
+from .streaming import StreamError, stream_reply
+from .turns import TurnRejected, error_reply, finish_turn, start_turn
+
+
+def _event(name: str, data) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _events(turn):
+    if turn.cached_response is not None:
+        yield _event("token", {"text": turn.cached_response})
+        yield _event("done", {"cached": True})
+        return
+    parts = []
+    try:
+        async for text in stream_reply(turn.system_prompt, turn.message):
+            parts.append(text)
+            yield _event("token", {"text": text})
+    except StreamError as failed:
+        # Nothing is booked for a failed or broken-off reply
+        yield _event("error", error_reply(failed.code))
+        return
+    remaining = await sync_to_async(finish_turn)(turn, "".join(parts))
+    yield _event("done", {"remaining": remaining})
+
+
+def _message(request) -> str:
+    if request.content_type == "application/json":
+        try:
+            return str(json.loads(request.body or b"{}").get("message", ""))
+        except (ValueError, AttributeError):
+            return ""
+    return request.POST.get("message", "")
+
+
+async def agribot_stream(request):
+    """
+    POST ``{"message": ...}``; answers with ``token`` events carrying text
+    chunks, then ``done`` (with ``remaining``) or ``error``. Requests that stop
+    before the AI is asked get the same JSON responses as AgribotView.
+    """
+    if request.method != "POST":
+        return JsonResponse({"detail": 'Method "%s" not allowed.' % request.method}, status=405)
+    user = await sync_to_async(resolve_token_user)(token_from_request(request))
+    if user is None or not user.is_active:
+        return JsonResponse({"detail": "Invalid token."}, status=401)
+    try:
+        turn = await sync_to_async(start_turn)(user, _message(request))
+    except TurnRejected as rejected:
+        return JsonResponse(rejected.payload, status=rejected.status_code)
+    return StreamingHttpResponse(
+        _events(turn),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Token-authenticated like the DRF views, so no CSRF check (the decorator does
+# not wrap async views on Django 4.2)
+agribot_stream.csrf_exempt = True
@@ -1,11 +1,58 @@
 from __future__ import annotations
 
+import copy
 from typing import Optional, Tuple
 
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from rest_framework import authentication, exceptions
 
-from apps.models_app.token import UserAuthToken
+from apps.models_app.token import UserAuthToken, token_digest
+from apps.utils.cache_utils import LRUTTLCache
+
+# Resolved tokens, keyed by digest -> user. Per-process, so keep the TTL short:
+# a logout or deactivation handled by another worker is honoured here within TTL.
+token_cache = LRUTTLCache(
+    maxsize=getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 2048),
+    ttl=getattr(settings, "AUTH_TOKEN_CACHE_TTL", 60),
+)
+
+
+def invalidate_user_tokens(user_id) -> None:
+    """Forget every cached token that resolves to ``user_id``."""
+    if user_id is None:
+        return
+    token_cache.delete_where(lambda _key, user: user.pk == user_id)
+
+
+def resolve_token_user(token: str | None):
+    """
+    Return the user owning ``token`` (or None); callers check ``is_active``.
+
+    Warm lookups are served from the in-process cache without touching the DB;
+    misses go through the indexed ``token_digest`` column.
+    """
+    if not token:
+        return None
+    digest = token_digest(token)
+    user = token_cache.get(digest)
+    if user is None:
+        tok = UserAuthToken.objects.select_related("user").filter(token_digest=digest).first()
+        if tok is None or tok.access_token != token:
+            return None
+        user = tok.user
+        token_cache.set(digest, user)
+    # Hand out a copy so per-request state never leaks between requests/threads
+    return copy.copy(user)
+
+
+def token_from_request(request) -> str | None:
+    """Token from ``Authorization: Token ...`` or the ``token``/``access_token`` query params."""
+    auth_header = request.headers.get("Authorization") or ""
+    if auth_header.startswith("Token "):
+        return auth_header.split(" ", 1)[1]
+    params = getattr(request, "query_params", None) or request.GET
+    return params.get("token") or params.get("access_token")
 
 
 class TokenAuthentication(authentication.BaseAuthentication):
@@ -24,12 +71,10 @@ class TokenAuthentication(authentication.BaseAuthentication):
         except UnicodeError:
             raise exceptions.AuthenticationFailed(_("Invalid token header. Token string should not contain invalid characters."))
 
-        try:
-            user_token = UserAuthToken.objects.select_related("user").get(access_token=token)
-        except UserAuthToken.DoesNotExist:
+        user = resolve_token_user(token)
+        if user is None:
             raise exceptions.AuthenticationFailed(_("Invalid token."))
-        if not user_token.user.is_active:
+        if not user.is_active:
             raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
 
-        return (user_token.user, None)
-
+        return (user, None)
@@ -0,0 +1,93 @@
+"""
+Live event stream for the dashboard. An async view: served from the ASGI
+entry point, an idle connection costs a coroutine and a small queue rather
+than a worker thread, so one process can hold many.
+
+Events (server-sent, ``event: <name>``):
+- ``unread_count`` ``{"count": n}``: on connect and whenever it may change
+- ``notification``: a new direct notification, or a broadcast the user is in
+- ``ticket_status``: a support ticket the user created, handles or was
+  forwarded changed status
+
+Messages arrive through apps.utils.event_bus. A stream ends after
+EVENT_STREAM_MAX_AGE seconds and the browser's EventSource reconnects after
+the advertised ``retry``; this also bounds how long a dropped client that
+the server never noticed keeps its subscription.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+
+from apps.utils.event_bus import get_bus
+from apps.utils.notification_utils import broadcast_feed
+from apps.utils.unread_counts import unread_count
+
+from .auth import resolve_token_user, token_from_request
+from .serializers import BroadcastNotificationSerializer
+
+
+def _event(name: str, data) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def _broadcast_for(user, broadcast_id):
+    """The broadcast serialized for ``user``, or None when they are not in its audience."""
+    broadcast = broadcast_feed(user).filter(pk=broadcast_id).first()
+    if broadcast is None:
+        return None
+    return BroadcastNotificationSerializer(broadcast).data
+
+
+async def _events(user):
+    bus = get_bus()
+    # Subscribed before the first count is read, so no change falls in between
+    subscription = await bus.subscribe(user.pk)
+    loop = asyncio.get_running_loop()
+    heartbeat = getattr(settings, "EVENT_STREAM_HEARTBEAT", 20)
+    deadline = loop.time() + getattr(settings, "EVENT_STREAM_MAX_AGE", 600)
+    try:
+        yield f"retry: {getattr(settings, 'EVENT_STREAM_RETRY_MS', 3000)}\n\n"
+        yield _event("unread_count", {"count": await sync_to_async(unread_count)(user)})
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            kind = message.get("type")
+            if kind == "notification":
+                yield _event("notification", message["notification"])
+            elif kind == "unread":
+                yield _event("unread_count", {"count": await sync_to_async(unread_count)(user)})
+            elif kind == "broadcast":
+                data = await sync_to_async(_broadcast_for)(user, message["id"])
+                if data is not None:
+                    yield _event("notification", data)
+                    yield _event("unread_count", {"count": await sync_to_async(unread_count)(user)})
+            elif kind == "ticket":
+                yield _event("ticket_status", message["ticket"])
+    finally:
+        await bus.unsubscribe(subscription)
+
+
+async def event_stream(request):
+    """GET; authenticated with the usual token (header or ``?token=`` for EventSource)."""
+    if request.method != "GET":
+        return JsonResponse({"detail": 'Method "%s" not allowed.' % request.method}, status=405)
+    user = await sync_to_async(resolve_token_user)(token_from_request(request))
+    if user is None or not user.is_active:
+        return JsonResponse({"detail": "Invalid token."}, status=401)
+    return StreamingHttpResponse(
+        _events(user),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,463 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
+
+from apps.models_app.field import Field, FieldIrrigationMethod, FieldIrrigationPractice
+from apps.models_app.report_export import ReportExportJob
+from apps.models_app.soil_report import SoilReport
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip while streaming; keeps memory flat on large accounts
+EXPORT_CHUNK_SIZE = 500
+
+
+class Echo:
+    """File-like object whose write() hands the value back, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+
+def parse_export_params(query_params) -> Dict:
+    """Filters shared by the CSV and PDF exports (bad dates are ignored, as before)."""
+    start_date = None
+    end_date = None
+    try:
+        if query_params.get("start_date"):
+            start_date = datetime.strptime(query_params.get("start_date"), "%Y-%m-%d").date()
+        if query_params.get("end_date"):
+            end_date = datetime.strptime(query_params.get("end_date"), "%Y-%m-%d").date()
+    except Exception:
+        pass
+    field_id = None
+    try:
+        raw = query_params.get("field_id") or query_params.get("field")
+        field_id = int(raw) if raw else None
+    except (ValueError, TypeError):
+        field_id = None
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "field_id": field_id,
+        "include_analytics": bool(query_params.getlist("analytics")),
+    }
+
+
+def export_fields(user, params: Dict):
+    queryset = Field.objects.filter(user=user).select_related("crop", "crop_variety", "soil_type", "farm")
+    if params.get("field_id"):
+        queryset = queryset.filter(pk=params["field_id"])
+    if params.get("start_date"):
+        queryset = queryset.filter(updated_at__date__gte=params["start_date"])
+    if params.get("end_date"):
+        queryset = queryset.filter(updated_at__date__lte=params["end_date"])
+    return queryset.order_by("id")
+
+
+def export_soil_reports(user, params: Dict):
+    # SoilReport has no timestamp, so only the field filter applies
+    queryset = SoilReport.objects.filter(field__user=user).select_related("field", "soil_type")
+    if params.get("field_id"):
+        queryset = queryset.filter(field_id=params["field_id"])
+    return queryset.order_by("id")
+
+
+def params_to_json(params: Dict) -> Dict:
+    return {
+        "start_date": params["start_date"].isoformat() if params.get("start_date") else None,
+        "end_date": params["end_date"].isoformat() if params.get("end_date") else None,
+        "field_id": params.get("field_id"),
+        "include_analytics": bool(params.get("include_analytics")),
+    }
+
+
+def params_from_json(data: Dict) -> Dict:
+    return {
+        "start_date": date.fromisoformat(data["start_date"]) if data.get("start_date") else None,
+        "end_date": date.fromisoformat(data["end_date"]) if data.get("end_date") else None,
+        "field_id": data.get("field_id"),
+        "include_analytics": bool(data.get("include_analytics")),
+    }
+
+
+def export_analytics(user) -> Dict[str, List[Dict]]:
+    crop_counts = Field.objects.filter(user=user).values("crop__name").annotate(cnt=Count("id")).order_by("-cnt")
+    crop_distribution = [{"name": (row["crop__name"] or "Unassigned"), "value": row["cnt"]} for row in crop_counts]
+    irrigation_distribution: List[Dict] = []
+    # Prefer explicit method mapping; fall back to practices
+    for model in (FieldIrrigationMethod, FieldIrrigationPractice):
+        rows = model.objects.filter(field__user=user).values("irrigation_method__name").annotate(cnt=Count("id")).order_by("-cnt")
+        irrigation_distribution = [
+            {"name": (row["irrigation_method__name"] or "Unspecified"), "value": row["cnt"]} for row in rows
+        ]
+        if irrigation_distribution:
+            break
+    return {"crop_distribution": crop_distribution, "irrigation_distribution": irrigation_distribution}
+
+
+def area_acres(area) -> str:
+    try:
+        hectares = (area or {}).get("hectares")
+        if isinstance(hectares, (int, float)):
+            return f"{float(hectares) * 2.47105:.2f}"
+    except Exception:
+        pass
+    return "-"
+
+
+def _num(value) -> str:
+    return f"{value:.2f}" if value else "-"
+
+
+def _fields_with_irrigation(user, params: Dict):
+    return export_fields(user, params).prefetch_related(
+        Prefetch(
+            "fieldirrigationmethod_set",
+            queryset=FieldIrrigationMethod.objects.select_related("irrigation_method").order_by("id"),
+            to_attr="prefetched_irrigation_methods",
+        )
+    )
+
+
+def incomplete_note(section: str) -> str:
+    return f"INCOMPLETE: the {section} section stopped early because of an error. Please export again."
+
+
+def iter_report_rows(user, params: Dict) -> Iterator[List]:
+    """
+    CSV report rows, produced lazily from chunked queryset iterators. Headers are
+    already sent when a section fails, so the failure is logged and marked in the
+    file itself, with a trailer listing the sections cut short.
+    """
+    incomplete = []
+    yield ["OELP Agricultural Platform - Comprehensive Report"]
+    yield [f"Generated for: {user.full_name or user.username}"]
+    yield [f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"]
+    if params.get("start_date") or params.get("end_date"):
+        yield [f"Date Range: {params.get('start_date') or 'All'} to {params.get('end_date') or 'All'}"]
+    yield []
+
+    yield ["FIELD DETAILS"]
+    yield ["Field Name", "Farm", "Crop", "Crop Variety", "Location", "Area (Acres)", "Soil Type", "Irrigation Method", "Status", "Created Date"]
+    try:
+        for fld in _fields_with_irrigation(user, params).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            fim = fld.prefetched_irrigation_methods[0] if fld.prefetched_irrigation_methods else None
+            yield [
+                fld.name or "-",
+                fld.farm.name if fld.farm else "-",
+                fld.crop.name if fld.crop else "-",
+                fld.crop_variety.name if fld.crop_variety else "-",
+                fld.location_name or "-",
+                area_acres(fld.area),
+                fld.soil_type.name if fld.soil_type else "-",
+                fim.irrigation_method.name if fim and fim.irrigation_method else "Not Set",
+                "Active" if fld.is_active else "Inactive",
+                fld.created_at.strftime("%Y-%m-%d") if fld.created_at else "-",
+            ]
+    except Exception:
+        logger.exception("CSV export of field details failed for user %s", user.pk)
+        incomplete.append("field details")
+        yield [incomplete_note("field details")]
+    yield []
+
+    soil_header_sent = False
+    try:
+        for report in export_soil_reports(user, params).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            if not soil_header_sent:
+                yield ["SOIL ANALYSIS REPORTS"]
+                yield ["Field", "pH", "EC", "Nitrogen", "Phosphorous", "Potassium", "Soil Type", "Report ID"]
+                soil_header_sent = True
+            yield [
+                report.field.name if report.field else "-",
+                _num(report.ph),
+                _num(report.ec),
+                _num(report.nitrogen),
+                _num(report.phosphorous),
+                _num(report.potassium),
+                report.soil_type.name if report.soil_type else "-",
+                str(report.id) if report.id else "-",
+            ]
+    except Exception:
+        logger.exception("CSV export of soil reports failed for user %s", user.pk)
+        incomplete.append("soil analysis reports")
+        yield [incomplete_note("soil analysis reports")]
+        soil_header_sent = True  # close the note with a blank row like a finished section
+    if soil_header_sent:
+        yield []
+
+    if params.get("include_analytics"):
+        try:
+            analytics_data = export_analytics(user)
+            yield ["ANALYTICS SUMMARY"]
+            if analytics_data.get("crop_distribution"):
+                yield ["Crop Distribution"]
+                yield ["Crop", "Count"]
+                for item in analytics_data["crop_distribution"]:
+                    yield [item.get("name", "-"), item.get("value", 0)]
+                yield []
+            if analytics_data.get("irrigation_distribution"):
+                yield ["Irrigation Distribution"]
+                yield ["Method", "Count"]
+                for item in analytics_data["irrigation_distribution"]:
+                    yield [item.get("name", "-"), item.get("value", 0)]
+                yield []
+        except Exception:
+            logger.exception("CSV export of analytics failed for user %s", user.pk)
+            incomplete.append("analytics summary")
+            yield [incomplete_note("analytics summary")]
+
+    if incomplete:
+        yield []
+        yield ["REPORT INCOMPLETE", "Sections cut short: " + ", ".join(incomplete)]
+    yield []
+    yield ["Report generated by OELP Agricultural Platform"]
+    yield ["For support, visit: https://oelp.com/support"]
+
+
+def stream_report_csv(user, params: Dict) -> Iterator[str]:
+    """Encoded CSV lines for StreamingHttpResponse; only one chunk is held at a time."""
+    writer = csv.writer(Echo())
+    for row in iter_report_rows(user, params):
+        yield writer.writerow(row)
+
+
+# ------------------- PDF report -------------------
+
+def render_report_pdf(user, params: Dict) -> bytes:
+    """
+    The PDF report as bytes. Run from the export worker (apps/api/tasks.py),
+    never inside a request; raises ImportError when reportlab is missing.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    def table_header(y, columns):
+        p.setFont("Helvetica-Bold", 9)
+        p.setFillColor(colors.HexColor("#2d5a3d"))
+        for x, label in columns:
+            p.drawString(x, y, label)
+        y -= 15
+        p.setStrokeColor(colors.grey)
+        p.line(50, y, 550, y)
+        p.setFont("Helvetica", 9)
+        p.setFillColor(colors.black)
+        return y - 10
+
+    def section_title(y, title):
+        p.setFont("Helvetica-Bold", 14)
+        p.setFillColor(colors.HexColor("#1a5f3f"))
+        p.drawString(50, y, title)
+        return y - 20
+
+    # Header
+    p.setFont("Helvetica-Bold", 20)
+    p.setFillColor(colors.HexColor("#1a5f3f"))
+    p.drawString(50, height - 50, "OELP Agricultural Platform")
+    p.setFont("Helvetica", 14)
+    p.setFillColor(colors.black)
+    p.drawString(50, height - 75, "Comprehensive Agricultural Report")
+
+    # User info
+    y = height - 110
+    p.setFont("Helvetica", 10)
+    p.drawString(50, y, f"Generated for: {user.full_name or user.username}")
+    y -= 15
+    p.drawString(50, y, f"Email: {user.email}")
+    y -= 15
+    p.drawString(50, y, f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}")
+    y -= 15
+    start_date, end_date = params.get("start_date"), params.get("end_date")
+    if start_date or end_date:
+        p.drawString(50, y, f"Date Range: {start_date.strftime('%Y-%m-%d') if start_date else 'All'} to {end_date.strftime('%Y-%m-%d') if end_date else 'All'}")
+        y -= 20
+    else:
+        y -= 10
+
+    # Fields section; rows flow onto new pages as needed
+    field_columns = [(50, "Field Name"), (200, "Crop"), (300, "Location"), (400, "Area (Acres)"), (500, "Status")]
+    started = False
+    for fld in export_fields(user, params).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        if not started:
+            y = table_header(section_title(y - 10, "FIELD DETAILS"), field_columns)
+            started = True
+        if y < 100:
+            p.showPage()
+            y = table_header(height - 50, field_columns)
+        p.drawString(50, y, (fld.name or "-")[:30])
+        p.drawString(200, y, (fld.crop.name if fld.crop else "-")[:20])
+        p.drawString(300, y, (fld.location_name or "-")[:20])
+        p.drawString(400, y, area_acres(fld.area))
+        p.drawString(500, y, "Active" if fld.is_active else "Inactive")
+        y -= 15
+    if started:
+        y -= 10
+
+    # Soil Reports section
+    soil_columns = [(50, "Field"), (150, "pH"), (200, "EC"), (250, "N"), (300, "P"), (350, "K"), (400, "Soil Type")]
+    started = False
+    for report in export_soil_reports(user, params).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        if not started:
+            if y < 150:
+                p.showPage()
+                y = height - 50
+            y = table_header(section_title(y, "SOIL ANALYSIS REPORTS"), soil_columns)
+            started = True
+        if y < 100:
+            p.showPage()
+            y = table_header(height - 50, soil_columns)
+        p.drawString(50, y, (report.field.name if report.field else "-")[:25])
+        p.drawString(150, y, _num(report.ph))
+        p.drawString(200, y, _num(report.ec))
+        p.drawString(250, y, _num(report.nitrogen))
+        p.drawString(300, y, _num(report.phosphorous))
+        p.drawString(350, y, _num(report.potassium))
+        p.drawString(400, y, (report.soil_type.name if report.soil_type else "-")[:15])
+        y -= 15
+    if started:
+        y -= 10
+
+    # Analytics section if requested
+    if params.get("include_analytics"):
+        try:
+            analytics_data = export_analytics(user)
+            if y < 200:
+                p.showPage()
+                y = height - 50
+            y = section_title(y, "ANALYTICS SUMMARY") - 5
+            for key, title in (("crop_distribution", "Crop Distribution"), ("irrigation_distribution", "Irrigation Distribution")):
+                if not analytics_data.get(key):
+                    continue
+                if y < 100:
+                    p.showPage()
+                    y = height - 50
+                p.setFont("Helvetica-Bold", 11)
+                p.setFillColor(colors.HexColor("#2d5a3d"))
+                p.drawString(50, y, title)
+                y -= 15
+                p.setFont("Helvetica", 9)
+                p.setFillColor(colors.black)
+                for item in analytics_data[key][:10]:
+                    p.drawString(70, y, f"{item.get('name', '-')}: {item.get('value', 0)} fields")
+                    y -= 12
+                y -= 5
+        except Exception:
+            logger.exception("PDF export of analytics failed for user %s", user.pk)
+            if y < 80:
+                p.showPage()
+                y = height - 50
+            p.setFont("Helvetica-Bold", 9)
+            p.setFillColor(colors.red)
+            p.drawString(50, y, incomplete_note("analytics summary"))
+            y -= 20
+
+    # Footer
+    if y < 80:
+        p.showPage()
+        y = height - 50
+    p.setFont("Helvetica", 8)
+    p.setFillColor(colors.grey)
+    p.drawString(50, y, "Report generated by OELP Agricultural Platform")
+    y -= 10
+    p.drawString(50, y, "For support, visit: https://oelp.com/support")
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+# ------------------- Export jobs -------------------
+
+# format -> (renderer, content type, file extension)
+EXPORT_RENDERERS = {
+    "pdf": (render_report_pdf, "application/pdf", "pdf"),
+}
+
+
+def export_params_hash(user_id: int, fmt: str, params: Dict) -> str:
+    payload = json.dumps({"user": user_id, "format": fmt, **params_to_json(params)}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _export_ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, "REPORT_EXPORT_TTL", 3600))
+
+
+def request_report_export(user, params: Dict, fmt: str = "pdf", refresh: bool = False) -> ReportExportJob:
+    """
+    Job rendering ``fmt`` for ``user``/``params``. An unexpired pending, running or
+    ready job with the same parameters is returned as-is unless ``refresh``;
+    otherwise a new job is queued once the surrounding transaction commits.
+    """
+    from .tasks import render_report_export
+
+    params_hash = export_params_hash(user.pk, fmt, params)
+    if not refresh:
+        job = (
+            ReportExportJob.objects.filter(user=user, params_hash=params_hash)
+            .exclude(status=ReportExportJob.FAILED)
+            .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()))
+            .first()
+        )
+        if job is not None:
+            return job
+    # Pending jobs expire too, so one lost by a dead worker is not reused forever
+    job = ReportExportJob.objects.create(
+        user=user,
+        format=fmt,
+        params=params_to_json(params),
+        params_hash=params_hash,
+        expires_at=timezone.now() + _export_ttl(),
+    )
+    transaction.on_commit(lambda: render_report_export.delay(job.pk))
+    return job
+
+
+def run_report_export(job_id: int) -> None:
+    """Render a queued job and store the file through the default storage backend."""
+    job = ReportExportJob.objects.select_related("user").filter(pk=job_id).first()
+    if job is None or job.status == ReportExportJob.READY:
+        return
+    ReportExportJob.objects.filter(pk=job.pk).update(status=ReportExportJob.RUNNING)
+    renderer, _, extension = EXPORT_RENDERERS[job.format]
+    try:
+        content = renderer(job.user, params_from_json(job.params))
+        name = f"oelp_report_{job.pk}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        job.file.save(name, ContentFile(content), save=False)
+        job.status = ReportExportJob.READY
+        job.error = ""
+        job.expires_at = timezone.now() + _export_ttl()
+    except Exception as exc:
+        logger.exception("Report export job %s failed", job.pk)
+        job.status = ReportExportJob.FAILED
+        job.error = str(exc)[:500]
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "status", "error", "expires_at", "finished_at"])
+
+
+def purge_expired_exports() -> int:
+    """Delete expired jobs and their stored files; returns how many were removed."""
+    removed = 0
+    for job in ReportExportJob.objects.filter(expires_at__lte=timezone.now()).iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        removed += 1
+    return removed
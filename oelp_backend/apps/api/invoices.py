@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import io
+from datetime import datetime
+from typing import Tuple
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from apps.models_app.user_plan import Transaction
+
+# Bump when the invoice layout changes so stored PDFs are re-rendered
+INVOICE_LAYOUT_VERSION = 1
+
+
+def invoice_cache_key(txn: Transaction) -> str:
+    """
+    sha256 over everything printed on the invoice: the transaction's immutable
+    fields, its status and the billed user's details. Doubles as the ETag.
+    """
+    user = txn.user
+    plan = txn.plan
+    parts = [
+        INVOICE_LAYOUT_VERSION,
+        txn.pk,
+        txn.created_at.isoformat() if txn.created_at else "",
+        txn.amount,
+        txn.currency,
+        txn.transaction_type,
+        txn.status,
+        getattr(plan, "name", ""),
+        getattr(plan, "duration", ""),
+        user.full_name or user.username,
+        user.email or "",
+        getattr(user, "phone_number", "") or "",
+    ]
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def invoice_storage_name(txn: Transaction, key: str) -> str:
+    return f"invoices/invoice_{txn.pk}_{key[:20]}.pdf"
+
+
+def render_invoice_pdf(txn: Transaction) -> bytes:
+    """The invoice as PDF bytes; raises ImportError when reportlab is missing."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    # Header
+    p.setFont("Helvetica-Bold", 24)
+    p.setFillColor(colors.HexColor("#1a5f3f"))
+    p.drawString(50, height - 60, "OELP Agricultural Platform")
+    p.setFont("Helvetica", 14)
+    p.setFillColor(colors.black)
+    p.drawString(50, height - 85, "INVOICE")
+
+    # Invoice details
+    y = height - 130
+    p.setFont("Helvetica-Bold", 10)
+    p.setFillColor(colors.HexColor("#2d5a3d"))
+    p.drawString(50, y, "Invoice Details")
+    y -= 20
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.black)
+    p.drawString(50, y, f"Invoice Number: INV-{txn.id:06d}")
+    y -= 15
+    p.drawString(50, y, f"Date: {txn.created_at.strftime('%B %d, %Y') if hasattr(txn, 'created_at') and txn.created_at else datetime.now().strftime('%B %d, %Y')}")
+    y -= 15
+    p.drawString(50, y, f"Transaction ID: {txn.id}")
+    y -= 15
+    p.drawString(50, y, f"Status: {txn.status.upper()}")
+
+    # Customer information
+    y = height - 130
+    p.setFont("Helvetica-Bold", 10)
+    p.setFillColor(colors.HexColor("#2d5a3d"))
+    p.drawString(350, y, "Bill To")
+    y -= 20
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.black)
+    p.drawString(350, y, txn.user.full_name or txn.user.username)
+    y -= 15
+    p.drawString(350, y, txn.user.email or "")
+    y -= 15
+    if hasattr(txn.user, 'phone_number') and txn.user.phone_number:
+        p.drawString(350, y, f"Phone: {txn.user.phone_number}")
+
+    # Line separator
+    y = height - 250
+    p.setStrokeColor(colors.HexColor("#1a5f3f"))
+    p.setLineWidth(2)
+    p.line(50, y, width - 50, y)
+    y -= 20
+
+    # Items table header
+    p.setFont("Helvetica-Bold", 11)
+    p.setFillColor(colors.HexColor("#1a5f3f"))
+    p.drawString(50, y, "Description")
+    p.drawString(300, y, "Quantity")
+    p.drawString(400, y, "Unit Price")
+    p.drawString(500, y, "Total")
+    y -= 15
+    p.setStrokeColor(colors.grey)
+    p.setLineWidth(1)
+    p.line(50, y, width - 50, y)
+    y -= 20
+
+    # Item row
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.black)
+    plan_name = getattr(txn.plan, 'name', 'Subscription Plan')
+    duration = getattr(txn.plan, 'duration', 30)
+    p.drawString(50, y, f"{plan_name} - {duration} days")
+    p.drawString(300, y, "1")
+    p.drawString(400, y, f"{txn.amount} {txn.currency}")
+    p.drawString(500, y, f"{txn.amount} {txn.currency}")
+    y -= 30
+
+    # Totals
+    p.setStrokeColor(colors.grey)
+    p.line(400, y, width - 50, y)
+    y -= 15
+    p.setFont("Helvetica-Bold", 11)
+    p.setFillColor(colors.HexColor("#1a5f3f"))
+    p.drawString(400, y, "Subtotal:")
+    p.drawString(500, y, f"{txn.amount} {txn.currency}")
+    y -= 15
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.black)
+    p.drawString(400, y, "Tax:")
+    p.drawString(500, y, "0.00")
+    y -= 15
+    p.setFont("Helvetica-Bold", 12)
+    p.setFillColor(colors.HexColor("#1a5f3f"))
+    p.drawString(400, y, "Total:")
+    p.drawString(500, y, f"{txn.amount} {txn.currency}")
+    y -= 30
+
+    # Payment information
+    p.setFont("Helvetica-Bold", 10)
+    p.setFillColor(colors.HexColor("#2d5a3d"))
+    p.drawString(50, y, "Payment Information")
+    y -= 20
+    p.setFont("Helvetica", 10)
+    p.setFillColor(colors.black)
+    p.drawString(50, y, f"Payment Method: {getattr(txn, 'payment_method', 'Online Payment')}")
+    y -= 15
+    p.drawString(50, y, f"Payment Status: {txn.status.upper()}")
+    if hasattr(txn, 'paid_at') and txn.paid_at:
+        y -= 15
+        p.drawString(50, y, f"Paid On: {txn.paid_at.strftime('%B %d, %Y')}")
+
+    # Footer
+    y = 100
+    p.setFont("Helvetica", 9)
+    p.setFillColor(colors.grey)
+    p.drawString(50, y, "Thank you for your business!")
+    y -= 15
+    p.drawString(50, y, "For questions about this invoice, please contact support@oelp.com")
+    y -= 15
+    p.drawString(50, y, "OELP Agricultural Platform - Empowering farmers with technology")
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def stored_invoice(txn: Transaction, key: str, invoice_url: str) -> Tuple[str, bool]:
+    """
+    Storage name of the invoice PDF for ``key``, rendering and saving it only
+    when it is not stored yet. Returns (name, rendered).
+
+    Transaction.invoice_pdf records ``invoice_url``, the authenticated download
+    endpoint: a storage URL would be a relative /media/ path on the filesystem
+    and an expiring signed URL on S3.
+    """
+    if txn.invoice_pdf != invoice_url:
+        # update() rather than save(): updated_at must not move just because the link was recorded
+        Transaction.objects.filter(pk=txn.pk).update(invoice_pdf=invoice_url)
+    name = invoice_storage_name(txn, key)
+    if default_storage.exists(name):
+        return name, False
+    return default_storage.save(name, ContentFile(render_invoice_pdf(txn))), True
@@ -1,7 +1,194 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import heapq
+import json
+from itertools import islice
+from operator import attrgetter
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first pages keyed on ``(created_at, id)``. The cursor holds the
+    last row's key, so each page is one range scan from there: no COUNT and
+    no OFFSET, and page 500 costs what page 1 does. Responses carry ``next``
+    (None on the last page) and ``results``.
+
+    Views pick the key fields with ``keyset_ordering`` (default
+    ``("created_at", "id")``); both must be indexed together to stay fast.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("created_at", "id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        default = api_settings.PAGE_SIZE or 20
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return default
+
+    def encode_cursor(self, position) -> str:
+        value, pk = position
+        raw = json.dumps([value.isoformat() if hasattr(value, "isoformat") else value, pk])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            moment = parse_datetime(value) if isinstance(value, str) else None
+            if moment is None:
+                raise ValueError
+            return moment, int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _prepare(self, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = tuple(getattr(view, "keyset_ordering", self.ordering))
+        self.position = self.decode_cursor(request)
+        self.next_position = None
+
+    def _after_cursor(self, queryset):
+        """``queryset`` newest first, from just past the cursor."""
+        time_field, id_field = self.fields
+        queryset = queryset.order_by(f"-{time_field}", f"-{id_field}")
+        if self.position is None:
+            return queryset
+        moment, pk = self.position
+        # <= on the leading key keeps this a plain index range scan; ties are trimmed by id
+        return queryset.filter(**{f"{time_field}__lte": moment}).exclude(
+            **{time_field: moment, f"{id_field}__gte": pk}
+        )
+
+    def _key(self, obj):
+        return attrgetter(*self.fields)(obj)
+
+    def _page(self, rows):
+        page = rows[: self.page_size]
+        if len(rows) > self.page_size:
+            self.next_position = self._key(page[-1])
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self._prepare(request, view)
+        return self._page(list(self._after_cursor(queryset)[: self.page_size + 1]))
+
+    def paginate_merged(self, querysets, request, view=None):
+        """One page of several newest-first sources interleaved by their key."""
+        self._prepare(request, view)
+        heads = [list(self._after_cursor(qs)[: self.page_size + 1]) for qs in querysets]
+        merged = heapq.merge(*heads, key=self._key, reverse=True)
+        return self._page(list(islice(merged, self.page_size + 1)))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    get_merged_response = get_paginated_response
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
 
 
 class DefaultPageNumberPagination(PageNumberPagination):
+    """
+    Page numbers with a total ``count``. Views that set ``keyset_pagination``
+    switch to KeysetPagination when the request carries a ``cursor``
+    parameter (empty for the first page), for infinite-scroll clients.
+    """
+
     page_size_query_param = "page_size"
     max_page_size = 100
+    keyset = None
+
+    def _use_keyset(self, request, view):
+        self.keyset = None
+        if getattr(view, "keyset_pagination", False) and KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+        return self.keyset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self._use_keyset(request, view):
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def paginate_merged(self, querysets, request, view=None, key="created_at"):
+        """
+        One page of several querysets, each already ordered newest first by
+        ``key``, interleaved as if they were one list. Reads at most
+        ``page * page_size`` rows from each source.
+        """
+        if self._use_keyset(request, view):
+            return self.keyset.paginate_merged(querysets, request, view)
+        self.request = request
+        self.merged_size = self.get_page_size(request)
+        try:
+            self.merged_number = int(request.query_params.get(self.page_query_param, 1))
+            if self.merged_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param), message="Invalid page."
+            ))
+        self.merged_count = sum(qs.count() for qs in querysets)
+        start = (self.merged_number - 1) * self.merged_size
+        if start and start >= self.merged_count:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=self.merged_number, message="That page contains no results"
+            ))
+        heads = [qs[: start + self.merged_size] for qs in querysets]
+        merged = heapq.merge(*heads, key=attrgetter(key), reverse=True)
+        return list(islice(merged, start, start + self.merged_size))
 
+    def get_merged_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        url = self.request.build_absolute_uri()
+        number = self.merged_number
+        next_url = None
+        if number * self.merged_size < self.merged_count:
+            next_url = replace_query_param(url, self.page_query_param, number + 1)
+        previous_url = None
+        if number == 2:
+            previous_url = remove_query_param(url, self.page_query_param)
+        elif number > 2:
+            previous_url = replace_query_param(url, self.page_query_param, number - 1)
+        return Response({
+            "count": self.merged_count,
+            "next": next_url,
+            "previous": previous_url,
+            "results": data,
+        })
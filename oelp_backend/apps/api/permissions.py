@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from apps.utils.role_utils import get_role_names
+
 
 class IsOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj) -> bool:
@@ -20,8 +22,6 @@ class HasRole(BasePermission):
         required_roles = view_required_roles if view_required_roles is not None else self.required_roles
         if not required_roles:
             return True
-        user_roles = set(
-            request.user.user_roles.select_related("role").values_list("role__name", flat=True)
-        )
+        user_roles = set(get_role_names(request.user))
         return any(role in user_roles for role in required_roles) or request.user.is_staff
 
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from django.contrib.auth import password_validation
+from django.db.models import Prefetch
+from django.urls import reverse
 from rest_framework import serializers
 
 from apps.models_app.assets import Asset
@@ -10,13 +12,15 @@ from apps.models_app.field import Field, Device, CropLifecycleDates, FieldIrriga
 from apps.models_app.feature import Feature, FeatureType
 from apps.models_app.feature_plan import PlanFeature
 from apps.models_app.irrigation import IrrigationMethods
-from apps.models_app.notifications import Notification, SupportRequest
+from apps.models_app.notifications import BroadcastNotification, Notification, SupportRequest
 from apps.models_app.support_ticket import SupportTicket, TicketComment, TicketHistory
 from apps.models_app.plan import Plan
+from apps.models_app.report_export import ReportExportJob
 from apps.models_app.soil_report import SoilTexture, SoilReport
 from apps.models_app.token import UserAuthToken
 from apps.models_app.user import CustomUser, Role, UserRole
 from apps.models_app.models import UserActivity
+from apps.utils.role_utils import get_role_names, primary_role, role_names_for_users
 from apps.models_app.user_plan import (
     UserPlan,
     PlanFeatureUsage,
@@ -25,6 +29,42 @@ from apps.models_app.user_plan import (
 )
 
 
+def _user_creators_from_activity(user_ids):
+    """Map user id -> creator (from the earliest "create" UserActivity) in one query."""
+    from django.contrib.contenttypes.models import ContentType
+
+    if not user_ids:
+        return {}
+    ct = ContentType.objects.get_for_model(CustomUser)
+    creators = {}
+    acts = (
+        UserActivity.objects
+        .filter(content_type=ct, object_id__in=user_ids, action="create")
+        .order_by("id")
+        .select_related("user")
+    )
+    for act in acts:
+        creators.setdefault(act.object_id, act.user)
+    return creators
+
+
+class UserListSerializer(serializers.ListSerializer):
+    """Resolves roles and legacy creators for the whole page up front."""
+
+    def to_representation(self, data):
+        items = data.all() if hasattr(data, "all") else data
+        items = list(items)
+        # Rows created before created_by existed fall back to UserActivity until backfilled
+        legacy_ids = [u.pk for u in items if u.created_by_id is None]
+        self.child._page_roles = role_names_for_users(u.pk for u in items)
+        self.child._page_creators = _user_creators_from_activity(legacy_ids)
+        try:
+            return super().to_representation(items)
+        finally:
+            self.child._page_roles = None
+            self.child._page_creators = None
+
+
 class UserSerializer(serializers.ModelSerializer):
     roles = serializers.SerializerMethodField()
     created_by_name = serializers.SerializerMethodField()
@@ -44,43 +84,41 @@ class UserSerializer(serializers.ModelSerializer):
             "created_by_name",
             "created_by_id",
         )
+        list_serializer_class = UserListSerializer
 
     def get_roles(self, obj):
         try:
-            return list(obj.user_roles.select_related("role").values_list("role__name", flat=True))
+            page_roles = getattr(self, "_page_roles", None)
+            if page_roles is not None and obj.pk in page_roles:
+                return page_roles[obj.pk]
+            return get_role_names(obj)
         except Exception:
             return []
 
+    def _creator(self, obj):
+        if obj.created_by_id:
+            return obj.created_by
+        page_creators = getattr(self, "_page_creators", None)
+        if page_creators is not None:
+            return page_creators.get(obj.pk)
+        if not hasattr(obj, "_legacy_creator"):
+            obj._legacy_creator = _user_creators_from_activity([obj.pk]).get(obj.pk)
+        return obj._legacy_creator
+
     def get_created_by_name(self, obj):
         try:
-            from django.contrib.contenttypes.models import ContentType
-            ct = ContentType.objects.get_for_model(obj.__class__)
-            act = (
-                UserActivity.objects
-                .filter(content_type=ct, object_id=obj.pk, action__in=["create"])  # created
-                .order_by("id")
-                .select_related("user")
-                .first()
-            )
-            if act and act.user:
-                return act.user.full_name or act.user.username or None
+            creator = self._creator(obj)
+            if creator:
+                return creator.full_name or creator.username or None
         except Exception:
             pass
         return None
 
     def get_created_by_id(self, obj):
         try:
-            from django.contrib.contenttypes.models import ContentType
-            ct = ContentType.objects.get_for_model(obj.__class__)
-            act = (
-                UserActivity.objects
-                .filter(content_type=ct, object_id=obj.pk, action__in=["create"])
-                .order_by("id")
-                .select_related("user")
-                .first()
-            )
-            if act and act.user:
-                return act.user.id
+            creator = self._creator(obj)
+            if creator:
+                return creator.id
         except Exception:
             pass
         return None
@@ -162,6 +200,22 @@ class DeviceSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "serial_number")
 
 
+def prefetch_field_details(queryset):
+    """Load what FieldSerializer reads per row in a fixed number of queries."""
+    return queryset.select_related("farm", "crop", "crop_variety", "soil_type").prefetch_related(
+        Prefetch(
+            "fieldirrigationmethod_set",
+            queryset=FieldIrrigationMethod.objects.select_related("irrigation_method").order_by("id"),
+            to_attr="prefetched_irrigation_methods",
+        ),
+        Prefetch(
+            "croplifecycledates_set",
+            queryset=CropLifecycleDates.objects.order_by("-id"),
+            to_attr="prefetched_lifecycles",
+        ),
+    )
+
+
 class FieldSerializer(serializers.ModelSerializer):
     soil_type_name = serializers.CharField(source="soil_type.name", read_only=True)
     farm_name = serializers.CharField(source="farm.name", read_only=True)
@@ -208,22 +262,30 @@ class FieldSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("user", "created_at", "updated_at", "area")
 
+    def _irrigation_method(self, obj):
+        # Prefetched by prefetch_field_details(); fall back to a query otherwise
+        if hasattr(obj, "prefetched_irrigation_methods"):
+            fim = obj.prefetched_irrigation_methods[0] if obj.prefetched_irrigation_methods else None
+        else:
+            fim = FieldIrrigationMethod.objects.filter(field=obj).select_related("irrigation_method").order_by("id").first()
+        return getattr(fim, "irrigation_method", None)
+
     def get_irrigation_method_name(self, obj):
         try:
-            fim = FieldIrrigationMethod.objects.filter(field=obj).select_related("irrigation_method").first()
-            return getattr(getattr(fim, "irrigation_method", None), "name", None)
+            return getattr(self._irrigation_method(obj), "name", None)
         except Exception:
             return None
 
     def get_irrigation_method_id(self, obj):
         try:
-            fim = FieldIrrigationMethod.objects.filter(field=obj).select_related("irrigation_method").first()
-            return getattr(getattr(fim, "irrigation_method", None), "id", None)
+            return getattr(self._irrigation_method(obj), "id", None)
         except Exception:
             return None
 
     def _latest_lifecycle(self, obj):
         try:
+            if hasattr(obj, "prefetched_lifecycles"):
+                return obj.prefetched_lifecycles[0] if obj.prefetched_lifecycles else None
             return CropLifecycleDates.objects.filter(field=obj).order_by("-id").first()
         except Exception:
             return None
@@ -404,6 +466,22 @@ class UserPlanSerializer(serializers.ModelSerializer):
         fields = ("id", "user", "user_name", "user_email", "plan", "plan_name", "plan_price", "plan_details", "start_date", "end_date", "expire_at", "is_active", "created_at")
 
 
+class NotificationListSerializer(serializers.ListSerializer):
+    """Fetches sender/receiver roles for the whole page in one go."""
+
+    def to_representation(self, data):
+        items = data.all() if hasattr(data, "all") else data
+        items = list(items)
+        user_ids = set()
+        for n in items:
+            user_ids.update((n.sender_id, n.receiver_id))
+        self.child._role_names_by_user = role_names_for_users(user_ids)
+        try:
+            return super().to_representation(items)
+        finally:
+            self.child._role_names_by_user = None
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     sender_name = serializers.SerializerMethodField()
     sender_role = serializers.SerializerMethodField()
@@ -431,32 +509,17 @@ class NotificationSerializer(serializers.ModelSerializer):
             "created_at",
         )
         read_only_fields = ("sender", "receiver", "created_at")
+        list_serializer_class = NotificationListSerializer
 
     def _first_role(self, user: CustomUser | None):
         if not user:
             return None
         try:
-            # Get all roles for the user
-            all_roles = list(
-                user.user_roles.select_related("role")
-                .values_list("role__name", flat=True)
-            )
-            if not all_roles:
-                return None
-            
-            # Prioritize non-end-user roles (for sender, we want their primary role)
-            # Filter out End-App-User and similar variants
-            non_end_user_roles = [
-                r for r in all_roles
-                if r and r.lower().replace("-", "").replace("_", "").replace(" ", "") not in ["endappuser", "enduser", "endusers"]
-            ]
-            
-            # If there are non-end-user roles, return the first one
-            if non_end_user_roles:
-                return non_end_user_roles[0]
-            
-            # Otherwise, return the first role (which might be End-App-User)
-            return all_roles[0]
+            # List responses precompute roles for the whole page (NotificationListSerializer)
+            role_map = getattr(self, "_role_names_by_user", None)
+            if role_map is not None and user.pk in role_map:
+                return primary_role(role_map[user.pk])
+            return primary_role(get_role_names(user))
         except Exception:
             return None
 
@@ -477,6 +540,55 @@ class NotificationSerializer(serializers.ModelSerializer):
         return self._first_role(obj.receiver)
 
 
+class BroadcastNotificationSerializer(NotificationSerializer):
+    """
+    A broadcast in the same shape as a Notification. Its id is "b-<pk>" so
+    the two kinds can share the mark_read/dismiss routes; ``receiver_roles``
+    replaces the single receiver.
+    """
+
+    id = serializers.SerializerMethodField()
+    broadcast = serializers.SerializerMethodField()
+    receiver = serializers.SerializerMethodField()
+    receiver_roles = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BroadcastNotification
+        fields = NotificationSerializer.Meta.fields + ("broadcast", "receiver_roles", "audience_size")
+        read_only_fields = ("sender", "created_at")
+
+    def get_id(self, obj):
+        return f"b-{obj.pk}"
+
+    def get_broadcast(self, obj):
+        return True
+
+    def get_receiver(self, obj):
+        return None
+
+    def get_receiver_name(self, obj):
+        return None
+
+    def get_receiver_roles(self, obj):
+        return sorted(role.name for role in obj.roles.all())
+
+    def get_receiver_role(self, obj):
+        return primary_role(self.get_receiver_roles(obj))
+
+    def get_is_read(self, obj):
+        return bool(getattr(obj, "is_read", False))
+
+
+def serialize_notification_feed(items, context) -> list:
+    """Serialize a merged page of Notifications and BroadcastNotifications, keeping its order."""
+    direct = [item for item in items if isinstance(item, Notification)]
+    broadcasts = [item for item in items if isinstance(item, BroadcastNotification)]
+    rendered = dict(zip(map(id, direct), NotificationSerializer(direct, many=True, context=context).data))
+    rendered.update(zip(map(id, broadcasts), BroadcastNotificationSerializer(broadcasts, many=True, context=context).data))
+    return [rendered[id(item)] for item in items]
+
+
 class SupportRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = SupportRequest
@@ -525,6 +637,23 @@ class TransactionSerializer(serializers.ModelSerializer):
         )
 
 
+class ReportExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportExportJob
+        fields = ("id", "format", "params", "status", "error", "created_at", "finished_at", "expires_at", "download_url")
+        # Jobs are created by request_report_export; everything but the request is set server-side
+        read_only_fields = ("status", "error", "created_at", "finished_at", "expires_at")
+
+    def get_download_url(self, obj):
+        if obj.status != ReportExportJob.READY:
+            return None
+        url = reverse("report-export-download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
 # Support Ticket Serializers
 
 class TicketCommentSerializer(serializers.ModelSerializer):
@@ -548,7 +677,7 @@ class TicketCommentSerializer(serializers.ModelSerializer):
 
     def get_user_roles(self, obj):
         try:
-            return list(obj.user.user_roles.select_related("role").values_list("role__name", flat=True))
+            return get_role_names(obj.user)
         except Exception:
             return []
 
@@ -617,7 +746,23 @@ class SupportTicketSerializer(serializers.ModelSerializer):
         )
 
     def get_comments_count(self, obj):
-        return obj.comments.count()
+        annotated = getattr(obj, "comments_total", None)
+        if annotated is not None:
+            return annotated
+        # len() reuses prefetch_related("comments"); .count() would always query
+        return len(obj.comments.all())
+
+
+class SupportTicketListSerializer(SupportTicketSerializer):
+    """
+    Flat list rows: no nested comments. Expects the queryset to be annotated
+    with ``comments_total`` and ``last_activity_at`` (see SupportTicketViewSet).
+    """
+    comments = None
+    last_activity_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(SupportTicketSerializer.Meta):
+        fields = tuple(f for f in SupportTicketSerializer.Meta.fields if f != "comments") + ("last_activity_at",)
 
 
 class SupportTicketCreateSerializer(serializers.ModelSerializer):
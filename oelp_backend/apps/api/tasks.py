@@ -0,0 +1,23 @@
+from celery import shared_task
+
+from apps.utils.analytics_utils import refresh_admin_snapshot
+from apps.utils.notification_utils import deliver_notification
+
+from .exports import run_report_export
+
+
+@shared_task(name="reports.render_export")
+def render_report_export(job_id: int) -> None:
+    run_report_export(job_id)
+
+
+@shared_task(name="notifications.fan_out")
+def fan_out_notification(**kwargs) -> int:
+    """Write a large audience's notifications in batches (see send_notification)."""
+    return deliver_notification(**kwargs)
+
+
+@shared_task(name="analytics.refresh_snapshot")
+def refresh_analytics_snapshot() -> None:
+    """Scheduled by CELERY_BEAT_SCHEDULE, and queued by reads that find the snapshot stale."""
+    refresh_admin_snapshot()
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from unittest import mock
+
+from celery import current_app
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.api.tasks import refresh_analytics_snapshot
+from apps.models_app.analytics_snapshot import AnalyticsSnapshot
+from apps.models_app.plan import Plan
+from apps.models_app.user import CustomUser
+from apps.models_app.user_plan import Transaction
+from apps.utils.analytics_utils import refresh_admin_snapshot
+
+
+class AdminAnalyticsSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        admin = CustomUser.objects.create_user(username='analytics-admin', password='testpass', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        self.user = CustomUser.objects.create_user(username='analytics-payer', password='testpass')
+        self.plan = Plan.objects.create(name='Basic', price=100.0, duration=30, type='main')
+        self.url = reverse('admin-analytics')
+
+    def _pay(self, amount, kind='payment'):
+        return Transaction.objects.create(
+            user=self.user, plan=self.plan, amount=amount, currency='INR', status='success', transaction_type=kind,
+        )
+
+    def _get(self):
+        with mock.patch('apps.api.tasks.refresh_analytics_snapshot.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        return resp, delay
+
+    def test_refresh_rolls_up_only_changed_days(self):
+        self._pay(100)
+        self._pay(30, kind='refund')
+        self.assertEqual(refresh_admin_snapshot().data['total_revenue'], 70.0)
+        txn = self._pay(50)
+        snapshot = refresh_admin_snapshot()
+        self.assertEqual(snapshot.data['total_revenue'], 120.0)
+        self.assertEqual(snapshot.data['days_rebuilt'], 1)
+        txn.delete()
+        self.assertEqual(refresh_admin_snapshot().data['total_revenue'], 70.0)
+
+    def test_refreshes_take_the_snapshot_lock(self):
+        refresh_admin_snapshot()
+        with CaptureQueriesContext(connection) as ctx:
+            refresh_admin_snapshot()
+        self.assertTrue(any('FOR UPDATE' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(AnalyticsSnapshot.objects.count(), 1)
+
+    def test_request_serves_the_stored_snapshot(self):
+        self._pay(100)
+        refresh_admin_snapshot()
+        self._pay(40)
+        with CaptureQueriesContext(connection) as ctx:
+            resp, delay = self._get()
+        self.assertEqual(resp.data['stats']['total_revenue'], 100.0)
+        delay.assert_not_called()
+        self.assertFalse([q for q in ctx.captured_queries if 'models_app_transaction' in q['sql']])
+
+    def test_stale_snapshot_queues_one_refresh(self):
+        self._pay(100)
+        refresh_admin_snapshot()
+        AnalyticsSnapshot.objects.update(computed_at=timezone.now() - timedelta(hours=1))
+        self._pay(40)
+        first, delay = self._get()
+        self.assertEqual(first.data['stats']['total_revenue'], 100.0)
+        self.assertEqual(delay.call_count, 1)
+        _, delay = self._get()
+        delay.assert_not_called()
+
+        refresh_analytics_snapshot()
+        resp, delay = self._get()
+        self.assertEqual(resp.data['stats']['total_revenue'], 140.0)
+        delay.assert_not_called()
+
+    def test_first_request_before_any_refresh(self):
+        resp, delay = self._get()
+        self.assertEqual(resp.data['stats']['total_revenue'], 0.0)
+        self.assertIsNone(resp.data['snapshot_at'])
+        self.assertEqual(delay.call_count, 1)
+        self.assertFalse(AnalyticsSnapshot.objects.exists())
+
+    def test_refresh_is_scheduled(self):
+        task = settings.CELERY_BEAT_SCHEDULE['refresh-admin-analytics']['task']
+        self.assertIn(task, current_app.tasks)
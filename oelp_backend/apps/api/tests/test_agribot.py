@@ -0,0 +1,295 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.api.agribot.answers import answer_cache
+from apps.api.agribot import intent
+from apps.api.agribot.budget import build_context, estimate_tokens
+from apps.api.agribot.context import get_farm_context
+from apps.api.agribot.streaming import StreamError
+from apps.api.agribot.turns import finish_turn, start_turn
+from apps.models_app.crop_variety import Crop
+from apps.models_app.farm import Farm
+from apps.models_app.feature import Feature, FeatureType
+from apps.models_app.management.commands.benchmark_agribot_intents import load_benchmark
+from apps.models_app.feature_plan import PlanFeature
+from apps.models_app.field import CropLifecycleDates, Field, FieldIrrigationMethod
+from apps.models_app.irrigation import IrrigationMethods
+from apps.models_app.plan import Plan
+from apps.models_app.token import UserAuthToken
+from apps.models_app.user import CustomUser
+from apps.models_app.user_plan import PlanFeatureUsage, UserPlan
+
+
+class AgribotTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        answer_cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='farmer', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        feature_type, _ = FeatureType.objects.get_or_create(name='AI')
+        feature, _ = Feature.objects.get_or_create(name='AI Assistant', defaults={'feature_type': feature_type})
+        plan, _ = Plan.objects.get_or_create(name='Agribot Enterprise', defaults={'type': 'enterprise', 'duration': 30})
+        PlanFeature.objects.get_or_create(plan=plan, feature=feature, defaults={'max_count': 0, 'duration_days': 30})
+        UserPlan.objects.create(
+            user=self.user, plan=plan, start_date=date.today(), end_date=date.today() + timedelta(days=30),
+            expire_at=timezone.now() + timedelta(days=30),
+        )
+        self.farm = Farm.objects.create(name='Home', user=self.user)
+        self.crop, _ = Crop.objects.get_or_create(name='Agribot Wheat')
+        self.method = IrrigationMethods.objects.create(name='Drip')
+
+    def _make_fields(self, count):
+        for _ in range(count):
+            field = Field.objects.create(
+                name=f'Plot {Field.objects.count()}', farm=self.farm, crop=self.crop,
+                user=self.user, area={'hectares': 1},
+            )
+            FieldIrrigationMethod.objects.create(field=field, irrigation_method=self.method)
+            CropLifecycleDates.objects.create(field=field, sowing_date=date(2025, 1, 1))
+
+    def _use_topup_plan(self):
+        topup, _ = Plan.objects.get_or_create(name='Agribot TopUp', defaults={'type': 'topup', 'duration': 30})
+        PlanFeature.objects.get_or_create(plan=topup, feature=Feature.objects.get(name='AI Assistant'),
+                                          defaults={'max_count': 8, 'duration_days': 1})
+        UserPlan.objects.filter(user=self.user).update(plan=topup)
+        cache.clear()
+
+    def _ask(self, message):
+        return self.client.post(reverse('agribot'), {'message': message}, format='json')
+
+
+class FarmContextCacheTest(AgribotTestCase):
+    def test_context_build_query_count_is_constant(self):
+        self._make_fields(2)
+        with CaptureQueriesContext(connection) as small:
+            get_farm_context(self.user)
+        cache.clear()
+        self._make_fields(15)
+        with CaptureQueriesContext(connection) as large:
+            context = get_farm_context(self.user)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(context['total_fields'], 17)
+        self.assertEqual(context['fields'][0]['irrigation_method'], 'Drip')
+
+    def test_repeat_turns_reuse_context(self):
+        self._make_fields(3)
+        with mock.patch('apps.api.views.dispatch', return_value=('Sure.', None)) as dispatch:
+            self.assertEqual(self._ask('what crops am I growing?').data['response'], 'Sure.')
+            with CaptureQueriesContext(connection) as ctx:
+                self._ask('how is my field doing?')
+        self.assertEqual(len(ctx), 0)
+        self.assertIn('Plot 2', dispatch.call_args.args[0])
+
+    def test_signals_drop_stale_context(self):
+        self._make_fields(1)
+        self.assertEqual(get_farm_context(self.user)['total_fields'], 1)
+        self._make_fields(1)
+        self.assertEqual(get_farm_context(self.user)['total_fields'], 2)
+        FieldIrrigationMethod.objects.filter(field__user=self.user).delete()
+        self.assertIsNone(get_farm_context(self.user)['fields'][0]['irrigation_method'])
+        Crop.objects.create(name='Agribot Barley')
+        self.assertIn('Agribot Barley', get_farm_context(self.user)['all_available_crops'])
+        UserPlan.objects.filter(user=self.user).update(is_active=False)
+        UserPlan.objects.filter(user=self.user).first().save()
+        self.assertEqual(self._ask('crop tips').status_code, 403)
+
+
+class AnswerCacheTest(AgribotTestCase):
+    def setUp(self):
+        super().setUp()
+        self._use_topup_plan()
+
+    def test_general_answer_is_shared_and_free(self):
+        with mock.patch('apps.api.views.dispatch', return_value=('Sow early.', None)) as dispatch:
+            first = self._ask('Tips for growing wheat?')
+            with CaptureQueriesContext(connection) as ctx:
+                again = self._ask('tips for  growing WHEAT')
+        self.assertEqual(first.data['remaining'], 7)
+        self.assertEqual(again.data, {'response': 'Sow early.', 'cached': True})
+        self.assertEqual(len(ctx), 0)
+        self.assertEqual(dispatch.call_count, 1)
+        # the shared answer was generated without this farmer's data
+        self.assertNotIn('FARM STATISTICS', dispatch.call_args.args[0])
+        self.assertEqual(PlanFeatureUsage.objects.get().used_count, 1)
+        self.assertEqual(answer_cache.stats()['hits'], 1)
+
+    def test_farm_specific_answers_are_not_cached(self):
+        self._make_fields(1)
+        with mock.patch('apps.api.views.dispatch', return_value=('Wheat.', None)) as dispatch:
+            self._ask('what crops am I growing?')
+            self._ask('what crops am I growing?')
+        self.assertEqual(dispatch.call_count, 2)
+        self.assertIn('Plot 0', dispatch.call_args.args[0])
+        self.assertEqual(PlanFeatureUsage.objects.get().used_count, 2)
+
+    def test_failed_answers_are_not_cached(self):
+        with mock.patch('apps.api.views.dispatch', return_value=(None, 'service_unavailable')):
+            self.assertEqual(self._ask('best irrigation for rice').data['error'], 'service_unavailable')
+        self.assertEqual(len(answer_cache), 0)
+
+    def test_overlapping_turns_are_both_counted(self):
+        self._make_fields(1)
+        first = start_turn(self.user, 'what crops am I growing?')
+        second = start_turn(self.user, 'how big is my farm?')
+        self.assertEqual(finish_turn(first, 'Wheat.'), 7)
+        self.assertEqual(finish_turn(second, 'One acre.'), 6)
+        self.assertEqual(PlanFeatureUsage.objects.get().used_count, 2)
+
+    def test_overlapping_turns_stop_at_the_limit(self):
+        self._make_fields(1)
+        first = start_turn(self.user, 'what crops am I growing?')
+        second = start_turn(self.user, 'how big is my farm?')
+        PlanFeatureUsage.objects.update(used_count=7)
+        self.assertEqual(finish_turn(first, 'Wheat.'), 0)
+        self.assertEqual(finish_turn(second, 'One acre.'), 0)
+        self.assertEqual(PlanFeatureUsage.objects.get().used_count, 8)
+
+
+def fake_stream(*chunks, error=None):
+    async def stream(system_prompt, message):
+        for chunk in chunks:
+            yield chunk
+        if error:
+            raise StreamError(error)
+    return stream
+
+
+class AgribotStreamTest(AgribotTestCase):
+    def setUp(self):
+        super().setUp()
+        UserAuthToken.objects.create(user=self.user, access_token='stream-token')
+        self._use_topup_plan()
+
+    async def _stream(self, message):
+        response = await self.async_client.post(
+            reverse('agribot-stream'), {'message': message}, content_type='application/json',
+            headers={'Authorization': 'Token stream-token'},
+        )
+        if not response.streaming:
+            return response, None
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        return response, body
+
+    async def test_tokens_are_relayed_and_usage_booked(self):
+        with mock.patch('apps.api.agribot.views.stream_reply', fake_stream('Sow ', 'early.')):
+            response, body = await self._stream('tips for growing wheat')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('event: token\ndata: {"text": "Sow "}', body)
+        self.assertIn('event: done\ndata: {"remaining": 7}', body)
+        self.assertEqual((await PlanFeatureUsage.objects.aget()).used_count, 1)
+        self.assertEqual(answer_cache.get((False, 'tips for growing wheat')), 'Sow early.')
+
+    async def test_failed_stream_is_not_booked(self):
+        with mock.patch('apps.api.agribot.views.stream_reply', fake_stream('Sow ', error='timeout_error')):
+            _, body = await self._stream('tips for growing wheat')
+        self.assertIn('event: error', body)
+        self.assertIn('timeout_error', body)
+        self.assertEqual((await PlanFeatureUsage.objects.aget()).used_count, 0)
+
+    async def test_off_topic_short_circuits(self):
+        with mock.patch('apps.api.agribot.views.stream_reply') as stream:
+            response, _ = await self._stream('tell me a joke')
+        self.assertEqual(response.json()['error'], 'off_topic')
+        stream.assert_not_called()
+
+    async def test_requires_token(self):
+        response = await self.async_client.post(reverse('agribot-stream'), {'message': 'wheat'},
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+
+class IntentRouterTest(SimpleTestCase):
+    def test_benchmark_accuracy(self):
+        rows = load_benchmark()
+        for label in (intent.OFF_TOPIC, intent.GENERAL, intent.FARM_SPECIFIC):
+            labeled = [row for row in rows if row['intent'] == label]
+            correct = sum(intent.classify(row['message']) == label for row in labeled)
+            self.assertGreaterEqual(correct / len(labeled), 0.9, label)
+        correct = sum(intent.classify(row['message']) == row['intent'] for row in rows)
+        self.assertGreaterEqual(correct / len(rows), 0.95)
+
+    def test_token_boundaries(self):
+        # "plan" is not "plant", and a power plant is not agriculture
+        self.assertEqual(intent.classify('what is a business plan'), intent.OFF_TOPIC)
+        self.assertEqual(intent.classify('power plant jobs'), intent.OFF_TOPIC)
+        self.assertEqual(intent.classify('Tomatoes keep splitting'), intent.GENERAL)
+
+    def test_farming_nouns_alone_are_on_topic(self):
+        for message in ('What should I plant this month?', 'Is organic better?', 'what is the rainfall forecast'):
+            self.assertEqual(intent.classify(message), intent.GENERAL, message)
+        self.assertEqual(intent.classify("what's the best season to visit Goa"), intent.OFF_TOPIC)
+
+    def test_asking_how_is_not_farm_specific(self):
+        self.assertEqual(intent.classify('how do I grow beans'), intent.GENERAL)
+        self.assertEqual(intent.classify('do I have any inactive fields?'), intent.FARM_SPECIFIC)
+
+
+class IntentRoutingTest(AgribotTestCase):
+    def test_general_question_skips_farm_context(self):
+        self._make_fields(3)
+        with mock.patch('apps.api.views.dispatch', return_value=('Rotate crops.', None)) as dispatch, \
+                CaptureQueriesContext(connection) as ctx:
+            self._ask('how to improve soil nitrogen naturally')
+        self.assertFalse(any('models_app_field' in q['sql'] for q in ctx.captured_queries))
+        self.assertNotIn('Plot 0', dispatch.call_args.args[0])
+
+    def test_farm_question_sends_farm_context(self):
+        self._make_fields(1)
+        with mock.patch('apps.api.views.dispatch', return_value=('One.', None)) as dispatch:
+            self._ask('how many fields do I have?')
+        self.assertIn('Plot 0', dispatch.call_args.args[0])
+
+
+def farm_data(n_fields, crops=('Wheat', 'Rice', 'Cotton')):
+    fields = [
+        {
+            'name': f'Plot {i}', 'farm': 'Home', 'crop': crops[i % len(crops)], 'crop_variety': None,
+            'soil_type': 'Black Soil' if i == 7 else 'Loam', 'irrigation_method': 'Drip', 'size_acres': 2.47,
+            'location': None, 'is_active': True, 'sowing_date': None, 'harvesting_date': None,
+        }
+        for i in range(n_fields)
+    ]
+    return {
+        'user': {'name': 'Farmer', 'email': ''},
+        'subscription': {'plan_name': 'Enterprise', 'features': ['AI Assistant']},
+        'farms': [{'id': 1, 'name': 'Home'}],
+        'fields': fields,
+        'total_acres': round(2.47 * n_fields, 2),
+        'crops_growing': sorted(set(crops)),
+        'all_available_crops': [f'Crop {i}' for i in range(200)] + ['Sorghum'],
+        'total_fields': n_fields,
+        'active_fields': n_fields,
+    }
+
+
+class ContextBudgetTest(SimpleTestCase):
+    def test_budget_is_respected(self):
+        prompt, used = build_context(farm_data(300), 'how are my fields doing?', budget=800)
+        self.assertLessEqual(used, 800)
+        self.assertIn('less relevant fields not shown', prompt)
+        big_prompt, big_used = build_context(farm_data(300), 'how are my fields doing?', budget=4000)
+        self.assertGreater(big_used, used)
+        self.assertGreater(estimate_tokens(big_prompt), estimate_tokens(prompt))
+
+    def test_mentioned_field_and_crop_rank_first(self):
+        prompt, _ = build_context(farm_data(300), 'when should I water plot 250 and is sorghum an option?', budget=600)
+        self.assertIn('Field #1: "Plot 250"', prompt)
+        self.assertIn('=== AVAILABLE CROPS IN SYSTEM ===\nSorghum', prompt)
+
+    def test_attribute_mentions_rank_fields(self):
+        prompt, _ = build_context(farm_data(50), 'is my black soil field ok?', budget=600)
+        self.assertIn('Field #1: "Plot 7"', prompt)
+
+    def test_small_farm_is_sent_whole(self):
+        prompt, _ = build_context(farm_data(3), 'list my fields')
+        for i in range(3):
+            self.assertIn(f'"Plot {i}"', prompt)
+        self.assertNotIn('not shown', prompt)
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from apps.api.agribot import providers
+from apps.api.agribot.streaming import StreamError, stream_reply
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # model name -> (status, body, delay seconds); set per test
+    routes = {}
+    calls = []
+    # seconds between streamed events
+    event_delay = 0
+
+    def do_POST(self):
+        try:
+            self._respond()
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up on this call (hedged or past its deadline)
+            pass
+
+    def _respond(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        model = body.get('model') or self.path.split('/models/', 1)[-1]
+        self.calls.append(model)
+        status, payload, delay = self.routes.get(model, (404, {}, 0))
+        time.sleep(delay)
+        if body.get('stream') and status == 200:
+            text = payload['choices'][0]['message']['content']
+            events = [{'choices': [{'delta': {'content': word}}]} for word in text.split(' ')]
+            chunks = [f'data: {json.dumps(event)}\n\n'.encode() for event in events] + [b'data: [DONE]\n\n']
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Content-Length', str(sum(len(chunk) for chunk in chunks)))
+            self.end_headers()
+            for chunk in chunks:
+                self.wfile.write(chunk)
+                self.wfile.flush()
+                time.sleep(self.event_delay)
+            return
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def chat(text):
+    return (200, {'choices': [{'message': {'content': text}}]}, 0)
+
+
+class ProviderDispatchTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        # httpx logs every request at INFO
+        httpx_logger = logging.getLogger('httpx')
+        self.addCleanup(httpx_logger.setLevel, httpx_logger.level)
+        httpx_logger.setLevel(logging.WARNING)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        StubHandler.calls = []
+        StubHandler.event_delay = 0
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        stub = override_settings(
+            AGRIBOT_GROQ_URL=url, AGRIBOT_OPENAI_URL=url,
+            AGRIBOT_DEADLINE=2, AGRIBOT_HEDGE_DELAY=0.2,
+        )
+        stub.enable()
+        self.addCleanup(stub.disable)
+        keys = mock.patch.dict(os.environ, {'GROQ_API_KEY': 'k', 'OPENAI_API_KEY': 'k'})
+        keys.start()
+        self.addCleanup(keys.stop)
+        for name in ('HUGGINGFACE_API_KEY', 'HF_API_KEY', 'OPENAI_KEY'):
+            os.environ.pop(name, None)
+
+    def test_gone_model_trips_breaker(self):
+        StubHandler.routes = {'llama-3.2-3b-preview': chat('Hi from Groq.')}
+        self.assertEqual(providers.dispatch('system', 'hello'), ('Hi from Groq.', None))
+        self.assertIn('llama-3.1-8b-instant', StubHandler.calls)
+        StubHandler.calls = []
+        providers.dispatch('system', 'hello')
+        # the 404 model is skipped until its cooldown passes
+        self.assertNotIn('llama-3.1-8b-instant', StubHandler.calls)
+
+    def test_slow_model_is_hedged(self):
+        StubHandler.routes = {
+            'llama-3.1-8b-instant': (200, chat('slow')[1], 1.5),
+            'llama-3.2-3b-preview': chat('fast'),
+        }
+        started = time.monotonic()
+        self.assertEqual(providers.dispatch('system', 'hello'), ('fast', None))
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_overall_deadline(self):
+        slow = (200, chat('late')[1], 3)
+        StubHandler.routes = {model: slow for model in ('llama-3.1-8b-instant', 'llama-3.2-3b-preview',
+                                                        'mixtral-8x7b-32768', 'gpt-3.5-turbo')}
+        started = time.monotonic()
+        self.assertEqual(providers.dispatch('system', 'hello'), (None, providers.TIMEOUT_ERROR))
+        self.assertLess(time.monotonic() - started, 2.5)
+
+    def test_quota_errors_reported(self):
+        quota = (429, {'error': {'message': 'You exceeded your quota'}}, 0)
+        StubHandler.routes = {model: quota for model in ('llama-3.1-8b-instant', 'llama-3.2-3b-preview',
+                                                         'mixtral-8x7b-32768', 'gpt-3.5-turbo')}
+        self.assertEqual(providers.dispatch('system', 'hello'), (None, providers.QUOTA_EXCEEDED))
+
+    def test_no_keys_configured(self):
+        with mock.patch.dict(os.environ, {'GROQ_API_KEY': '', 'OPENAI_API_KEY': ''}):
+            self.assertEqual(providers.dispatch('system', 'hello'), (None, providers.CONFIG_ERROR))
+
+    async def test_stream_relays_chunks(self):
+        StubHandler.routes = {'llama-3.2-3b-preview': chat('Water at dawn.')}
+        chunks = [chunk async for chunk in stream_reply('system', 'hello')]
+        self.assertEqual(chunks, ['Water', 'at', 'dawn.'])
+        self.assertIsNotNone(cache.get('agribot-breaker:groq:llama-3.1-8b-instant'))
+
+    async def test_stream_reports_quota(self):
+        quota = (400, {'error': {'message': 'billing hard limit reached'}}, 0)
+        StubHandler.routes = {model: quota for model in ('llama-3.1-8b-instant', 'llama-3.2-3b-preview',
+                                                         'mixtral-8x7b-32768', 'gpt-3.5-turbo')}
+        with self.assertRaises(StreamError) as raised:
+            [chunk async for chunk in stream_reply('system', 'hello')]
+        self.assertEqual(raised.exception.code, providers.QUOTA_EXCEEDED)
+
+    async def test_trickling_stream_stops_at_the_deadline(self):
+        # every event arrives well within the per-read timeout, the whole reply does not
+        StubHandler.event_delay = 0.5
+        StubHandler.routes = {'llama-3.2-3b-preview': chat('one two three four five six seven eight')}
+        chunks = []
+        started = time.monotonic()
+        with self.assertRaises(StreamError) as raised:
+            async for chunk in stream_reply('system', 'hello'):
+                chunks.append(chunk)
+        self.assertEqual(raised.exception.code, providers.TIMEOUT_ERROR)
+        self.assertLess(time.monotonic() - started, 2.5)
+        self.assertTrue(0 < len(chunks) < 8)
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.models_app.farm import Farm
+from apps.models_app.field import Field
+from apps.models_app.notifications import BroadcastNotification, BroadcastReceipt, Notification
+from apps.models_app.user import CustomUser, Role, UserRole
+from apps.utils.notification_utils import send_notification
+
+
+@override_settings(NOTIFICATION_BROADCAST_THRESHOLD=3)
+class BroadcastNotificationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = self._user('bc-admin', 'Admin')
+        self.farmers = [self._user(f'bc-farmer-{i}', 'End-App-User') for i in range(3)]
+        self.farmer = self.farmers[0]
+        self.client.force_authenticate(user=self.farmer)
+
+    def _user(self, username, *roles):
+        user = CustomUser.objects.create_user(username=username, password='testpass')
+        for name in roles:
+            UserRole.objects.create(user=user, role=Role.objects.get_or_create(name=name)[0])
+        return user
+
+    def _broadcast(self, message='Rain expected', **kwargs):
+        sent, summary = send_notification(self.admin, message, ['End-App-User'], **kwargs)
+        return summary
+
+    def _feed(self, **params):
+        return self.client.get(reverse('notification-list'), params)
+
+    def test_large_audience_is_one_row(self):
+        summary = self._broadcast()
+        self.assertTrue(summary['broadcast'])
+        self.assertEqual(summary['sent'], 3)
+        self.assertEqual(Notification.objects.count(), 0)
+        broadcast = BroadcastNotification.objects.get()
+        self.assertEqual([r.name for r in broadcast.roles.all()], ['End-App-User'])
+        self.assertEqual(broadcast.audience_size, 3)
+
+    def test_small_audience_writes_rows(self):
+        send_notification(self.admin, 'hello', ['Admin'])
+        self.assertEqual(Notification.objects.filter(receiver=self.admin).count(), 1)
+        self.assertFalse(BroadcastNotification.objects.exists())
+
+    def test_feed_merges_direct_and_broadcast(self):
+        Notification.objects.create(sender=self.admin, receiver=self.farmer, message='direct')
+        self._broadcast()
+        resp = self._feed()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['count'], 2)
+        first, second = resp.data['results']
+        self.assertEqual(first['message'], 'Rain expected')
+        self.assertEqual(first['id'], f'b-{BroadcastNotification.objects.get().pk}')
+        self.assertTrue(first['broadcast'])
+        self.assertEqual(first['receiver_roles'], ['End-App-User'])
+        self.assertEqual(second['message'], 'direct')
+
+    def test_merged_pages(self):
+        now = timezone.now()
+        for i in range(3):
+            self._broadcast(f'broadcast {i}')
+            Notification.objects.create(sender=self.admin, receiver=self.farmer, message=f'direct {i}')
+        # Interleave by timestamp: broadcast i lands just after direct i
+        for i, n in enumerate(Notification.objects.order_by('id')):
+            Notification.objects.filter(pk=n.pk).update(created_at=now + timedelta(minutes=2 * i))
+        for i, b in enumerate(BroadcastNotification.objects.order_by('id')):
+            BroadcastNotification.objects.filter(pk=b.pk).update(created_at=now + timedelta(minutes=2 * i + 1))
+        pages = [self._feed(page_size=4, page=1).data, self._feed(page_size=4, page=2).data]
+        self.assertIsNotNone(pages[0]['next'])
+        self.assertIsNone(pages[1]['next'])
+        self.assertIsNotNone(pages[1]['previous'])
+        messages = [item['message'] for page in pages for item in page['results']]
+        self.assertEqual(messages, [
+            'broadcast 2', 'direct 2', 'broadcast 1', 'direct 1', 'broadcast 0', 'direct 0',
+        ])
+        self.assertEqual(self._feed(page_size=4, page=3).status_code, 404)
+
+    def test_read_state_is_per_user(self):
+        self._broadcast()
+        Notification.objects.create(sender=self.admin, receiver=self.farmer, message='direct')
+        url = reverse('notification-unread-count')
+        self.assertEqual(self.client.get(url).data['count'], 2)
+
+        bid = BroadcastNotification.objects.get().pk
+        resp = self.client.post(reverse('notification-mark-read', args=[f'b-{bid}']))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.client.get(url).data['count'], 1)
+        self.assertEqual(self._feed(unread_only='true').data['count'], 1)
+
+        other = APIClient()
+        other.force_authenticate(user=self.farmers[1])
+        self.assertEqual(other.get(url).data['count'], 1)
+
+    def test_mark_all_read(self):
+        self._broadcast('one')
+        self._broadcast('two')
+        BroadcastReceipt.objects.create(
+            broadcast=BroadcastNotification.objects.get(message='one'), user=self.farmer, is_read=False,
+        )
+        Notification.objects.create(sender=self.admin, receiver=self.farmer, message='direct')
+        resp = self.client.post(reverse('notification-mark-all-read'))
+        self.assertEqual(resp.data['detail'], '3 notifications marked as read')
+        self.assertEqual(self.client.get(reverse('notification-unread-count')).data['count'], 0)
+        self.assertEqual(BroadcastReceipt.objects.filter(user=self.farmer, is_read=True).count(), 2)
+
+    def test_dismiss_hides_broadcast(self):
+        self._broadcast()
+        bid = BroadcastNotification.objects.get().pk
+        resp = self.client.post(reverse('notification-dismiss', args=[f'b-{bid}']))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._feed().data['count'], 0)
+        direct = Notification.objects.create(sender=self.admin, receiver=self.farmer, message='direct')
+        resp = self.client.post(reverse('notification-dismiss', args=[direct.pk]))
+        self.assertEqual(resp.status_code, 400)
+
+    def test_audience_rules(self):
+        # End-user broadcasts skip users who also hold a staff role
+        mixed = self._user('bc-mixed', 'End-App-User', 'Business')
+        self._broadcast()
+        late = self._user('bc-late', 'End-App-User')
+        for user in (mixed, late):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            self.assertEqual(client.get(reverse('notification-list')).data['count'], 0)
+            resp = client.post(reverse('notification-mark-read', args=[f'b-{BroadcastNotification.objects.get().pk}']))
+            self.assertEqual(resp.status_code, 404)
+
+    def test_region_filter(self):
+        farm = Farm.objects.create(user=self.farmer, name='Green acres')
+        Field.objects.create(user=self.farmer, farm=farm, name='North', location_name='Pune district')
+        for farmer in self.farmers[1:]:
+            farm = Farm.objects.create(user=farmer, name='Other')
+            Field.objects.create(user=farmer, farm=farm, name='South', location_name='Pune')
+        self._broadcast(region='pune')
+        self.assertEqual(self._feed().data['count'], 1)
+        BroadcastNotification.objects.update(region='Nashik')
+        self.assertEqual(self._feed().data['count'], 0)
+
+    def test_sender_sees_sent_broadcast(self):
+        self._broadcast()
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        resp = client.get(reverse('notification-center-list'), {'type': 'sent'})
+        self.assertEqual(resp.data['count'], 1)
+        self.assertEqual(resp.data['results'][0]['audience_size'], 3)
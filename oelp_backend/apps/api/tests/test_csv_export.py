@@ -0,0 +1,107 @@
+import csv
+import io
+import warnings
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.signals import request_started
+from django.db import close_old_connections, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.models_app.farm import Farm
+from apps.models_app.field import Field, FieldIrrigationMethod
+from apps.models_app.irrigation import IrrigationMethods
+from apps.models_app.soil_report import SoilReport, SoilTexture
+from apps.models_app.token import UserAuthToken
+from apps.models_app.user import CustomUser
+
+class CSVExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='exportuser', password='testpass')
+        UserAuthToken.objects.create(user=self.user, access_token='export-token')
+        self.farm = Farm.objects.create(name='Farm', user=self.user)
+        self.soil = SoilTexture.objects.create(name='Loam', icon='https://example.com/loam.png')
+        self.method = IrrigationMethods.objects.create(name='Drip')
+
+    def _make_fields(self, count, reports=1):
+        for i in range(count):
+            field = Field.objects.create(
+                name=f'Field {Field.objects.count()}', farm=self.farm, soil_type=self.soil,
+                user=self.user, area={'hectares': 2},
+            )
+            FieldIrrigationMethod.objects.create(field=field, irrigation_method=self.method)
+            for _ in range(reports):
+                SoilReport.objects.create(field=field, ph=6.5, ec=1.1, soil_type=self.soil)
+
+    def _export(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('export-csv'), {'token': 'export-token'})
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(resp.streaming)
+            body = b''.join(resp.streaming_content).decode()
+        return list(csv.reader(io.StringIO(body))), len(ctx)
+
+    def test_rows_and_area_in_acres(self):
+        self._make_fields(1)
+        rows, _ = self._export()
+        header = rows.index(['FIELD DETAILS']) + 1
+        row = dict(zip(rows[header], rows[header + 1]))
+        self.assertEqual(row['Area (Acres)'], '4.94')
+        self.assertEqual(row['Irrigation Method'], 'Drip')
+        self.assertEqual(row['Soil Type'], 'Loam')
+
+    def test_all_soil_reports_exported_with_constant_queries(self):
+        self._make_fields(2)
+        self._export()  # warm the token cache
+        _, small = self._export()
+        self._make_fields(30, reports=2)
+        rows, large = self._export()
+        self.assertEqual(small, large)
+        start = rows.index(['SOIL ANALYSIS REPORTS']) + 2
+        reports = [r for r in rows[start:] if len(r) == 8]
+        self.assertEqual(len(reports), 62)
+
+    def test_failed_section_is_marked_in_the_file(self):
+        self._make_fields(1)
+        with mock.patch('apps.api.exports.export_soil_reports', side_effect=RuntimeError('db gone')), \
+                self.assertLogs('apps.api.exports', 'ERROR'):
+            rows, _ = self._export()
+        self.assertIn(['INCOMPLETE: the soil analysis reports section stopped early because of an error. '
+                       'Please export again.'], rows)
+        self.assertIn(['REPORT INCOMPLETE', 'Sections cut short: soil analysis reports'], rows)
+        self.assertEqual(rows[-1], ['For support, visit: https://oelp.com/support'])
+
+    def test_requires_token(self):
+        resp = self.client.get(reverse('export-csv'))
+        self.assertEqual(resp.status_code, 403)
+
+    def test_asgi_entrypoint_streams_rows(self):
+        from oelp_backend.asgi import application
+
+        self._make_fields(3)
+        # As the test client does: keep the test transaction's connection open
+        request_started.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        scope = {
+            'type': 'http', 'http_version': '1.1', 'method': 'GET', 'path': reverse('export-csv'), 'root_path': '',
+            'query_string': b'token=export-token', 'headers': [], 'server': ('testserver', 80),
+        }
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            sent.append(message)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            async_to_sync(application)(scope, receive, send)
+        self.assertEqual(sent[0]['status'], 200)
+        # Django's ASGI handler warns when it has to read a sync iterator whole
+        self.assertFalse([w for w in caught if 'must consume synchronous iterators' in str(w.message)])
+        bodies = [m for m in sent if m['type'] == 'http.response.body' and m.get('body')]
+        self.assertGreater(len(bodies), 10)
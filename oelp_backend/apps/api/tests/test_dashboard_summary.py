@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from apps.models_app.dashboard_summary import DashboardSummary
+from apps.models_app.farm import Farm
+from apps.models_app.field import Field, FieldIrrigationPractice
+from apps.models_app.irrigation import IrrigationMethods
+from apps.models_app.user import CustomUser
+from apps.utils.dashboard_utils import get_dashboard_summary
+
+
+class DashboardSummaryTest(TestCase):
+    def setUp(self):
+        self.method = IrrigationMethods.objects.create(name='Drip')
+        self.fields = []
+        for name in ('ds-a', 'ds-b'):
+            user = CustomUser.objects.create_user(username=name, password='testpass')
+            farm = Farm.objects.create(name='Farm', user=user)
+            self.fields.append(Field.objects.create(name=name, farm=farm, user=user, area={'hectares': 2}))
+
+    def _global(self):
+        return DashboardSummary.objects.get(scope=DashboardSummary.GLOBAL)
+
+    def test_existing_data_without_summary_rows(self):
+        # As after migrating a database that already has fields
+        DashboardSummary.objects.all().delete()
+        summary = get_dashboard_summary(None, privileged=True)
+        self.assertEqual((summary.active_fields, summary.total_hectares), (2, 4.0))
+        self.assertEqual(DashboardSummary.objects.exclude(scope=DashboardSummary.GLOBAL).count(), 2)
+        self.assertEqual(get_dashboard_summary(None, privileged=True).pk, summary.pk)
+
+        # The owner's next change is folded in once, not on top of totals already counted
+        first = self.fields[0]
+        Field.objects.create(name='ds-a2', farm=first.farm, user=first.user, area={'hectares': 1})
+        self.assertEqual(self._global().active_fields, Field.objects.filter(is_active=True).count())
+        self.assertEqual(self._global().total_hectares, 5.0)
+
+    def test_latest_practice_follows_deletes(self):
+        get_dashboard_summary(None, privileged=True)
+        now = timezone.now()
+        older = FieldIrrigationPractice.objects.create(
+            field=self.fields[0], irrigation_method=self.method, performed_at=now - timedelta(days=2)
+        )
+        newer = FieldIrrigationPractice.objects.create(
+            field=self.fields[1], irrigation_method=self.method, performed_at=now
+        )
+        self.assertEqual(self._global().last_practice_at, newer.performed_at)
+        newer.delete()
+        self.assertEqual(self._global().last_practice_at, older.performed_at)
+        older.delete()
+        self.assertIsNone(self._global().last_practice_at)
@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase, TestCase
+from apps.models_app.management.commands.benchmark_endpoints import (
+    ENDPOINTS,
+    PROFILES,
+    SKIPPED,
+    api_routes,
+    compare,
+    load_baseline,
+    run_benchmark,
+)
+
+
+class EndpointCatalogueTest(SimpleTestCase):
+    def test_every_route_is_benchmarked_or_skipped(self):
+        benchmarked = {ep['route'] for ep in ENDPOINTS}
+        routes = api_routes()
+        self.assertEqual(routes - benchmarked - set(SKIPPED), set(), 'add these routes to ENDPOINTS (or SKIPPED)')
+        self.assertEqual((benchmarked | set(SKIPPED)) - routes, set())
+        self.assertEqual(benchmarked & set(SKIPPED), set())
+
+    def test_keys_are_unique(self):
+        keys = [ep['key'] for ep in ENDPOINTS]
+        self.assertEqual(len(keys), len(set(keys)))
+
+
+class EndpointBaselineTest(TestCase):
+    """
+    Every endpoint against the committed 'test' baseline: no more queries,
+    no N+1 growth when the data doubles, and wall time and heap within the
+    ENDPOINT_BENCHMARK_* tolerances. Refresh the baseline with
+    ``manage.py benchmark_endpoints --profile test --update-baseline``.
+    """
+
+    def test_within_baseline(self):
+        baseline = load_baseline()['test']
+        self.assertEqual(baseline['volumes'], PROFILES['test'], 'baseline was recorded with other volumes')
+        results, grown = run_benchmark(PROFILES['test'], repeat=3)
+        failures = compare(results, grown, baseline['endpoints'])
+        self.assertEqual(failures, [], '\n'.join(failures))
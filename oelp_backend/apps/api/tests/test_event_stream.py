@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from apps.models_app.notifications import Notification
+from apps.models_app.support_ticket import SupportTicket
+from apps.models_app.token import UserAuthToken
+from apps.models_app.user import CustomUser
+from apps.utils.event_bus import EVERYONE, InProcessBus
+
+
+class InProcessBusTest(SimpleTestCase):
+    async def test_publish_reaches_subscribers(self):
+        bus = InProcessBus()
+        first, second = await bus.subscribe(1), await bus.subscribe(2)
+        # producers run in worker threads
+        thread = threading.Thread(target=bus.publish, args=([1], {'type': 'unread'}))
+        thread.start()
+        thread.join()
+        self.assertEqual(await asyncio.wait_for(first.get(), 1), {'type': 'unread'})
+        self.assertTrue(second.queue.empty())
+
+        bus.publish([EVERYONE], {'type': 'broadcast', 'id': 7})
+        for subscription in (first, second):
+            self.assertEqual((await asyncio.wait_for(subscription.get(), 1))['id'], 7)
+
+        await bus.unsubscribe(first)
+        self.assertEqual(bus.connected(), 1)
+
+    @override_settings(EVENT_STREAM_QUEUE_SIZE=2)
+    async def test_slow_client_drops_events(self):
+        bus = InProcessBus()
+        subscription = await bus.subscribe(1)
+        for i in range(5):
+            bus.publish([1], {'type': 'unread', 'n': i})
+        await asyncio.sleep(0)
+        self.assertEqual(subscription.queue.qsize(), 2)
+
+
+@override_settings(EVENT_STREAM_MAX_AGE=1, EVENT_STREAM_HEARTBEAT=1)
+class EventStreamTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.bus = InProcessBus()
+        patcher = mock.patch('apps.api.events.get_bus', return_value=self.bus)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = CustomUser.objects.create_user(username='stream-user', password='testpass')
+        UserAuthToken.objects.create(user=self.user, access_token='events-token')
+
+    async def test_stream_relays_events(self):
+        response = await self.async_client.get(reverse('event-stream'), {'token': 'events-token'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content
+        self.assertTrue((await chunks.__anext__()).startswith(b'retry:'))
+        self.assertIn(b'"count": 0', await chunks.__anext__())
+
+        self.bus.publish([self.user.pk], {'type': 'ticket', 'ticket': {'id': 3, 'status': 'resolved'}})
+        await sync_to_async(Notification.objects.create)(receiver=self.user, message='hello')
+        self.bus.publish([self.user.pk], {'type': 'unread'})
+        body = ''.join([chunk.decode() async for chunk in chunks])
+        self.assertIn('event: ticket_status\ndata: {"id": 3, "status": "resolved"}', body)
+        self.assertIn('event: unread_count\ndata: {"count": 1}', body)
+        # the stream ended at EVENT_STREAM_MAX_AGE and let go of its subscription
+        self.assertEqual(self.bus.connected(), 0)
+
+    async def test_requires_token(self):
+        response = await self.async_client.get(reverse('event-stream'))
+        self.assertEqual(response.status_code, 401)
+
+
+class EventPublishingTest(TestCase):
+    def setUp(self):
+        self.bus = mock.Mock()
+        patcher = mock.patch('apps.utils.event_bus.get_bus', return_value=self.bus)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = CustomUser.objects.create_user(username='publish-user', password='testpass')
+
+    def _published(self):
+        return [(list(call.args[0]), call.args[1]['type']) for call in self.bus.publish.call_args_list]
+
+    def test_new_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(receiver=self.user, message='hello')
+        self.assertEqual(self._published(), [([self.user.pk], 'notification'), ([self.user.pk], 'unread')])
+        message = self.bus.publish.call_args_list[0].args[1]
+        self.assertEqual(message['notification']['message'], 'hello')
+
+    def test_ticket_status_change(self):
+        support = CustomUser.objects.create_user(username='publish-support', password='testpass')
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = SupportTicket.objects.create(title='Pump', description='Broken', created_by=self.user)
+        self.bus.publish.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.priority = 'high'
+            ticket.save()
+        self.assertEqual(self._published(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.assigned_to_support = support
+            ticket.status = 'assigned'
+            ticket.save(update_fields=['assigned_to_support', 'status', 'updated_at'])
+        self.assertEqual(self._published(), [([self.user.pk, support.pk], 'ticket')])
+        event = self.bus.publish.call_args.args[1]['ticket']
+        self.assertEqual((event['status'], event['previous_status']), ('assigned', 'open'))
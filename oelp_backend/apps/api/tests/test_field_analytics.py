@@ -0,0 +1,127 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.models_app.crop_variety import Crop
+from apps.models_app.farm import Farm
+from apps.models_app.field import CropLifecycleDates, Field, FieldIrrigationMethod, FieldIrrigationPractice
+from apps.models_app.irrigation import IrrigationMethods
+from apps.models_app.user import CustomUser
+from apps.utils.analytics_utils import compute_field_analytics, get_field_analytics
+
+
+def per_field_numbers(fields):
+    """The figures as AnalyticsSummaryView computed them before, one query per breakdown."""
+    def ranked(qs, key, default):
+        return {(row[key] or default): row['cnt'] for row in qs.values(key).annotate(cnt=Count('id'))}
+
+    irrigation = ranked(FieldIrrigationMethod.objects.filter(field__in=fields), 'irrigation_method__name', 'Unspecified')
+    if not irrigation:
+        irrigation = ranked(FieldIrrigationPractice.objects.filter(field__in=fields), 'irrigation_method__name',
+                            'Unspecified')
+    lifecycle = CropLifecycleDates.objects.filter(field__in=fields)
+    return {
+        'crops': ranked(fields, 'crop__name', 'Unassigned'),
+        'regions': ranked(fields, 'location_name', 'Unknown'),
+        'irrigation': irrigation,
+        'lifecycle': (lifecycle.filter(harvesting_date__isnull=False).count(), lifecycle.count()),
+    }
+
+
+def as_numbers(data):
+    def by_name(rows):
+        return {row['name']: row['value'] for row in rows}
+
+    completed, remaining = (row['value'] for row in data['lifecycle_completion'])
+    return {
+        'crops': by_name(data['crop_distribution']),
+        'regions': by_name(data['region_distribution']),
+        'irrigation': by_name(data['irrigation_distribution']),
+        'lifecycle': (completed, completed + remaining),
+    }
+
+
+class FieldAnalyticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.drip = IrrigationMethods.objects.create(name='Drip')
+        self.flood = IrrigationMethods.objects.create(name='Flood')
+        self.wheat, _ = Crop.objects.get_or_create(name='Analytics Wheat')
+        self.rice, _ = Crop.objects.get_or_create(name='Analytics Rice')
+        self.owner = CustomUser.objects.create_user(username='analytics-owner', password='testpass')
+        self.other = CustomUser.objects.create_user(username='analytics-other', password='testpass')
+
+    def _field(self, user, crop=None, location=None, cycles=(), method=None):
+        farm = Farm.objects.create(name='Farm', user=user)
+        field = Field.objects.create(
+            name=f'Plot {Field.objects.count()}', farm=farm, user=user, crop=crop, location_name=location,
+        )
+        for harvested in cycles:
+            CropLifecycleDates.objects.create(
+                field=field, sowing_date=date(2025, 1, 1), harvesting_date=date(2025, 5, 1) if harvested else None,
+            )
+        if method:
+            FieldIrrigationMethod.objects.create(field=field, irrigation_method=method)
+        return field
+
+    def _seed(self):
+        self._field(self.owner, self.wheat, 'North', cycles=(True, False, True), method=self.drip)
+        self._field(self.owner, self.wheat, None, cycles=(False,), method=self.drip)
+        self._field(self.owner, None, 'North', method=self.flood)
+        self._field(self.other, self.rice, 'South', cycles=(True, True), method=self.flood)
+        self._field(self.other, self.rice, 'South')
+
+    def test_matches_the_per_field_numbers(self):
+        self._seed()
+        for fields in (Field.objects.all(), Field.objects.filter(user=self.owner), Field.objects.none()):
+            self.assertEqual(as_numbers(compute_field_analytics(fields)), per_field_numbers(fields))
+        data = compute_field_analytics(Field.objects.filter(user=self.owner))
+        self.assertEqual(data['lifecycle_completion_percent'], 50)
+        self.assertEqual(data['crop_distribution'][0], {'name': 'Analytics Wheat', 'value': 2})
+
+    def test_practices_are_the_irrigation_fallback(self):
+        field = self._field(self.owner, self.wheat, 'North')
+        FieldIrrigationPractice.objects.create(field=field, irrigation_method=self.flood)
+        fields = Field.objects.filter(user=self.owner)
+        self.assertEqual(compute_field_analytics(fields)['irrigation_distribution'], [{'name': 'Flood', 'value': 1}])
+        self.assertEqual(as_numbers(compute_field_analytics(fields)), per_field_numbers(fields))
+
+    def test_query_count_is_constant(self):
+        self._seed()
+        with self.assertNumQueries(2):
+            compute_field_analytics(Field.objects.all())
+        for _ in range(10):
+            self._field(self.other, self.wheat, 'East', cycles=(True,), method=self.drip)
+        with self.assertNumQueries(2):
+            compute_field_analytics(Field.objects.all())
+
+    def test_cached_summary_follows_field_changes(self):
+        self._seed()
+        self.assertEqual(get_field_analytics(self.owner.pk, privileged=False)['crop_distribution'][0]['value'], 2)
+        self.assertEqual(get_field_analytics(None, privileged=True)['lifecycle_completion_percent'], 67)
+        with self.assertNumQueries(0):
+            get_field_analytics(self.owner.pk, privileged=False)
+            get_field_analytics(None, privileged=True)
+
+        field = self._field(self.owner, self.wheat, 'North', cycles=(False,), method=self.drip)
+        self.assertEqual(get_field_analytics(self.owner.pk, privileged=False)['crop_distribution'][0]['value'], 3)
+        self.assertEqual(get_field_analytics(None, privileged=True)['lifecycle_completion_percent'], 57)
+
+        CropLifecycleDates.objects.filter(field=field).update(harvesting_date=date(2025, 5, 1))
+        CropLifecycleDates.objects.get(field=field).save()
+        self.assertEqual(get_field_analytics(None, privileged=True)['lifecycle_completion_percent'], 71)
+
+        field.delete()
+        numbers = as_numbers(get_field_analytics(self.owner.pk, privileged=False))
+        self.assertEqual(numbers, per_field_numbers(Field.objects.filter(user=self.owner)))
+
+    def test_view_scopes_by_role(self):
+        self._seed()
+        client = APIClient()
+        client.force_authenticate(user=self.other)
+        resp = client.get(reverse('analytics-summary'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['crop_distribution'], [{'name': 'Analytics Rice', 'value': 2}])
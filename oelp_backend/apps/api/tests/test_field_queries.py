@@ -0,0 +1,73 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.models_app.crop_variety import Crop
+from apps.models_app.farm import Farm
+from apps.models_app.field import CropLifecycleDates, Field, FieldIrrigationMethod
+from apps.models_app.irrigation import IrrigationMethods
+from apps.models_app.soil_report import SoilTexture
+from apps.models_app.user import CustomUser
+
+class FieldListQueryCountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='fielduser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.farm = Farm.objects.create(name='Farm', user=self.user)
+        self.crop, _ = Crop.objects.get_or_create(name='Query Count Crop')
+        self.soil = SoilTexture.objects.create(name='Loam', icon='https://example.com/loam.png')
+        self.method = IrrigationMethods.objects.create(name='Drip')
+
+    def _make_fields(self, count):
+        for i in range(count):
+            field = Field.objects.create(
+                name=f'Field {Field.objects.count()}', farm=self.farm, crop=self.crop,
+                soil_type=self.soil, user=self.user, area={'hectares': 1.5},
+            )
+            FieldIrrigationMethod.objects.create(field=field, irrigation_method=self.method)
+            CropLifecycleDates.objects.create(field=field, sowing_date=date(2025, 1, 1))
+            CropLifecycleDates.objects.create(field=field, sowing_date=date(2025, 6, 1))
+
+    def _list_queries(self):
+        url = reverse('field-list')
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url, {'page_size': 100})
+        self.assertEqual(resp.status_code, 200)
+        return resp, len(ctx)
+
+    def test_list_query_count_is_constant(self):
+        self._make_fields(2)
+        resp, small = self._list_queries()
+        self._make_fields(20)
+        resp, large = self._list_queries()
+        self.assertEqual(small, large)
+        self.assertEqual(len(resp.data['results']), 22)
+
+    def test_list_reads_prefetched_relations(self):
+        self._make_fields(1)
+        resp, _ = self._list_queries()
+        row = resp.data['results'][0]
+        self.assertEqual(row['irrigation_method_name'], 'Drip')
+        self.assertEqual(row['irrigation_method_id'], self.method.id)
+        # the latest lifecycle row wins
+        self.assertEqual(str(row['current_sowing_date']), '2025-06-01')
+        self.assertEqual(row['soil_type_name'], 'Loam')
+
+    def test_put_returns_the_new_irrigation_method(self):
+        self._make_fields(1)
+        field = Field.objects.get()
+        flood = IrrigationMethods.objects.create(name='Flood')
+        resp = self.client.put(
+            reverse('field-detail', args=[field.pk]),
+            {'name': field.name, 'farm': self.farm.pk, 'crop': self.crop.pk, 'soil_type': self.soil.pk,
+             'area': {'hectares': 1.5}, 'irrigation_method': flood.pk},
+            format='json',
+        )
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(FieldIrrigationMethod.objects.get(field=field).irrigation_method, flood)
+        self.assertEqual(resp.data['irrigation_method_name'], 'Flood')
+        self.assertEqual(resp.data['irrigation_method_id'], flood.pk)
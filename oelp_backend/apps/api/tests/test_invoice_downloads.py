@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.api import invoices
+from apps.models_app.plan import Plan
+from apps.models_app.token import UserAuthToken
+from apps.models_app.user import CustomUser
+from apps.models_app.user_plan import Transaction
+
+class InvoiceDownloadTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='payer', password='testpass')
+        UserAuthToken.objects.create(user=self.user, access_token='invoice-token')
+        plan = Plan.objects.create(name='Basic', price=100.0, duration=30, type='main')
+        self.txn = Transaction.objects.create(user=self.user, plan=plan, amount=100.0, currency='INR', status='success')
+        self.url = reverse('transaction-invoice', kwargs={'pk': self.txn.pk})
+
+    def _get(self, **headers):
+        return self.client.get(self.url, {'token': 'invoice-token'}, **headers)
+
+    def test_first_download_is_stored_and_reused(self):
+        with mock.patch('apps.api.invoices.render_invoice_pdf', wraps=invoices.render_invoice_pdf) as render:
+            resp = self._get()
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(b''.join(resp.streaming_content).startswith(b'%PDF'))
+            self.assertIn('Last-Modified', resp)
+            etag = resp['ETag']
+            resp = self._get()
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp['ETag'], etag)
+            b''.join(resp.streaming_content)
+        self.assertEqual(render.call_count, 1)
+        self.txn.refresh_from_db()
+        # The authenticated endpoint, not a storage URL that is relative or expires
+        self.assertEqual(self.txn.invoice_pdf, f'http://testserver{self.url}')
+
+    def test_if_none_match_returns_304_without_rendering(self):
+        etag = self._get()['ETag']
+        with mock.patch('apps.api.invoices.render_invoice_pdf') as render:
+            resp = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+        render.assert_not_called()
+
+    def test_status_change_changes_etag(self):
+        etag = self._get()['ETag']
+        self.txn.status = 'refunded'
+        self.txn.save()
+        resp = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], etag)
+        b''.join(resp.streaming_content)
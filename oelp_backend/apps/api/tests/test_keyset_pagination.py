@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.models_app.notifications import BroadcastNotification, Notification
+from apps.models_app.user import CustomUser, Role, UserRole
+from apps.models_app.user_plan import Transaction
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='keyset-user', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        now = timezone.now()
+        for i in range(25):
+            txn = Transaction.objects.create(user=self.user, amount=i, currency='INR', status='success')
+            # groups of five share a timestamp, so ids break the ties
+            Transaction.objects.filter(pk=txn.pk).update(created_at=now - timedelta(minutes=i // 5))
+        self.expected = list(
+            Transaction.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def _walk(self, url, params):
+        seen, pages = [], 0
+        resp = self.client.get(url, params)
+        while True:
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotIn('count', resp.data)
+            seen += [item['id'] for item in resp.data['results']]
+            pages += 1
+            if not resp.data['next']:
+                return seen, pages
+            resp = self.client.get(resp.data['next'])
+
+    def test_cursor_walks_every_row_once(self):
+        seen, pages = self._walk(reverse('transaction-list'), {'cursor': '', 'page_size': 10})
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_deep_pages_skip_count_and_offset(self):
+        first = self.client.get(reverse('transaction-list'), {'cursor': '', 'page_size': 10})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data['next'])
+        sql = ' '.join(q['sql'].upper() for q in ctx.captured_queries if 'TRANSACTION' in q['sql'].upper())
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_page_numbers_without_cursor(self):
+        resp = self.client.get(reverse('transaction-list'), {'page_size': 10})
+        self.assertEqual(resp.data['count'], 25)
+
+    def test_bad_cursor(self):
+        resp = self.client.get(reverse('transaction-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(resp.status_code, 404)
+
+    def test_merged_notification_feed(self):
+        UserRole.objects.create(user=self.user, role=Role.objects.get_or_create(name='End-App-User')[0])
+        now = timezone.now()
+        for i in range(4):
+            n = Notification.objects.create(receiver=self.user, message=f'direct {i}')
+            Notification.objects.filter(pk=n.pk).update(created_at=now + timedelta(minutes=2 * i))
+            b = BroadcastNotification.objects.create(message=f'broadcast {i}')
+            b.roles.set(Role.objects.filter(name='End-App-User'))
+            BroadcastNotification.objects.filter(pk=b.pk).update(created_at=now + timedelta(minutes=2 * i + 1))
+        url = reverse('notification-list')
+        resp = self.client.get(url, {'cursor': '', 'page_size': 3})
+        messages = []
+        while True:
+            messages += [item['message'] for item in resp.data['results']]
+            if not resp.data['next']:
+                break
+            resp = self.client.get(resp.data['next'])
+        self.assertEqual(messages, [f'{kind} {i}' for i in range(3, -1, -1) for kind in ('broadcast', 'direct')])
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.models_app.notifications import Notification
+from apps.models_app.user import CustomUser, Role, UserRole
+from apps.utils.notification_utils import send_notification
+
+
+@override_settings(NOTIFICATION_BATCH_SIZE=4, NOTIFICATION_ASYNC_THRESHOLD=10)
+class NotificationFanOutTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = CustomUser.objects.create_user(username='fanout-admin', password='testpass')
+        UserRole.objects.create(user=self.admin, role=Role.objects.get_or_create(name='Admin')[0])
+        self.client.force_authenticate(user=self.admin)
+        self.end_user_role, _ = Role.objects.get_or_create(name='End-App-User')
+        self._make_end_users(6)
+
+    def _make_end_users(self, count):
+        start = CustomUser.objects.count()
+        for i in range(start, start + count):
+            user = CustomUser.objects.create_user(username=f'fanout-{i}', password='testpass')
+            UserRole.objects.create(user=user, role=self.end_user_role)
+
+    def _post(self):
+        return self.client.post(
+            reverse('notification-center-list'),
+            {'message': 'Rain expected', 'receiver_roles': ['End-App-User']},
+            format='json',
+        )
+
+    def test_batches_bound_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            sent, summary = send_notification(self.admin, 'hello', ['End-App-User'])
+        self.assertEqual(sent, 6)
+        self.assertFalse(summary['queued'])
+        inserts = [q for q in small.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)  # 6 recipients in batches of 4
+        self.assertEqual(Notification.objects.filter(message='hello').count(), 6)
+
+    def test_response_is_a_summary(self):
+        resp = self._post()
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data['sent'], 6)
+        self.assertNotIn('details', resp.data)
+
+    def test_large_audience_is_queued(self):
+        self._make_end_users(8)
+        with mock.patch('apps.api.tasks.fan_out_notification.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            resp = self._post()
+        self.assertEqual(resp.status_code, 202)
+        self.assertTrue(resp.data['queued'])
+        self.assertEqual(resp.data['sent'], 14)
+        self.assertEqual(Notification.objects.count(), 0)
+        # the job writes the rows
+        from apps.api.tasks import fan_out_notification
+        self.assertEqual(fan_out_notification(**delay.call_args.kwargs), 14)
+        self.assertEqual(Notification.objects.filter(message='Rain expected').count(), 14)
+
+    def test_no_recipients(self):
+        sent, _ = send_notification(self.admin, 'hello', ['Agronomist'])
+        self.assertEqual(sent, 0)
+
+
+class NotificationThresholdTest(SimpleTestCase):
+    def test_queued_path_is_reachable(self):
+        # Audiences at the broadcast threshold never reach the Celery fan-out
+        self.assertLess(settings.NOTIFICATION_ASYNC_THRESHOLD, settings.NOTIFICATION_BROADCAST_THRESHOLD)
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.models_app.notifications import Notification
+from apps.models_app.user import CustomUser, Role, UserRole
+
+
+class NotificationListQueryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.role = Role.objects.get_or_create(name='Agronomist')[0]
+        self.url = reverse('notification-list')
+
+    def _sender(self, name):
+        sender = CustomUser.objects.create_user(username=name, password='testpass')
+        UserRole.objects.create(user=sender, role=self.role)
+        return sender
+
+    def _page(self, receiver):
+        cache.clear()
+        self.client.force_authenticate(user=receiver)
+        resp = self.client.get(self.url, {'page_size': 10})
+        self.assertEqual(resp.status_code, 200)
+        return resp
+
+    def test_query_count_does_not_grow_with_senders(self):
+        one = CustomUser.objects.create_user(username='one-sender', password='testpass')
+        many = CustomUser.objects.create_user(username='many-senders', password='testpass')
+        sender = self._sender('only-sender')
+        for i in range(10):
+            Notification.objects.create(sender=sender, receiver=one, message=f'note {i}')
+            Notification.objects.create(sender=self._sender(f'sender-{i}'), receiver=many, message=f'note {i}')
+
+        with CaptureQueriesContext(connection) as single:
+            self._page(one)
+        with self.assertNumQueries(len(single)):
+            resp = self._page(many)
+        rows = resp.data['results']
+        self.assertEqual(len({row['sender'] for row in rows}), 10)
+        self.assertEqual({row['sender_role'] for row in rows}, {'Agronomist'})
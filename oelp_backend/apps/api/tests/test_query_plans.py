@@ -0,0 +1,151 @@
+from datetime import date, timedelta
+from unittest import skipUnless
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from apps.models_app.farm import Farm
+from apps.models_app.field import Field
+from apps.models_app.models import UserActivity
+from apps.models_app.notifications import Notification
+from apps.models_app.plan import Plan
+from apps.models_app.user import CustomUser
+from apps.models_app.user_plan import Transaction, UserPlan
+
+USERS = 40
+# Rows per ordinary user, and for the long-standing account the queries are run as
+VOLUMES = {
+    'notifications': (60, 3000),
+    'transactions': (30, 600),
+    'activities': (40, 1500),
+    'fields': (8, 200),
+    'plans': (2, 48),
+}
+
+
+@skipUnless(connection.vendor == 'postgresql', 'query plans are checked against PostgreSQL')
+class HotPathQueryPlanTest(TestCase):
+    """
+    The main query behind each busy endpoint, checked with EXPLAIN against
+    the index meant to serve it. The seeded tables are small, so sequential
+    scans are switched off for the check: the assertion is that the planner
+    can and does pick the index over the other indexes on the table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # bulk_create keeps the seeding fast and skips the counter/summary signals
+        now = timezone.now()
+        users = CustomUser.objects.bulk_create(
+            CustomUser(username=f'plan-user-{i}', email=f'plan-user-{i}@example.com') for i in range(USERS)
+        )
+        cls.user = users[0]
+        plans = Plan.objects.bulk_create(Plan(name=f'plan-{i}', duration=30) for i in range(3))
+        farms = Farm.objects.bulk_create(Farm(name=f'farm-{u.pk}', user=u) for u in users)
+        activity_type = ContentType.objects.get_for_model(CustomUser)
+        statuses = ['success', 'paid', 'completed', 'pending', 'failed', 'refunded']
+        notifications, transactions, activities, fields, user_plans = [], [], [], [], []
+        for user, farm in zip(users, farms):
+            n = {name: volume[user == cls.user] for name, volume in VOLUMES.items()}
+            notifications += [
+                Notification(receiver=user, message=f'n{i}', is_read=i % 3 != 0)
+                for i in range(n['notifications'])
+            ]
+            transactions += [
+                Transaction(
+                    user=user,
+                    plan=plans[i % 3],
+                    amount=i,
+                    currency='INR',
+                    status=statuses[i % len(statuses)],
+                    transaction_type='refund' if i % 10 == 9 else 'payment',
+                    provider_order_id=f'order_{user.pk}_{i}' if i % 2 else None,
+                )
+                for i in range(n['transactions'])
+            ]
+            activities += [
+                UserActivity(user=user, action='update', content_type=activity_type, object_id=user.pk)
+                for _ in range(n['activities'])
+            ]
+            fields += [
+                Field(name=f'f{i}', farm=farm, user=user, is_active=i % 4 != 0) for i in range(n['fields'])
+            ]
+            user_plans += [
+                UserPlan(
+                    user=user,
+                    plan=plans[i % 3],
+                    start_date=date.today(),
+                    end_date=date.today() + timedelta(days=30),
+                    expire_at=now + timedelta(days=30),
+                    is_active=i == n['plans'] - 1,
+                )
+                for i in range(n['plans'])
+            ]
+        Notification.objects.bulk_create(notifications)
+        Transaction.objects.bulk_create(transactions)
+        UserActivity.objects.bulk_create(activities)
+        Field.objects.bulk_create(fields)
+        UserPlan.objects.bulk_create(user_plans)
+        cls.order_id = f'order_{cls.user.pk}_7'
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            tables = [model._meta.db_table for model in (Notification, Transaction, UserActivity, Field, UserPlan)]
+            cursor.execute(f'ANALYZE {", ".join(tables)}')
+            # Local to the test transaction, so it is undone with it
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertRegex(
+            plan,
+            rf'Index (Only )?Scan (Backward )?using {index_name}\b|Bitmap Index Scan on {index_name}\b',
+            f'expected a scan of {index_name}, got:\n{plan}',
+        )
+
+    def test_notification_feed(self):
+        # NotificationViewSet.list, received scope
+        qs = Notification.objects.filter(receiver=self.user).order_by('-created_at', '-id')[:21]
+        self.assertUsesIndex(qs, 'notif_receiver_feed_idx')
+
+    def test_unread_notifications(self):
+        # NotificationViewSet.list with ?unread=true
+        qs = Notification.objects.filter(receiver=self.user, is_read=False).order_by('-created_at')[:21]
+        self.assertUsesIndex(qs, 'notif_receiver_read_idx')
+
+    def test_latest_successful_payment(self):
+        # DashboardView and UserPlanViewSet
+        qs = Transaction.objects.filter(
+            user=self.user,
+            status__in=['success', 'paid', 'completed'],
+            transaction_type='payment',
+        ).order_by('-created_at')[:1]
+        self.assertUsesIndex(qs, 'txn_user_paid_idx')
+
+    def test_transactions_by_type_and_status(self):
+        qs = Transaction.objects.filter(user=self.user, transaction_type='refund', status='pending')
+        self.assertUsesIndex(qs.order_by('-created_at'), 'txn_user_type_status_idx')
+
+    def test_transaction_history(self):
+        # TransactionViewSet.list for a non-staff user
+        qs = Transaction.objects.filter(user=self.user).order_by('-created_at', '-id')[:21]
+        self.assertUsesIndex(qs, 'txn_user_feed_idx')
+
+    def test_payment_webhook_lookup(self):
+        qs = Transaction.objects.filter(provider_order_id=self.order_id)[:1]
+        self.assertUsesIndex(qs, 'txn_provider_order_idx')
+
+    def test_current_plan(self):
+        qs = UserPlan.objects.filter(user=self.user, is_active=True).order_by('-created_at')[:1]
+        self.assertUsesIndex(qs, 'userplan_user_active_idx')
+
+    def test_recent_activity(self):
+        # DashboardView and AdminAnalyticsView
+        qs = UserActivity.objects.filter(user=self.user).order_by('-created_at')[:5]
+        self.assertUsesIndex(qs, 'activity_user_created_idx')
+
+    def test_active_fields(self):
+        # DashboardView and the dashboard summary rebuild
+        qs = Field.objects.filter(user=self.user, is_active=True)
+        self.assertUsesIndex(qs, 'field_user_active_idx')
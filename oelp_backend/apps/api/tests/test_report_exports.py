@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.api.exports import run_report_export
+from apps.models_app.farm import Farm
+from apps.models_app.field import Field
+from apps.models_app.report_export import ReportExportJob
+from apps.models_app.soil_report import SoilReport, SoilTexture
+from apps.models_app.token import UserAuthToken
+from apps.models_app.user import CustomUser
+
+class ReportExportJobTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='pdfuser', password='testpass')
+        UserAuthToken.objects.create(user=self.user, access_token='pdf-token')
+        farm = Farm.objects.create(name='Farm', user=self.user)
+        soil = SoilTexture.objects.create(name='Loam', icon='https://example.com/loam.png')
+        for i in range(3):
+            field = Field.objects.create(name=f'Field {i}', farm=farm, user=self.user, area={'hectares': 1})
+            SoilReport.objects.create(field=field, ph=6.5, ec=1.1, soil_type=soil)
+
+    def _get_pdf(self, **params):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(reverse('export-pdf'), {'token': 'pdf-token', **params})
+
+    def test_pdf_rendered_by_job_and_reused(self):
+        # the job runs (eagerly) once the request's transaction commits
+        resp = self._get_pdf(field_id='')
+        self.assertEqual(resp.status_code, 202)
+        resp = self._get_pdf()
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(b''.join(resp.streaming_content).startswith(b'%PDF'))
+        self.assertEqual(ReportExportJob.objects.count(), 1)
+        # different parameters render separately
+        self._get_pdf(analytics='crop')
+        self.assertEqual(ReportExportJob.objects.count(), 2)
+
+    def test_pending_job_is_polled_until_ready(self):
+        with mock.patch('apps.api.tasks.render_report_export.delay') as delay:
+            resp = self._get_pdf()
+            self.assertEqual(resp.status_code, 202)
+            self.assertEqual(resp['Retry-After'], '2')
+            resp = self._get_pdf()
+            self.assertEqual(resp.status_code, 202)
+        self.assertEqual(delay.call_count, 1)
+        job = ReportExportJob.objects.get()
+        self.assertEqual(job.status, ReportExportJob.PENDING)
+        run_report_export(job.pk)
+        self.assertEqual(self._get_pdf().status_code, 200)
+
+    def test_job_endpoints(self):
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(reverse('report-export-create'), {'format': 'pdf'}, format='json')
+        self.assertEqual(resp.status_code, 202)
+        self.assertIsNone(resp.data['download_url'])
+        job_id = resp.data['id']
+
+        resp = self.client.get(reverse('report-export-status', args=[job_id]))
+        self.assertEqual(resp.data['status'], 'ready')
+        self.assertTrue(resp.data['download_url'].endswith(f'/reports/exports/{job_id}/download/'))
+        resp = self.client.post(reverse('report-export-create'), {'format': 'pdf'}, format='json')
+        self.assertEqual((resp.status_code, resp.data['id']), (200, job_id))
+        self.client.force_authenticate(user=None)
+        resp = self.client.get(reverse('report-export-download', args=[job_id]), {'token': 'pdf-token'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+
+        other = CustomUser.objects.create_user(username='other', password='testpass')
+        UserAuthToken.objects.create(user=other, access_token='other-token')
+        resp = self.client.get(reverse('report-export-download', args=[job_id]), {'token': 'other-token'})
+        self.assertEqual(resp.status_code, 404)
+
+    def test_unsupported_format(self):
+        self.client.force_authenticate(user=self.user)
+        resp = self.client.post(reverse('report-export-create'), {'format': 'xlsx'}, format='json')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_serializer_leaves_job_state_to_the_server(self):
+        from apps.api.serializers import ReportExportJobSerializer
+
+        data = {'status': ReportExportJob.READY, 'error': 'x', 'expires_at': None, 'finished_at': None}
+        serializer = ReportExportJobSerializer(data={'format': 'pdf', **data})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(set(serializer.validated_data), {'format'})
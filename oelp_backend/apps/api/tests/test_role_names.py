@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.test import TestCase
+from apps.api.auth import resolve_token_user, token_cache
+from apps.models_app.token import UserAuthToken
+from apps.models_app.user import CustomUser, Role, UserRole
+from apps.utils.role_utils import get_role_names, invalidate_role_names, role_names_for_users
+
+
+class RoleNamesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = CustomUser.objects.create_user(username='role-user', password='testpass')
+        self.support = Role.objects.get_or_create(name='Support')[0]
+        self.analyst = Role.objects.get_or_create(name='Analyst')[0]
+        UserRole.objects.create(user=self.user, role=self.support)
+
+    def _fresh(self):
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def test_loaded_once_per_request(self):
+        user, next_request = self._fresh(), self._fresh()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_role_names(user), ['Support'])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role_names(user), ['Support'])
+            # later requests share the cached names
+            self.assertEqual(get_role_names(next_request), ['Support'])
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role_names(user), ['Support'])
+
+    def test_memo_does_not_outlive_the_request(self):
+        UserAuthToken.objects.create(user=self.user, access_token='role-token')
+        first = resolve_token_user('role-token')
+        get_role_names(first)
+        UserRole.objects.create(user=self.user, role=self.analyst)
+        # the next request gets a fresh copy of the cached user, without the memo
+        with self.assertNumQueries(1):
+            self.assertEqual(get_role_names(resolve_token_user('role-token')), ['Support', 'Analyst'])
+
+    def test_role_changes_invalidate(self):
+        self.assertEqual(get_role_names(self._fresh()), ['Support'])
+        grant = UserRole.objects.create(user=self.user, role=self.analyst)
+        self.assertEqual(get_role_names(self._fresh()), ['Support', 'Analyst'])
+        grant.delete()
+        self.assertEqual(get_role_names(self._fresh()), ['Support'])
+        self.support.name = 'Helpdesk'
+        self.support.save()
+        self.assertEqual(get_role_names(self._fresh()), ['Helpdesk'])
+
+    def test_invalidate_drops_the_memo(self):
+        user = self._fresh()
+        get_role_names(user)
+        UserRole.objects.filter(user=self.user).delete()
+        invalidate_role_names(user)
+        self.assertEqual(get_role_names(user), [])
+
+    def test_many_users_in_one_query(self):
+        other = CustomUser.objects.create_user(username='role-other', password='testpass')
+        UserRole.objects.create(user=other, role=self.analyst)
+        get_role_names(self._fresh())
+        with self.assertNumQueries(1):
+            names = role_names_for_users([self.user.pk, other.pk, None])
+        self.assertEqual(names, {self.user.pk: ['Support'], other.pk: ['Analyst']})
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+from apps.models_app.support_ticket import SupportTicket, TicketComment, TicketHistory
+from apps.models_app.user import CustomUser
+
+
+class SupportTicketListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='ticket-owner', password='testpass')
+        self.client.force_authenticate(user=self.user)
+
+    def _ticket(self, comments):
+        ticket = SupportTicket.objects.create(title='Pump broken', description='No water', created_by=self.user)
+        TicketHistory.objects.create(ticket=ticket, user=self.user, action='created', description='Created')
+        for i in range(comments):
+            TicketComment.objects.create(ticket=ticket, user=self.user, comment=f'comment {i}')
+        return ticket
+
+    def _login(self):
+        # a fresh instance and cache, so each request loads the user's roles once
+        cache.clear()
+        self.client.force_authenticate(user=CustomUser.objects.get(pk=self.user.pk))
+
+    def _list(self):
+        resp = self.client.get(reverse('support-ticket-list'))
+        self.assertEqual(resp.status_code, 200)
+        return resp.data['results'] if isinstance(resp.data, dict) else resp.data
+
+    def test_list_rows_are_flat_and_counted_in_sql(self):
+        busy = self._ticket(3)
+        quiet = self._ticket(0)
+        self._login()
+        with CaptureQueriesContext(connection) as ctx:
+            rows = {row['id']: row for row in self._list()}
+        self.assertNotIn('comments', rows[busy.pk])
+        self.assertEqual(rows[busy.pk]['comments_count'], 3)
+        self.assertEqual(rows[quiet.pk]['comments_count'], 0)
+        latest = TicketComment.objects.filter(ticket=busy).latest('created_at').created_at
+        self.assertEqual(parse_datetime(rows[busy.pk]['last_activity_at']), max(latest, busy.updated_at))
+
+        for _ in range(5):
+            self._ticket(2)
+        self._login()
+        with self.assertNumQueries(len(ctx)):
+            self._list()
+
+    def test_detail_prefetches_comments_only(self):
+        ticket = self._ticket(2)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('support-ticket-detail', args=[ticket.pk]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([c['comment'] for c in resp.data['comments']], ['comment 0', 'comment 1'])
+        self.assertEqual(resp.data['comments_count'], 2)
+        self.assertFalse([q for q in ctx.captured_queries if 'tickethistory' in q['sql']])
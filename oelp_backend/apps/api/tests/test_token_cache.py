@@ -0,0 +1,56 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.api.auth import resolve_token_user, token_cache
+from apps.models_app.token import UserAuthToken, token_digest
+from apps.models_app.user import CustomUser
+
+backfill_migration = import_module('apps.models_app.migrations.0013_userauthtoken_token_digest')
+
+
+class TokenCacheTest(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = CustomUser.objects.create_user(username='token-user', password='testpass')
+        self.token = UserAuthToken.objects.create(user=self.user, access_token='first-token')
+
+    def _warm(self):
+        self.assertEqual(resolve_token_user('first-token').pk, self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_token_user('first-token').pk, self.user.pk)
+
+    def test_deactivating_the_user_evicts_it(self):
+        self._warm()
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(resolve_token_user('first-token').is_active)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token first-token')
+        resp = client.get(reverse('auth-me'))
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(str(resp.data['detail']), 'User inactive or deleted.')
+
+    def test_deleting_the_token_evicts_it(self):
+        self._warm()
+        self.token.delete()
+        self.assertIsNone(resolve_token_user('first-token'))
+
+    def test_rotating_the_token_evicts_the_old_one(self):
+        self._warm()
+        self.token.access_token = 'second-token'
+        self.token.save()
+        self.assertIsNone(resolve_token_user('first-token'))
+        self.assertEqual(resolve_token_user('second-token').pk, self.user.pk)
+
+    def test_lookup_by_backfilled_digest(self):
+        # Rows as they were before 0013 added the column
+        UserAuthToken.objects.update(token_digest=None)
+        self.assertIsNone(resolve_token_user('first-token'))
+        backfill_migration.backfill_token_digest(apps, None)
+        self.assertEqual(UserAuthToken.objects.get().token_digest, token_digest('first-token'))
+        self.assertEqual(resolve_token_user('first-token').pk, self.user.pk)
+        self.assertIsNone(resolve_token_user('first-token-but-wrong'))
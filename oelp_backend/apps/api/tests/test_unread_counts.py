@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.models_app.notifications import BroadcastNotification, Notification
+from apps.models_app.user import CustomUser, Role, UserRole
+from apps.utils import unread_counts
+from apps.utils.notification_utils import deliver_notification, send_notification
+
+
+@override_settings(NOTIFICATION_BROADCAST_THRESHOLD=3)
+class UnreadCounterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = self._user('uc-admin', 'Admin')
+        self.farmers = [self._user(f'uc-farmer-{i}', 'End-App-User') for i in range(3)]
+        self.farmer = self.farmers[0]
+        self.client.force_authenticate(user=self.farmer)
+        self.url = reverse('notification-unread-count')
+
+    def _user(self, username, *roles):
+        user = CustomUser.objects.create_user(username=username, password='testpass')
+        for name in roles:
+            UserRole.objects.create(user=user, role=Role.objects.get_or_create(name=name)[0])
+        return user
+
+    def _count(self):
+        return self.client.get(self.url).data['count']
+
+    def _notify(self, message='Ticket updated'):
+        # Same call the support ticket flows make
+        return Notification.objects.create(sender=self.admin, receiver=self.farmer, message=message)
+
+    def test_polling_reads_the_counter(self):
+        self._notify()
+        self.assertEqual(self._count(), 1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._count(), 1)
+        counts = [q for q in ctx.captured_queries if 'notification' in q['sql'].lower()]
+        self.assertEqual(counts, [])
+
+    def test_writes_keep_counter_in_step(self):
+        self.assertEqual(self._count(), 0)
+        first = self._notify('one')
+        self._notify('two')
+        self.assertEqual(self._count(), 2)
+
+        self.client.post(reverse('notification-mark-read', args=[first.pk]))
+        self.client.post(reverse('notification-mark-read', args=[first.pk]))
+        self.assertEqual(self._count(), 1)
+
+        self.client.post(reverse('notification-mark-all-read'))
+        self.assertEqual(self._count(), 0)
+
+        first.delete()
+        self._notify('three').delete()
+        self.assertEqual(self._count(), 0)
+
+    def test_role_notifications(self):
+        self.assertEqual(self._count(), 0)
+        # below the broadcast threshold: one row per recipient
+        with self.captureOnCommitCallbacks(execute=True):
+            send_notification(self.admin, 'hello', ['End-App-User'], region='nowhere')
+        self._user('uc-farmer-x', 'End-App-User')
+        with self.captureOnCommitCallbacks(execute=True):
+            send_notification(self.admin, 'rows', ['Admin'])
+        self.assertEqual(self._count(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            send_notification(self.admin, 'broadcast', ['End-App-User'])
+        self.assertTrue(BroadcastNotification.objects.exists())
+        self.assertEqual(self._count(), 1)
+
+        bid = BroadcastNotification.objects.get().pk
+        self.client.post(reverse('notification-mark-read', args=[f'b-{bid}']))
+        self.assertEqual(self._count(), 0)
+
+    def test_delivery_clears_counters_on_commit(self):
+        self.assertEqual(self._count(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            deliver_notification(self.admin.pk, 'rows', ['End-App-User'])
+            # Cleared now, a concurrent read could cache the pre-commit count
+            self.assertEqual(cache.get(unread_counts._key(self.farmer.pk)), 0)
+        self.assertIsNone(cache.get(unread_counts._key(self.farmer.pk)))
+        self.assertEqual(self._count(), 1)
+
+    def test_missing_counter_is_rebuilt(self):
+        self._notify()
+        self.assertEqual(self._count(), 1)
+        cache.clear()
+        Notification.objects.filter(receiver=self.farmer).update(is_read=True)
+        self.assertEqual(self._count(), 0)
+
+    def test_dashboard_uses_counter(self):
+        self._notify()
+        resp = self.client.get(reverse('dashboard'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['unread_notifications'], 1)
@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.models_app.models import UserActivity
+from apps.models_app.user import CustomUser, Role, UserRole
+
+
+class UserCreatedByTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUser.objects.create_user(username='creator-admin', password='testpass', is_staff=True)
+        self.other_admin = CustomUser.objects.create_user(username='creator-other', password='testpass')
+        self.ct = ContentType.objects.get_for_model(CustomUser)
+
+    def _activity(self, actor, user, action='create'):
+        UserActivity.objects.create(user=actor, action=action, content_type=self.ct, object_id=user.pk)
+
+    def _legacy_user(self, name, creator=None):
+        user = CustomUser.objects.create_user(username=name, password='testpass')
+        if creator:
+            self._activity(creator, user)
+        return user
+
+    def test_backfill_uses_the_earliest_create_activity(self):
+        first = self._legacy_user('legacy-first', creator=self.admin)
+        self._activity(self.other_admin, first)
+        second = self._legacy_user('legacy-second', creator=self.other_admin)
+        untouched = self._legacy_user('legacy-untouched')
+        self._activity(self.admin, untouched, action='update')
+
+        out = StringIO()
+        call_command('backfill_created_by', '--dry-run', stdout=out)
+        self.assertIn('Would update created_by on 2 users', out.getvalue())
+        self.assertFalse(CustomUser.objects.filter(created_by__isnull=False).exists())
+
+        out = StringIO()
+        call_command('backfill_created_by', '--batch-size', '1', stdout=out)
+        self.assertIn('Updated created_by on 2 users', out.getvalue())
+        created_by = dict(CustomUser.objects.values_list('username', 'created_by'))
+        self.assertEqual(created_by['legacy-first'], self.admin.pk)
+        self.assertEqual(created_by['legacy-second'], self.other_admin.pk)
+        self.assertIsNone(created_by['legacy-untouched'])
+
+    def _list(self, admin):
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        cache.clear()
+        ContentType.objects.clear_cache()
+        resp = client.get(reverse('admin-users-list'), {'page_size': 50})
+        self.assertEqual(resp.status_code, 200)
+        return {row['username']: row for row in resp.data['results']}
+
+    def _seed(self, count):
+        role = Role.objects.get_or_create(name='End-App-User')[0]
+        for i in range(count):
+            stored = CustomUser.objects.create_user(
+                username=f'stored-{count}-{i}', password='testpass', created_by=self.admin,
+            )
+            legacy = self._legacy_user(f'legacy-{count}-{i}', creator=self.other_admin)
+            UserRole.objects.bulk_create([UserRole(user=stored, role=role), UserRole(user=legacy, role=role)])
+
+    def test_admin_user_list_query_count_is_constant(self):
+        self._seed(2)
+        # a fresh instance per request, so the role memo on the admin starts empty each time
+        admin = CustomUser.objects.get(pk=self.admin.pk)
+        with CaptureQueriesContext(connection) as small:
+            self._list(admin)
+        self._seed(10)
+        admin = CustomUser.objects.get(pk=self.admin.pk)
+        with self.assertNumQueries(len(small)):
+            rows = self._list(admin)
+        self.assertEqual(rows['stored-10-3']['created_by_id'], self.admin.pk)
+        self.assertEqual(rows['legacy-10-3']['created_by_id'], self.other_admin.pk)
+        self.assertEqual(rows['legacy-10-3']['roles'], ['End-App-User'])
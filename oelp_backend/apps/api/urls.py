@@ -2,6 +2,8 @@ from django.urls import path, include
 from django.http import JsonResponse
 from rest_framework.routers import DefaultRouter
 from . import views
+from .agribot.views import agribot_stream
+from .events import event_stream
 
 router = DefaultRouter()
 
@@ -53,8 +55,14 @@ urlpatterns = [
     path("subscriptions/fake-charge/", views.FakeChargeView.as_view(), name="fake-charge"),
     path("reports/export/csv/", views.ExportCSVView.as_view(), name="export-csv"),
     path("reports/export/pdf/", views.ExportPDFView.as_view(), name="export-pdf"),
+    path("reports/exports/", views.ReportExportJobCreateView.as_view(), name="report-export-create"),
+    path("reports/exports/<int:pk>/", views.ReportExportJobStatusView.as_view(), name="report-export-status"),
+    path("reports/exports/<int:pk>/download/", views.ReportExportJobDownloadView.as_view(), name="report-export-download"),
     path("analytics/summary/", views.AnalyticsSummaryView.as_view(), name="analytics-summary"),
     path("agribot/", views.AgribotView.as_view(), name="agribot"),
+    path("agribot/stream/", agribot_stream, name="agribot-stream"),
+    path("events/stream/", event_stream, name="event-stream"),
+    path("admin/agribot/answer-cache/", views.AgribotAnswerCacheView.as_view(), name="agribot-answer-cache"),
     path("admin/analytics/", views.AdminAnalyticsView.as_view(), name="admin-analytics"),
     path("admin/transactions/refunds-summary/", views.RefundsSummaryView.as_view(), name="refunds-summary"),
     path("auth/ensure-role/", views.EnsureRoleView.as_view(), name="ensure-role"),
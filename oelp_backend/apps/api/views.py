@@ -1,21 +1,23 @@
 from __future__ import annotations
 
-import csv
-import io
 import os
 import secrets
-import requests
 from datetime import date, datetime, timedelta
 
 from django.db import IntegrityError
 from django.contrib.auth import authenticate
-from django.db.models import Count, F, Q
-from django.http import HttpResponse
+from django.db.models import Count, F, Max, Prefetch, Q
+from django.db.models.functions import Coalesce, Greatest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.contrib.contenttypes.models import ContentType
 from django.db import connection
 from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -25,7 +27,12 @@ from django.views.decorators.http import require_http_methods
 from apps.models_app.token import UserAuthToken
 from apps.models_app.user import CustomUser, Role, UserRole
 
-from .auth import TokenAuthentication
+from .invoices import invoice_cache_key, stored_invoice
+from .agribot.answers import answer_cache
+from .agribot.providers import dispatch
+from .agribot.turns import TurnRejected, error_reply, finish_turn, start_turn
+from .exports import EXPORT_RENDERERS, parse_export_params, request_report_export, stream_report_csv
+from .auth import TokenAuthentication, invalidate_user_tokens, resolve_token_user, token_from_request
 from .permissions import IsOwnerOrReadOnly, HasRole
 from .serializers import (
     AssetSerializer,
@@ -40,6 +47,7 @@ from .serializers import (
     FieldIrrigationMethodSerializer,
     FieldIrrigationPracticeSerializer,
     FieldSerializer,
+    prefetch_field_details,
     CropLifecycleDatesSerializer,
     LoginSerializer,
     NotificationSerializer,
@@ -52,11 +60,14 @@ from .serializers import (
     UserPlanSerializer,
     IrrigationMethodSerializer,
     PaymentMethodSerializer,
+    ReportExportJobSerializer,
     TransactionSerializer,
     SupportTicketSerializer,
+    SupportTicketListSerializer,
     SupportTicketCreateSerializer,
     TicketCommentSerializer,
     TicketHistorySerializer,
+    serialize_notification_feed,
 )
 
 from apps.models_app.assets import Asset
@@ -67,12 +78,24 @@ from apps.models_app.feature import Feature, FeatureType
 from apps.models_app.plan import Plan
 from apps.models_app.feature_plan import PlanFeature
 from apps.models_app.user_plan import UserPlan, PlanFeatureUsage, PaymentMethod, Transaction, RefundPolicy
-from apps.models_app.notifications import Notification, SupportRequest
+from apps.models_app.notifications import BroadcastNotification, Notification, SupportRequest
 from apps.models_app.support_ticket import SupportTicket, TicketComment, TicketHistory
 from apps.models_app.irrigation import IrrigationMethods
 from apps.models_app.models import UserActivity
+from apps.models_app.report_export import ReportExportJob
 from apps.models_app.soil_report import SoilReport, SoilTexture
-from apps.utils.notification_utils import get_allowed_receivers, normalize_role, send_notification
+from apps.utils.notification_utils import (
+    broadcast_feed,
+    get_allowed_receivers,
+    mark_broadcasts,
+    normalize_role,
+    send_notification,
+    visible_broadcasts,
+)
+from apps.utils.analytics_utils import get_admin_snapshot, get_field_analytics, revenue_by_day
+from apps.utils.dashboard_utils import get_dashboard_summary
+from apps.utils.role_utils import get_role_names, invalidate_role_names, invalidate_role_names_many
+from apps.utils import unread_counts
 
 razorpay = None
 
@@ -124,10 +147,12 @@ class LoginView(APIView):
                 # Use UserAuthToken instead of Token
                 token_value = secrets.token_urlsafe(48)
                 UserAuthToken.objects.update_or_create(user=user, defaults={"access_token": token_value})
+                # The previous token is gone; drop it from the auth cache
+                invalidate_user_tokens(user.pk)
                 
                 # Get user roles
                 try:
-                    roles = list(user.user_roles.select_related("role").values_list("role__name", flat=True))
+                    roles = get_role_names(user)
                 except Exception:
                     roles = []
                 
@@ -155,6 +180,7 @@ class LogoutView(APIView):
             request.user.auth_token.delete()
         except Exception:
             pass
+        invalidate_user_tokens(getattr(request.user, "pk", None))
         return Response({"detail": "Logged out"})
 
 
@@ -172,7 +198,10 @@ class MeView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             
-            serializer = UserSerializer(request.user)
+            # request.user may come from the per-process token cache; read the row
+            user = request.user
+            user.refresh_from_db()
+            serializer = UserSerializer(user)
             return Response(serializer.data)
         except Exception as e:
             return Response(
@@ -190,11 +219,14 @@ class MeView(APIView):
                 )
             
             user = request.user
+            # Start from the stored row so a cached copy never writes back an old password or role edit
+            user.refresh_from_db()
             allowed_fields = {"email", "username", "full_name", "phone_number", "avatar"}
             for key, value in request.data.items():
                 if key in allowed_fields:
                     setattr(user, key, value)
             user.save()
+            invalidate_user_tokens(user.pk)
             
             # Record profile update in activity log
             try:
@@ -227,6 +259,7 @@ class ChangePasswordView(APIView):
         if not current_password or not new_password:
             return Response({"detail": "current_password and new_password are required"}, status=status.HTTP_400_BAD_REQUEST)
         user = request.user
+        user.refresh_from_db(fields=["password"])
         if not user.check_password(current_password):
             return Response({"detail": "Current password is incorrect"}, status=status.HTTP_400_BAD_REQUEST)
         from django.contrib.auth import password_validation
@@ -234,6 +267,7 @@ class ChangePasswordView(APIView):
         password_validation.validate_password(new_password, user)
         user.set_password(new_password)
         user.save(update_fields=["password"])
+        invalidate_user_tokens(user.pk)
         # Record activity in recent activity log
         try:
             ct = ContentType.objects.get_for_model(user.__class__)
@@ -281,10 +315,7 @@ class ResetPasswordView(APIView):
         try:
             auth_header = request.headers.get("Authorization") or ""
             if auth_header.startswith("Token "):
-                token_value = auth_header.split(" ", 1)[1]
-                token_obj = UserAuthToken.objects.filter(access_token=token_value).select_related("user").first()
-                if token_obj:
-                    user = token_obj.user
+                user = resolve_token_user(auth_header.split(" ", 1)[1])
         except Exception:
             user = None
         if user is None and username:
@@ -296,6 +327,7 @@ class ResetPasswordView(APIView):
         password_validation.validate_password(new_password, user)
         user.set_password(new_password)
         user.save(update_fields=["password"])
+        invalidate_user_tokens(user.pk)
         # Record activity
         try:
             ct = ContentType.objects.get_for_model(user.__class__)
@@ -313,36 +345,15 @@ class DashboardView(APIView):
 
         user = request.user
         try:
-            role_names = set(user.user_roles.select_related("role").values_list("role__name", flat=True))
+            role_names = set(get_role_names(user))
         except Exception:
             role_names = set()
         privileged = user.is_superuser or bool({"SuperAdmin", "Admin", "Agronomist", "Analyst", "Business", "Developer"} & role_names)
 
         base_fields = Field.objects.filter(is_active=True)
         user_fields = base_fields if privileged else base_fields.filter(user=user)
-        active_fields = user_fields.count()
-
-        # Count fields with a crop assigned (considered active until harvested)
-        # Prefer explicit lifecycle harvested flag when available, otherwise count assigned crops
-        lifecycle_active = (
-            CropLifecycleDates.objects
-            .filter(field__in=user_fields, field__crop__isnull=False, harvesting_date__isnull=True)
-            .values("field_id")
-            .distinct()
-            .count()
-        )
-        assigned_crops = user_fields.filter(crop__isnull=False).count()
-        active_crops = max(lifecycle_active, assigned_crops)
-
-        # Total area in hectares summed from JSON field
-        total_hectares = 0.0
-        for f in user_fields:
-            try:
-                hectares = (f.area or {}).get("hectares")
-                if isinstance(hectares, (int, float)):
-                    total_hectares += float(hectares)
-            except Exception:
-                pass
+        # Field counts, crops and hectares are maintained incrementally by signals
+        summary = get_dashboard_summary(user.pk, privileged)
 
         # Get the most recent active plan that has a successful payment transaction
         # Prioritize paid plans over Free plans
@@ -354,36 +365,37 @@ class DashboardView(APIView):
         ).select_related("plan").order_by("-created_at")
         
         current_plan = None
-        if successful_txns.exists():
-            # Get the most recent successful transaction
-            latest_txn = successful_txns.first()
-            if latest_txn and latest_txn.plan:
-                # Find the active UserPlan for this paid plan
-                current_plan = UserPlan.objects.filter(
-                    user=user,
-                    plan=latest_txn.plan,
-                    is_active=True
-                ).select_related("plan").order_by("-created_at").first()
+        # Get the most recent successful transaction
+        latest_txn = successful_txns.first()
+        if latest_txn and latest_txn.plan:
+            # Find the active UserPlan for this paid plan
+            current_plan = UserPlan.objects.filter(
+                user=user,
+                plan=latest_txn.plan,
+                is_active=True
+            ).select_related("plan").order_by("-created_at").first()
         
         # Fallback to any active plan if no paid plan found
         if not current_plan:
             plans = UserPlan.objects.filter(user=user, is_active=True).select_related("plan")
             current_plan = plans.order_by("-created_at").first()
-        notifications_count = Notification.objects.filter(receiver=user, is_read=False).count()
-        recent_practices_qs = (
-            FieldIrrigationPractice.objects
-            .filter(field__in=user_fields)
-            .select_related("field", "irrigation_method")
-            .order_by("-performed_at")[:3]
-        )
-        recent_practices = FieldIrrigationPracticeSerializer(recent_practices_qs, many=True).data
+        notifications_count = unread_counts.unread_count(user)
+        recent_practices = []
+        if summary.last_practice_at is not None:
+            recent_practices_qs = (
+                FieldIrrigationPractice.objects
+                .filter(field__in=user_fields)
+                .select_related("field", "irrigation_method")
+                .order_by("-performed_at")[:3]
+            )
+            recent_practices = FieldIrrigationPracticeSerializer(recent_practices_qs, many=True).data
         recent_activity = UserActivity.objects.filter(user=user).order_by("-created_at")[:5]
         return Response(
             {
-                "active_fields": active_fields,
-                "active_crops": active_crops,
+                "active_fields": summary.active_fields,
+                "active_crops": summary.active_crops,
                 "current_plan": UserPlanSerializer(current_plan).data if current_plan else None,
-                "total_hectares": round(total_hectares, 4),
+                "total_hectares": round(summary.total_hectares, 4),
                 "unread_notifications": notifications_count,
                 "current_practices": recent_practices,
                 "recent_activity": ActivitySerializer(recent_activity, many=True).data,
@@ -413,9 +425,12 @@ class AdminUsersViewSet(viewsets.ModelViewSet):
     authentication_classes = [TokenAuthentication]
     permission_classes = [HasRole]
     required_roles = ["SuperAdmin", "Admin", "Analyst", "Business", "Developer"]
+    # ?cursor= pages through users newest first without a COUNT
+    keyset_pagination = True
+    keyset_ordering = ("date_joined", "id")
 
     def get_queryset(self):
-        return CustomUser.objects.all().order_by("-date_joined")
+        return CustomUser.objects.select_related("created_by").order_by("-date_joined")
 
     def get_serializer_class(self):  # defer import to avoid circular timing
         from .serializers import UserSerializer as _UserSerializer
@@ -450,9 +465,7 @@ class AdminUsersViewSet(viewsets.ModelViewSet):
 
         # Determine acting user's roles
         try:
-            actor_roles = set(
-                request.user.user_roles.select_related("role").values_list("role__name", flat=True)
-            )
+            actor_roles = set(get_role_names(request.user))
         except Exception:
             actor_roles = set()
 
@@ -471,12 +484,16 @@ class AdminUsersViewSet(viewsets.ModelViewSet):
         UserRole.objects.get_or_create(
             user=user, role=role, defaults={"userrole_id": user.email or user.username}
         )
+        invalidate_role_names(user)
         # Ensure a 'create' activity exists for this user with the acting admin as creator
         try:
             from django.contrib.contenttypes.models import ContentType
             ct = ContentType.objects.get_for_model(user.__class__)
             has_create = UserActivity.objects.filter(content_type=ct, object_id=user.pk, action="create").exists()
             if not has_create:
+                if user.created_by_id is None:
+                    user.created_by = request.user
+                    user.save(update_fields=["created_by"])
                 UserActivity.objects.create(
                     user=request.user,
                     action="create",
@@ -492,7 +509,7 @@ class AdminUsersViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["post"], url_path="create-admin")
     def create_admin(self, request):
         # Only SuperAdmin can create Admin accounts
-        roles = set(request.user.user_roles.select_related("role").values_list("role__name", flat=True))
+        roles = set(get_role_names(request.user))
         if not (request.user.is_superuser or ("SuperAdmin" in roles)):
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
@@ -522,6 +539,7 @@ class AdminUsersViewSet(viewsets.ModelViewSet):
             password=password,
             full_name=full_name,
             email=email,
+            created_by=request.user,
         )
         if phone_number:
             try:
@@ -538,6 +556,7 @@ class AdminUsersViewSet(viewsets.ModelViewSet):
             UserRole.objects.filter(user=user, role=end_role).delete()
         except Role.DoesNotExist:
             pass
+        invalidate_role_names(user)
         # Record activity for creator (SuperAdmin)
         try:
             ct = ContentType.objects.get_for_model(user.__class__)
@@ -556,19 +575,20 @@ class AdminUsersViewSet(viewsets.ModelViewSet):
     def dedupe_roles(self, request, pk=None):
         # Remove any duplicate End-App-User role for Admin users
         user = self.get_object()
-        roles = set(user.user_roles.select_related("role").values_list("role__name", flat=True))
+        roles = set(get_role_names(user))
         if "Admin" in roles:
             try:
                 end_role = Role.objects.get(name="End-App-User")
                 UserRole.objects.filter(user=user, role=end_role).delete()
             except Role.DoesNotExist:
                 pass
-        return Response({"roles": list(user.user_roles.select_related("role").values_list("role__name", flat=True))})
+            invalidate_role_names(user)
+        return Response({"roles": get_role_names(user)})
 
     @action(detail=False, methods=["post"], url_path="dedupe-roles-bulk")
     def dedupe_roles_bulk(self, request):
         """Remove End-App-User role from users who also have other roles. SuperAdmin only."""
-        roles = set(request.user.user_roles.select_related("role").values_list("role__name", flat=True))
+        roles = set(get_role_names(request.user))
         if not (request.user.is_superuser or ("SuperAdmin" in roles)):
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
@@ -587,8 +607,10 @@ class AdminUsersViewSet(viewsets.ModelViewSet):
             .values_list("user_id", flat=True)
         )
         qs = UserRole.objects.filter(user_id__in=candidate_user_ids, role=end_role)
-        removed = qs.count()
+        affected_ids = list(qs.values_list("user_id", flat=True))
+        removed = len(affected_ids)
         qs.delete()
+        invalidate_role_names_many(affected_ids)
         return Response({"removed": removed})
 
 
@@ -596,6 +618,8 @@ class UsersReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
     authentication_classes = [TokenAuthentication]
     permission_classes = [HasRole]
     required_roles = ["SuperAdmin", "Admin", "Agronomist", "Analyst", "Business", "Developer", "Support"]
+    keyset_pagination = True
+    keyset_ordering = ("date_joined", "id")
 
     def get_queryset(self):
         # Only return pure End-App-Users (exclude users who also have privileged roles)
@@ -608,7 +632,7 @@ class UsersReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
             .filter(id__in=end_user_qs.values_list("id", flat=True), user_roles__role__name__in=privileged_roles)
             .values_list("id", flat=True)
         )
-        return end_user_qs.exclude(id__in=mixed_ids).order_by("-date_joined")
+        return end_user_qs.exclude(id__in=mixed_ids).select_related("created_by").order_by("-date_joined")
 
     def get_serializer_class(self):
         from .serializers import UserSerializer as _UserSerializer
@@ -626,7 +650,7 @@ class AdminFieldViewSet(viewsets.ReadOnlyModelViewSet):
     authentication_classes = [TokenAuthentication]
     permission_classes = [HasRole]
     required_roles = ["SuperAdmin", "Admin", "Analyst", "Agronomist", "Business", "Developer"]
-    queryset = Field.objects.select_related("user", "farm", "crop", "crop_variety", "soil_type")
+    queryset = prefetch_field_details(Field.objects.select_related("user"))
     serializer_class = FieldSerializer
 
 
@@ -637,111 +661,13 @@ class AdminAnalyticsView(APIView):
 
     def get(self, request):
         # Role of requester for UI
-        role_names = list(request.user.user_roles.select_related("role").values_list("role__name", flat=True))
-        # Stats per requirements
-        # Total revenue from transactions
-        try:
-            total_revenue = (
-                Transaction.objects.all().aggregate(total=Count("id"))  # fallback count if no sum
-            )
-        except Exception:
-            total_revenue = {"total": 0}
-        try:
-            from django.db.models import Sum
-
-            # Sum successful payment transactions, exclude refunds
-            # Include payments that may have been marked 'refunded' so the ledger remains consistent
-            payments_sum = (
-                Transaction.objects.filter(status__in=["success", "paid", "completed", "refunded"], transaction_type="payment").aggregate(sum_amt=Sum("amount"))
-            )["sum_amt"] or 0
-            # Sum successful refund transactions
-            refunds_sum = (
-                Transaction.objects.filter(status__in=["success", "paid", "completed"], transaction_type="refund").aggregate(sum_amt=Sum("amount"))
-            )["sum_amt"] or 0
-            # Revenue = payments - refunds
-            revenue_amount = payments_sum - refunds_sum
-        except Exception:
-            revenue_amount = 0
-
-        # Active end-users: users who have ONLY the End-App-User role (no other roles)
-        try:
-            from django.db.models import Q
-            end_user_ids = (
-                CustomUser.objects
-                .filter(is_active=True, user_roles__role__name="End-App-User")
-                .values_list("id", flat=True)
-            )
-            # Exclude anyone who also has any non end-user role
-            privileged_roles = [
-                "SuperAdmin", "Admin", "Analyst", "Business", "Developer", "Support", "Agronomist", "Manager",
-            ]
-            mixed_ids = (
-                CustomUser.objects
-                .filter(id__in=end_user_ids, user_roles__role__name__in=privileged_roles)
-                .values_list("id", flat=True)
-            )
-            active_end_users = (
-                CustomUser.objects.filter(id__in=end_user_ids).exclude(id__in=mixed_ids).distinct().count()
-            )
-        except Exception:
-            active_end_users = 0
-        # Total fields
-        total_fields = Field.objects.count()
-        # Active admins (exclude SuperAdmin)
-        active_admins = (
-            CustomUser.objects.filter(is_active=True, user_roles__role__name="Admin").distinct().count()
-        )
-
-        # Business-centric analytics
-        from django.db.models.functions import TruncDate
-        from django.db.models import Sum, Case, When, F, Value, FloatField
-        last_7_days = datetime.now().date() - timedelta(days=6)
-        # Compute net amount per day: payments add, refunds subtract
-        revenue_daily_qs = (
-            Transaction.objects.filter(created_at__date__gte=last_7_days, status__in=["success", "paid", "completed", "refunded"])
-            .annotate(day=TruncDate("created_at"))
-            .values("day")
-            .annotate(amount=Sum(
-                Case(
-                    When(transaction_type="refund", then=F("amount") * Value(-1.0)),
-                    When(transaction_type="payment", then=F("amount")),
-                    default=Value(0.0),
-                    output_field=FloatField(),
-                )
-            ))
-            .order_by("day")
-        )
-        revenue_by_day = [
-            {"name": row["day"].isoformat() if getattr(row.get("day"), "isoformat", None) else str(row.get("day")), "value": float(row["amount"] or 0)}
-            for row in revenue_daily_qs
-        ]
-        
-        # Ensure we have data for all 7 days (fill missing days with 0)
-        if len(revenue_by_day) < 7:
-            existing_dates = {row["name"] for row in revenue_by_day}
-            for i in range(7):
-                day = (datetime.now().date() - timedelta(days=6-i)).isoformat()
-                if day not in existing_dates:
-                    revenue_by_day.append({"name": day, "value": 0})
-            revenue_by_day.sort(key=lambda x: x["name"])
-        
-        # Calculate weekly revenue (last 7 days)
-        weekly_revenue = sum(row["value"] for row in revenue_by_day)
-        
-        # Transactions by status
-        txn_status_counts = (
-            Transaction.objects.values("status").annotate(cnt=Count("id")).order_by("-cnt")
-        )
-        transactions_by_status = [
-            {"name": (row["status"] or "unknown"), "value": row["cnt"]} for row in txn_status_counts
-        ]
-        # Plan distribution (active user plans by plan)
-        plan_counts = (
-            UserPlan.objects.filter(is_active=True).values("plan__name").annotate(cnt=Count("id")).order_by("-cnt")
-        )
-        plan_distribution = [
-            {"name": (row["plan__name"] or "Unknown"), "value": row["cnt"]} for row in plan_counts
-        ]
+        role_names = get_role_names(request.user)
+        # Platform-wide figures come from the precomputed snapshot, refreshed in
+        # the background (see get_admin_snapshot)
+        snapshot = get_admin_snapshot()
+        data = snapshot.data
+        revenue_daily = revenue_by_day(7)
+        weekly_revenue = sum(row["value"] for row in revenue_daily)
 
         # Recent activity for this user
         recent_activity = UserActivity.objects.filter(user=request.user).order_by("-created_at")[:6]
@@ -750,19 +676,18 @@ class AdminAnalyticsView(APIView):
             {
                 "role_names": role_names,
                 "stats": {
-                    "total_revenue": float(revenue_amount) if revenue_amount is not None else 0,
+                    "total_revenue": float(data.get("total_revenue") or 0),
                     "weekly_revenue": float(weekly_revenue),
-                    "active_end_users": active_end_users,
-                    "total_fields": total_fields,
-                    "active_admins": active_admins,
-                    "active_employees": CustomUser.objects.filter(
-                        is_active=True,
-                        user_roles__role__name__in=["Analyst","Agronomist","Support","Business","Developer"],
-                    ).distinct().count(),
+                    "active_end_users": data.get("active_end_users", 0),
+                    "total_fields": data.get("total_fields", 0),
+                    "active_admins": data.get("active_admins", 0),
+                    "active_employees": data.get("active_employees", 0),
                 },
-                "revenue_by_day": revenue_by_day,
-                "transactions_by_status": transactions_by_status,
-                "plan_distribution": plan_distribution,
+                "revenue_by_day": revenue_daily,
+                "transactions_by_status": data.get("transactions_by_status", []),
+                "plan_distribution": data.get("plan_distribution", []),
+                "role_headcounts": data.get("role_headcounts", {}),
+                "snapshot_at": snapshot.computed_at,
                 "recent_activity": ActivitySerializer(recent_activity, many=True).data,
             }
         )
@@ -815,9 +740,7 @@ class EnsureRoleView(APIView):
         # Only allow all users to ensure the default end-user role for themselves.
         # Elevating to privileged roles requires SuperAdmin (or Django superuser).
         try:
-            user_roles = set(
-                request.user.user_roles.select_related("role").values_list("role__name", flat=True)
-            )
+            user_roles = set(get_role_names(request.user))
         except Exception:
             user_roles = set()
         if role_name != "End-App-User":
@@ -828,9 +751,8 @@ class EnsureRoleView(APIView):
         UserRole.objects.get_or_create(
             user=request.user, role=role, defaults={"userrole_id": request.user.email or request.user.username}
         )
-        roles = list(
-            request.user.user_roles.select_related("role").values_list("role__name", flat=True)
-        )
+        invalidate_role_names(request.user)
+        roles = get_role_names(request.user)
         return Response({"roles": roles})
 
 
@@ -874,7 +796,7 @@ class FieldViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created_at", "updated_at", "name"]
 
     def get_queryset(self):
-        return Field.objects.filter(user=self.request.user).select_related("farm", "crop", "crop_variety")
+        return prefetch_field_details(Field.objects.filter(user=self.request.user))
 
     def perform_create(self, serializer):
         # Map size_acres to area.hectares if provided on create
@@ -955,9 +877,11 @@ class FieldViewSet(viewsets.ModelViewSet):
 
     def update(self, request, *args, **kwargs):
         # Support PUT updates, including irrigation method mapping and size conversion
+        # (PATCH reaches here through partial_update, which has done both already)
+        partial = kwargs.get("partial", False)
         try:
             raw = request.data.get("size_acres")
-            if raw is not None and raw != "":
+            if not partial and raw is not None and raw != "":
                 acres = float(raw)
                 fld = self.get_object()
                 fld.area = {"hectares": round(acres / 2.47105, 6)}
@@ -965,6 +889,8 @@ class FieldViewSet(viewsets.ModelViewSet):
         except Exception:
             pass
         response = super().update(request, *args, **kwargs)
+        if partial:
+            return response
         # After update, persist irrigation method relationship if provided
         try:
             method_id = request.data.get("irrigation_method")
@@ -972,8 +898,8 @@ class FieldViewSet(viewsets.ModelViewSet):
                 field = self.get_object()
                 method = IrrigationMethods.objects.get(pk=method_id)
                 FieldIrrigationMethod.objects.update_or_create(field=field, defaults={"irrigation_method": method})
-                # return refreshed representation
-                return Response(FieldSerializer(field).data)
+                # Re-fetch: the instance above carries the pre-update prefetched irrigation methods
+                return Response(FieldSerializer(self.get_object()).data)
         except Exception:
             pass
         return response
@@ -1020,7 +946,7 @@ class SoilReportViewSet(viewsets.ModelViewSet):
         """Filter soil reports to only show user's own reports unless they have privileged access"""
         user = self.request.user
         try:
-            role_names = set(user.user_roles.select_related("role").values_list("role__name", flat=True))
+            role_names = set(get_role_names(user))
         except Exception:
             role_names = set()
         privileged = user.is_superuser or bool({"SuperAdmin", "Admin", "Agronomist", "Analyst"} & role_names)
@@ -1090,22 +1016,76 @@ class AssetViewSet(viewsets.ModelViewSet):
     serializer_class = AssetSerializer
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+def _broadcast_pk(pk):
+    """The BroadcastNotification pk in a "b-<pk>" notification id, else None."""
+    if isinstance(pk, str) and pk.startswith("b-") and pk[2:].isdigit():
+        return int(pk[2:])
+    return None
+
+
+class NotificationFeedMixin:
+    """
+    Lists direct notifications and broadcasts (see BroadcastNotification) as
+    one feed, newest first, paginated as usual; ``?cursor=`` switches to
+    keyset pages for infinite scroll.
+    """
+
+    keyset_pagination = True
+    # ``?type=`` values passed on to broadcast_feed; anything else lists received broadcasts
+    broadcast_scopes = ("sent",)
+
+    def _scope(self) -> str:
+        return (self.request.query_params.get("type") or "received").lower()
+
+    def get_broadcasts(self):
+        scope = self._scope()
+        return broadcast_feed(self.request.user, scope if scope in self.broadcast_scopes else "received")
+
+    def list(self, request, *args, **kwargs):
+        sources = [self.filter_queryset(self.get_queryset()), self.get_broadcasts()]
+        items = self.paginator.paginate_merged(sources, request, view=self)
+        return self.paginator.get_merged_response(
+            serialize_notification_feed(items, self.get_serializer_context())
+        )
+
+
+class NotificationViewSet(NotificationFeedMixin, viewsets.ReadOnlyModelViewSet):
     authentication_classes = [TokenAuthentication]
     serializer_class = NotificationSerializer
 
+    def _unread_only(self) -> bool:
+        return self.request.query_params.get("unread_only") in {"1", "true", "True"}
+
     def get_queryset(self):
         user = self.request.user
-        scope = (self.request.query_params.get("type") or "received").lower()
+        scope = self._scope()
         qs = Notification.objects.select_related("sender", "receiver")
         if scope == "sent":
             qs = qs.filter(sender=user)
         else:
             qs = qs.filter(receiver=user)
-        if self.request.query_params.get("unread_only") in {"1", "true", "True"}:
+        if self._unread_only():
             qs = qs.filter(is_read=False)
         return qs.order_by("-created_at")
 
+    def get_broadcasts(self):
+        qs = super().get_broadcasts()
+        if self._unread_only():
+            qs = qs.filter(is_read=False)
+        return qs
+
+    def _received_broadcasts(self):
+        # Read state only means something for broadcasts the user received
+        if self._scope() == "sent":
+            return BroadcastNotification.objects.none()
+        return visible_broadcasts(self.request.user)
+
+    def _broadcast_is_read(self, broadcast_pk) -> bool:
+        is_read = visible_broadcasts(self.request.user).filter(pk=broadcast_pk).values_list("is_read", flat=True).first()
+        if is_read is None:
+            raise NotFound()
+        return is_read
+
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["request"] = self.request
@@ -1113,21 +1093,58 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
+        if self._scope() != "sent":
+            # Maintained counter (apps/utils/unread_counts.py): a cache read per poll
+            return Response({"count": unread_counts.unread_count(request.user)})
         cnt = self.get_queryset().filter(is_read=False).count()
         return Response({"count": cnt})
 
     @action(detail=True, methods=["post"])
     def mark_read(self, request, pk=None):
+        broadcast_pk = _broadcast_pk(pk)
+        if broadcast_pk is not None:
+            if not self._broadcast_is_read(broadcast_pk):
+                mark_broadcasts(request.user, [broadcast_pk], is_read=True)
+                unread_counts.adjust_unread(request.user.pk, -1)
+            return Response({"detail": "Marked as read"})
         notif = self.get_object()
-        notif.is_read = True
-        notif.save(update_fields=["is_read"])
+        if not notif.is_read:
+            notif.is_read = True
+            notif.save(update_fields=["is_read"])
+            unread_counts.adjust_unread(notif.receiver_id, -1)
         return Response({"detail": "Marked as read"})
 
     @action(detail=False, methods=["post"])
     def mark_all_read(self, request):
-        updated = self.get_queryset().filter(is_read=False).update(is_read=True)
+        unread_direct = self.get_queryset().filter(is_read=False)
+        receivers = []
+        if self._scope() == "sent":
+            receivers = list(unread_direct.values_list("receiver_id", flat=True).distinct())
+        updated = unread_direct.update(is_read=True)
+        unread = list(self._received_broadcasts().filter(is_read=False).values_list("pk", flat=True))
+        mark_broadcasts(request.user, unread, is_read=True)
+        updated += len(unread)
+        if self._scope() == "sent":
+            unread_counts.forget_unread(receivers)
+        else:
+            unread_counts.reset_unread(request.user.pk)
         return Response({"detail": f"{updated} notifications marked as read"})
 
+    @action(detail=True, methods=["post"])
+    def dismiss(self, request, pk=None):
+        """Hide a broadcast from this user's feed (direct notifications stay)."""
+        broadcast_pk = _broadcast_pk(pk)
+        if broadcast_pk is None:
+            return Response(
+                {"detail": "Only broadcast notifications can be dismissed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        was_read = self._broadcast_is_read(broadcast_pk)
+        mark_broadcasts(request.user, [broadcast_pk], is_read=True, is_dismissed=True)
+        if not was_read:
+            unread_counts.adjust_unread(request.user.pk, -1)
+        return Response({"detail": "Dismissed"})
+
 
 class SupportRequestViewSet(viewsets.ModelViewSet):
     authentication_classes = [TokenAuthentication]
@@ -1173,7 +1190,7 @@ class SupportRequestViewSet(viewsets.ModelViewSet):
             pass
 
 
-class NotificationCenterViewSet(viewsets.ModelViewSet):
+class NotificationCenterViewSet(NotificationFeedMixin, viewsets.ModelViewSet):
     authentication_classes = [TokenAuthentication]
     permission_classes = [HasRole]
     required_roles = [
@@ -1186,11 +1203,12 @@ class NotificationCenterViewSet(viewsets.ModelViewSet):
         "Agronomist",
     ]
     serializer_class = NotificationSerializer
+    broadcast_scopes = ("sent", "all")
     http_method_names = ["get", "post", "head", "options"]
 
     def get_queryset(self):
         user = self.request.user
-        scope = (self.request.query_params.get("type") or "received").lower()
+        scope = self._scope()
         qs = Notification.objects.select_related("sender", "receiver").order_by("-created_at")
         if scope == "sent":
             qs = qs.filter(sender=user)
@@ -1206,7 +1224,7 @@ class NotificationCenterViewSet(viewsets.ModelViewSet):
         return ctx
 
     def _allowed_roles(self, user: CustomUser) -> set[str]:
-        role_names = user.user_roles.select_related("role").values_list("role__name", flat=True)
+        role_names = get_role_names(user)
         allowed: set[str] = set()
         for role in role_names:
             allowed.update(get_allowed_receivers(role).get("roles", []))
@@ -1272,7 +1290,7 @@ class NotificationCenterViewSet(viewsets.ModelViewSet):
         tags = request.data.get("tags")
         metadata = request.data.get("metadata")
 
-        sent_count, details = send_notification(
+        sent_count, summary = send_notification(
             sender=request.user,
             message=message,
             receiver_roles=normalized_roles,
@@ -1287,7 +1305,11 @@ class NotificationCenterViewSet(viewsets.ModelViewSet):
         if not sent_count:
             return Response({"detail": "No recipients matched the criteria."}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({"sent": sent_count, "details": details}, status=status.HTTP_201_CREATED)
+        # Large audiences are written by a background job: 202 with the same summary
+        return Response(
+            summary,
+            status=status.HTTP_202_ACCEPTED if summary["queued"] else status.HTTP_201_CREATED,
+        )
 
 
 class PracticeViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
@@ -1597,17 +1619,19 @@ class PaymentMethodViewSet(viewsets.ModelViewSet):
 class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
     authentication_classes = [TokenAuthentication]
     serializer_class = TransactionSerializer
+    # ?cursor= for constant-cost pages on long histories
+    keyset_pagination = True
 
     def get_queryset(self):
         user = self.request.user
-        user_roles = list(user.user_roles.select_related("role").values_list("role__name", flat=True))
+        user_roles = get_role_names(user)
         
         # Business role can see all transactions for financial management
         if "Business" in user_roles:
             return Transaction.objects.all().select_related("plan", "user").order_by("-created_at")
         
         # Other users see only their own transactions
-        return Transaction.objects.filter(user=user).select_related("plan").order_by("-created_at")
+        return Transaction.objects.filter(user=user).select_related("plan", "user").order_by("-created_at")
 
     @action(
         detail=True,
@@ -1620,15 +1644,7 @@ class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
         # Allow Authorization header OR token query param like exports
         resolved_user: CustomUser | None = None
         try:
-            auth_header = request.headers.get("Authorization") or ""
-            token_value = None
-            if auth_header.startswith("Token "):
-                token_value = auth_header.split(" ", 1)[1]
-            token_value = token_value or request.query_params.get("token") or request.query_params.get("access_token")
-            if token_value:
-                tok = UserAuthToken.objects.filter(access_token=token_value).select_related("user").first()
-                if tok:
-                    resolved_user = tok.user
+            resolved_user = resolve_token_user(token_from_request(request))
         except Exception:
             resolved_user = None
         if resolved_user is None and not request.user.is_authenticated:
@@ -1644,137 +1660,27 @@ class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
         if not txn:
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Generate a professional invoice PDF
-        try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter
-            from reportlab.lib import colors
-        except Exception:
-            return Response({"detail": "reportlab not installed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        import io
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-        
-        # Header
-        p.setFont("Helvetica-Bold", 24)
-        p.setFillColor(colors.HexColor("#1a5f3f"))
-        p.drawString(50, height - 60, "OELP Agricultural Platform")
-        p.setFont("Helvetica", 14)
-        p.setFillColor(colors.black)
-        p.drawString(50, height - 85, "INVOICE")
-        
-        # Invoice details
-        y = height - 130
-        p.setFont("Helvetica-Bold", 10)
-        p.setFillColor(colors.HexColor("#2d5a3d"))
-        p.drawString(50, y, "Invoice Details")
-        y -= 20
-        p.setFont("Helvetica", 10)
-        p.setFillColor(colors.black)
-        p.drawString(50, y, f"Invoice Number: INV-{txn.id:06d}")
-        y -= 15
-        p.drawString(50, y, f"Date: {txn.created_at.strftime('%B %d, %Y') if hasattr(txn, 'created_at') and txn.created_at else datetime.now().strftime('%B %d, %Y')}")
-        y -= 15
-        p.drawString(50, y, f"Transaction ID: {txn.id}")
-        y -= 15
-        p.drawString(50, y, f"Status: {txn.status.upper()}")
-        
-        # Customer information
-        y = height - 130
-        p.setFont("Helvetica-Bold", 10)
-        p.setFillColor(colors.HexColor("#2d5a3d"))
-        p.drawString(350, y, "Bill To")
-        y -= 20
-        p.setFont("Helvetica", 10)
-        p.setFillColor(colors.black)
-        p.drawString(350, y, txn.user.full_name or txn.user.username)
-        y -= 15
-        p.drawString(350, y, txn.user.email or "")
-        y -= 15
-        if hasattr(txn.user, 'phone_number') and txn.user.phone_number:
-            p.drawString(350, y, f"Phone: {txn.user.phone_number}")
-        
-        # Line separator
-        y = height - 250
-        p.setStrokeColor(colors.HexColor("#1a5f3f"))
-        p.setLineWidth(2)
-        p.line(50, y, width - 50, y)
-        y -= 20
-        
-        # Items table header
-        p.setFont("Helvetica-Bold", 11)
-        p.setFillColor(colors.HexColor("#1a5f3f"))
-        p.drawString(50, y, "Description")
-        p.drawString(300, y, "Quantity")
-        p.drawString(400, y, "Unit Price")
-        p.drawString(500, y, "Total")
-        y -= 15
-        p.setStrokeColor(colors.grey)
-        p.setLineWidth(1)
-        p.line(50, y, width - 50, y)
-        y -= 20
-        
-        # Item row
-        p.setFont("Helvetica", 10)
-        p.setFillColor(colors.black)
-        plan_name = getattr(txn.plan, 'name', 'Subscription Plan')
-        duration = getattr(txn.plan, 'duration', 30)
-        p.drawString(50, y, f"{plan_name} - {duration} days")
-        p.drawString(300, y, "1")
-        p.drawString(400, y, f"{txn.amount} {txn.currency}")
-        p.drawString(500, y, f"{txn.amount} {txn.currency}")
-        y -= 30
-        
-        # Totals
-        p.setStrokeColor(colors.grey)
-        p.line(400, y, width - 50, y)
-        y -= 15
-        p.setFont("Helvetica-Bold", 11)
-        p.setFillColor(colors.HexColor("#1a5f3f"))
-        p.drawString(400, y, "Subtotal:")
-        p.drawString(500, y, f"{txn.amount} {txn.currency}")
-        y -= 15
-        p.setFont("Helvetica", 10)
-        p.setFillColor(colors.black)
-        p.drawString(400, y, "Tax:")
-        p.drawString(500, y, "0.00")
-        y -= 15
-        p.setFont("Helvetica-Bold", 12)
-        p.setFillColor(colors.HexColor("#1a5f3f"))
-        p.drawString(400, y, "Total:")
-        p.drawString(500, y, f"{txn.amount} {txn.currency}")
-        y -= 30
-        
-        # Payment information
-        p.setFont("Helvetica-Bold", 10)
-        p.setFillColor(colors.HexColor("#2d5a3d"))
-        p.drawString(50, y, "Payment Information")
-        y -= 20
-        p.setFont("Helvetica", 10)
-        p.setFillColor(colors.black)
-        p.drawString(50, y, f"Payment Method: {getattr(txn, 'payment_method', 'Online Payment')}")
-        y -= 15
-        p.drawString(50, y, f"Payment Status: {txn.status.upper()}")
-        if hasattr(txn, 'paid_at') and txn.paid_at:
-            y -= 15
-            p.drawString(50, y, f"Paid On: {txn.paid_at.strftime('%B %d, %Y')}")
-        
-        # Footer
-        y = 100
-        p.setFont("Helvetica", 9)
-        p.setFillColor(colors.grey)
-        p.drawString(50, y, "Thank you for your business!")
-        y -= 15
-        p.drawString(50, y, "For questions about this invoice, please contact support@oelp.com")
-        y -= 15
-        p.drawString(50, y, "OELP Agricultural Platform - Empowering farmers with technology")
-        
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type="application/pdf")
-        response["Content-Disposition"] = f"attachment; filename=invoice_{txn.id}_{datetime.now().strftime('%Y%m%d')}.pdf"
+        # The key covers everything printed on the invoice, so a matching ETag
+        # is answered without rendering or touching storage
+        key = invoice_cache_key(txn)
+        etag = f'"{key}"'
+        last_modified = int((txn.updated_at or txn.created_at).timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            try:
+                name, _ = stored_invoice(txn, key, request.build_absolute_uri(request.path))
+            except ImportError:
+                return Response({"detail": "reportlab not installed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            response = FileResponse(
+                default_storage.open(name, "rb"),
+                as_attachment=True,
+                filename=f"invoice_{txn.id}_{datetime.now().strftime('%Y%m%d')}.pdf",
+                content_type="application/pdf",
+            )
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        # Token-scoped download: browsers may keep it but must revalidate
+        response["Cache-Control"] = "private, no-cache"
         return response
 
 class RecentSubscriptionsView(APIView):
@@ -2011,489 +1917,132 @@ class ExportCSVView(APIView):
     permission_classes: list = []
 
     def get(self, request):
-        # Ensure Field and SoilReport are available in this scope (explicit import to avoid UnboundLocalError)
-        from apps.models_app.field import Field
-        from apps.models_app.soil_report import SoilReport
-        
         # Resolve user from Authorization header (Token ...) or token query param
         resolved_user: CustomUser | None = None
         try:
-            auth_header = request.headers.get("Authorization") or ""
-            token_value = None
-            if auth_header.startswith("Token "):
-                token_value = auth_header.split(" ", 1)[1]
-            token_value = token_value or request.query_params.get("token") or request.query_params.get("access_token")
-            if token_value:
-                tok = UserAuthToken.objects.filter(access_token=token_value).select_related("user").first()
-                if tok:
-                    resolved_user = tok.user
+            resolved_user = resolve_token_user(token_from_request(request))
         except Exception:
             resolved_user = None
         if resolved_user is None:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
-        
-        # Optional date filters (YYYY-MM-DD)
-        start_date_str = request.query_params.get("start_date")
-        end_date_str = request.query_params.get("end_date")
-        field_id = request.query_params.get("field_id") or request.query_params.get("field")
-        start_date = None
-        end_date = None
-        try:
-            if start_date_str:
-                start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-            if end_date_str:
-                end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-        except Exception:
-            pass
-
-        # Get analytics if requested
-        analytics_params = request.query_params.getlist("analytics")
-        include_analytics = bool(analytics_params)
 
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
-        
-        # Header section
-        writer.writerow(["OELP Agricultural Platform - Comprehensive Report"])
-        writer.writerow([f"Generated for: {resolved_user.full_name or resolved_user.username}"])
-        writer.writerow([f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
-        if start_date or end_date:
-            writer.writerow([f"Date Range: {start_date or 'All'} to {end_date or 'All'}"])
-        writer.writerow([])
-        
-        # Fields data
-        try:
-            queryset = Field.objects.filter(user=resolved_user).select_related("crop", "soil_type", "farm")
-            if field_id:
-                try:
-                    field_id_int = int(field_id)
-                    queryset = queryset.filter(pk=field_id_int)
-                except (ValueError, TypeError):
-                    pass
-            if start_date:
-                queryset = queryset.filter(updated_at__date__gte=start_date)
-            if end_date:
-                queryset = queryset.filter(updated_at__date__lte=end_date)
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            queryset = Field.objects.none()
-        
-        writer.writerow(["FIELD DETAILS"])
-        writer.writerow(["Field Name", "Farm", "Crop", "Crop Variety", "Location", "Area (Acres)", "Soil Type", "Irrigation Method", "Status", "Created Date"])
-        
-        for fld in queryset:
-            # Get irrigation method
-            irrigation_name = "Not Set"
-            try:
-                fim = FieldIrrigationMethod.objects.filter(field=fld).select_related("irrigation_method").first()
-                if fim and fim.irrigation_method:
-                    irrigation_name = fim.irrigation_method.name
-            except Exception:
-                pass
-            
-            writer.writerow([
-                fld.name or "-",
-                fld.farm.name if fld.farm else "-",
-                fld.crop.name if fld.crop else "-",
-                fld.crop_variety.name if fld.crop_variety else "-",
-                fld.location_name or "-",
-                f"{fld.area:.2f}" if fld.area else "-",
-                fld.soil_type.name if fld.soil_type else "-",
-                irrigation_name,
-                "Active" if fld.is_active else "Inactive",
-                fld.created_at.strftime("%Y-%m-%d") if fld.created_at else "-"
-            ])
-        
-        writer.writerow([])
-        
-        # Soil Reports section
-        try:
-            soil_queryset = SoilReport.objects.filter(field__user=resolved_user).select_related("field", "soil_type")
-            if field_id:
-                try:
-                    field_id_int = int(field_id)
-                    soil_queryset = soil_queryset.filter(field_id=field_id_int)
-                except (ValueError, TypeError):
-                    pass
-            # Note: SoilReport model doesn't have created_at field, so we can't filter by date
-            # If date filtering is needed, we would need to add a timestamp field to the model
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            soil_queryset = SoilReport.objects.none()
-        
-        if soil_queryset.exists():
-            writer.writerow(["SOIL ANALYSIS REPORTS"])
-            writer.writerow(["Field", "pH", "EC", "Nitrogen", "Phosphorous", "Potassium", "Soil Type", "Report ID"])
-            for report in soil_queryset[:50]:
-                writer.writerow([
-                    report.field.name if report.field else "-",
-                    f"{report.ph:.2f}" if report.ph else "-",
-                    f"{report.ec:.2f}" if report.ec else "-",
-                    f"{report.nitrogen:.2f}" if report.nitrogen else "-",
-                    f"{report.phosphorous:.2f}" if report.phosphorous else "-",
-                    f"{report.potassium:.2f}" if report.potassium else "-",
-                    report.soil_type.name if report.soil_type else "-",
-                    str(report.id) if report.id else "-"
-                ])
-            writer.writerow([])
-        
-        # Analytics section if requested
-        if include_analytics:
-            try:
-                # Directly compute analytics instead of using view to avoid circular import
-                from django.db.models import Count
-                from apps.models_app.field import Field, FieldIrrigationMethod, FieldIrrigationPractice
-                
-                # Crop distribution
-                crop_counts = Field.objects.filter(user=resolved_user).values("crop__name").annotate(cnt=Count("id")).order_by("-cnt")
-                crop_distribution = [{"name": (row["crop__name"] or "Unassigned"), "value": row["cnt"]} for row in crop_counts]
-                
-                # Irrigation distribution
-                irrigation_counts = FieldIrrigationMethod.objects.filter(field__user=resolved_user).values("irrigation_method__name").annotate(cnt=Count("id")).order_by("-cnt")
-                irrigation_distribution = [{"name": (row["irrigation_method__name"] or "Unspecified"), "value": row["cnt"]} for row in irrigation_counts]
-                if not irrigation_distribution:
-                    practice_counts = FieldIrrigationPractice.objects.filter(field__user=resolved_user).values("irrigation_method__name").annotate(cnt=Count("id")).order_by("-cnt")
-                    irrigation_distribution = [{"name": (row["irrigation_method__name"] or "Unspecified"), "value": row["cnt"]} for row in practice_counts]
-                
-                analytics_data = {
-                    "crop_distribution": crop_distribution,
-                    "irrigation_distribution": irrigation_distribution,
-                }
-                
-                writer.writerow(["ANALYTICS SUMMARY"])
-                
-                if analytics_data.get("crop_distribution"):
-                    writer.writerow(["Crop Distribution"])
-                    writer.writerow(["Crop", "Count"])
-                    for item in analytics_data["crop_distribution"]:
-                        writer.writerow([item.get("name", "-"), item.get("value", 0)])
-                    writer.writerow([])
-                
-                if analytics_data.get("irrigation_distribution"):
-                    writer.writerow(["Irrigation Distribution"])
-                    writer.writerow(["Method", "Count"])
-                    for item in analytics_data["irrigation_distribution"]:
-                        writer.writerow([item.get("name", "-"), item.get("value", 0)])
-                    writer.writerow([])
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-                pass
-        
-        writer.writerow([])
-        writer.writerow(["Report generated by OELP Agricultural Platform"])
-        writer.writerow([f"For support, visit: https://oelp.com/support"])
-        
-        buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type="text/csv")
+        # Rows are written as they are read, so memory stays flat however many fields/reports the user has
+        params = parse_export_params(request.query_params)
+        response = StreamingHttpResponse(stream_report_csv(resolved_user, params), content_type="text/csv")
         response["Content-Disposition"] = f'attachment; filename="oelp_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
         return response
 
 
+def _report_file_response(job):
+    """Stored export file as an attachment (works for local and S3 storage)."""
+    _, content_type, extension = EXPORT_RENDERERS[job.format]
+    return FileResponse(
+        job.file.open("rb"),
+        as_attachment=True,
+        filename=f"oelp_report_{job.created_at.strftime('%Y%m%d_%H%M%S')}.{extension}",
+        content_type=content_type,
+    )
+
+
+def _reportlab_available() -> bool:
+    try:
+        import reportlab  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
 class ExportPDFView(APIView):
+    # Opened in a new tab with ?token=...; the PDF is rendered by the export worker
     authentication_classes: list = []
     permission_classes: list = []
 
     def get(self, request):
-        # Ensure Field and SoilReport are available in this scope (explicit import to avoid UnboundLocalError)
-        from apps.models_app.field import Field
-        from apps.models_app.soil_report import SoilReport
-        
         # Resolve user from Authorization header (Token ...) or token query param
         resolved_user: CustomUser | None = None
         try:
-            auth_header = request.headers.get("Authorization") or ""
-            token_value = None
-            if auth_header.startswith("Token "):
-                token_value = auth_header.split(" ", 1)[1]
-            token_value = token_value or request.query_params.get("token") or request.query_params.get("access_token")
-            if token_value:
-                tok = UserAuthToken.objects.filter(access_token=token_value).select_related("user").first()
-                if tok:
-                    resolved_user = tok.user
+            resolved_user = resolve_token_user(token_from_request(request))
         except Exception:
             resolved_user = None
         if resolved_user is None:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
-        
+
         # If reportlab is missing, return 501.
-        try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter, A4
-            from reportlab.lib.units import inch
-            from reportlab.lib import colors
-        except Exception:
+        if not _reportlab_available():
             return Response({"detail": "PDF export not available (reportlab missing)"}, status=status.HTTP_501_NOT_IMPLEMENTED)
 
-        # Optional date filters and field filter
-        start_date_str = request.query_params.get("start_date")
-        end_date_str = request.query_params.get("end_date")
-        field_id = request.query_params.get("field_id") or request.query_params.get("field")
-        analytics_params = request.query_params.getlist("analytics")
-        start_date = None
-        end_date = None
-        try:
-            if start_date_str:
-                start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-            if end_date_str:
-                end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-        except Exception:
-            pass
+        job = request_report_export(resolved_user, parse_export_params(request.query_params), "pdf")
+        job.refresh_from_db()  # eager mode may already have rendered it
+        if job.status == ReportExportJob.READY:
+            return _report_file_response(job)
+        if job.status == ReportExportJob.FAILED:
+            return Response({"detail": "PDF export failed", "error": job.error}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # Still rendering: a tiny page that reloads this URL; the reload reuses the same job
+        response = HttpResponse(
+            '<!doctype html><meta http-equiv="refresh" content="2">'
+            "<title>Preparing report</title><p>Preparing your report, the download will start shortly...</p>",
+            status=status.HTTP_202_ACCEPTED,
+        )
+        response["Retry-After"] = "2"
+        return response
 
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-        
-        # Header
-        p.setFont("Helvetica-Bold", 20)
-        p.setFillColor(colors.HexColor("#1a5f3f"))
-        p.drawString(50, height - 50, "OELP Agricultural Platform")
-        p.setFont("Helvetica", 14)
-        p.setFillColor(colors.black)
-        p.drawString(50, height - 75, "Comprehensive Agricultural Report")
-        
-        # User info
-        y = height - 110
-        p.setFont("Helvetica", 10)
-        p.drawString(50, y, f"Generated for: {resolved_user.full_name or resolved_user.username}")
-        y -= 15
-        p.drawString(50, y, f"Email: {resolved_user.email}")
-        y -= 15
-        p.drawString(50, y, f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}")
-        y -= 15
-        if start_date or end_date:
-            p.drawString(50, y, f"Date Range: {start_date.strftime('%Y-%m-%d') if start_date else 'All'} to {end_date.strftime('%Y-%m-%d') if end_date else 'All'}")
-            y -= 20
-        else:
-            y -= 10
-        
-        # Fields section
-        try:
-            queryset = Field.objects.filter(user=resolved_user).select_related("crop", "soil_type", "farm")
-            if field_id:
-                try:
-                    field_id_int = int(field_id)
-                    queryset = queryset.filter(pk=field_id_int)
-                except (ValueError, TypeError):
-                    pass
-            if start_date:
-                queryset = queryset.filter(updated_at__date__gte=start_date)
-            if end_date:
-                queryset = queryset.filter(updated_at__date__lte=end_date)
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            queryset = Field.objects.none()
-        
-        fields_list = list(queryset)
-        
-        if fields_list:
-            y -= 10
-            p.setFont("Helvetica-Bold", 14)
-            p.setFillColor(colors.HexColor("#1a5f3f"))
-            p.drawString(50, y, "FIELD DETAILS")
-            y -= 20
-            
-            p.setFont("Helvetica-Bold", 9)
-            p.setFillColor(colors.HexColor("#2d5a3d"))
-            p.drawString(50, y, "Field Name")
-            p.drawString(200, y, "Crop")
-            p.drawString(300, y, "Location")
-            p.drawString(400, y, "Area (Acres)")
-            p.drawString(500, y, "Status")
-            y -= 15
-            p.setStrokeColor(colors.grey)
-            p.line(50, y, 550, y)
-            y -= 10
-            
-            p.setFont("Helvetica", 9)
-            p.setFillColor(colors.black)
-            for fld in fields_list[:25]:  # Limit to 25 per page
-                if y < 100:
-                    p.showPage()
-                    y = height - 50
-                    p.setFont("Helvetica-Bold", 9)
-                    p.setFillColor(colors.HexColor("#2d5a3d"))
-                    p.drawString(50, y, "Field Name")
-                    p.drawString(200, y, "Crop")
-                    p.drawString(300, y, "Location")
-                    p.drawString(400, y, "Area (Acres)")
-                    p.drawString(500, y, "Status")
-                    y -= 15
-                    p.line(50, y, 550, y)
-                    y -= 10
-                    p.setFont("Helvetica", 9)
-                
-                p.drawString(50, y, (fld.name or "-")[:30])
-                p.drawString(200, y, (fld.crop.name if fld.crop else "-")[:20])
-                p.drawString(300, y, (fld.location_name or "-")[:20])
-                p.drawString(400, y, f"{fld.area:.2f}" if fld.area else "-")
-                p.drawString(500, y, "Active" if fld.is_active else "Inactive")
-                y -= 15
-            
-            y -= 10
-        
-        # Soil Reports section
+
+class ReportExportJobCreateView(APIView):
+    """Queue (or reuse) a report export; poll the returned job until it is ready."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        fmt = (request.data.get("format") or request.query_params.get("format") or "pdf").lower()
+        if fmt not in EXPORT_RENDERERS:
+            return Response({"detail": f"Unsupported export format '{fmt}'"}, status=status.HTTP_400_BAD_REQUEST)
+        if fmt == "pdf" and not _reportlab_available():
+            return Response({"detail": "PDF export not available (reportlab missing)"}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        query = request.query_params.copy()
+        for key in ("start_date", "end_date", "field_id", "field"):
+            if request.data.get(key) not in (None, ""):
+                query[key] = str(request.data.get(key))
+        if request.data.get("analytics"):
+            query.setlist("analytics", ["1"])
+        refresh = str(request.data.get("refresh") or request.query_params.get("refresh") or "").lower() in ("1", "true")
+        job = request_report_export(request.user, parse_export_params(query), fmt, refresh=refresh)
+        job.refresh_from_db()
+        code = status.HTTP_200_OK if job.status == ReportExportJob.READY else status.HTTP_202_ACCEPTED
+        return Response(ReportExportJobSerializer(job, context={"request": request}).data, status=code)
+
+
+class ReportExportJobStatusView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = ReportExportJob.objects.filter(pk=pk, user=request.user).first()
+        if job is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ReportExportJobSerializer(job, context={"request": request}).data)
+
+
+class ReportExportJobDownloadView(APIView):
+    # Accept token via header or query param, like the direct export views
+    authentication_classes: list = []
+    permission_classes: list = []
+
+    def get(self, request, pk):
+        resolved_user: CustomUser | None = None
         try:
-            soil_queryset = SoilReport.objects.filter(field__user=resolved_user).select_related("field", "soil_type")
-            if field_id:
-                try:
-                    field_id_int = int(field_id)
-                    soil_queryset = soil_queryset.filter(field_id=field_id_int)
-                except (ValueError, TypeError):
-                    pass
-            # Note: SoilReport model doesn't have created_at field, so we can't filter by date
-            # If date filtering is needed, we would need to add a timestamp field to the model
-            
-            soil_reports = list(soil_queryset[:50])  # Limit to prevent memory issues
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            soil_reports = []
-        if soil_reports:
-            if y < 150:
-                p.showPage()
-                y = height - 50
-            
-            p.setFont("Helvetica-Bold", 14)
-            p.setFillColor(colors.HexColor("#1a5f3f"))
-            p.drawString(50, y, "SOIL ANALYSIS REPORTS")
-            y -= 20
-            
-            p.setFont("Helvetica-Bold", 9)
-            p.setFillColor(colors.HexColor("#2d5a3d"))
-            p.drawString(50, y, "Field")
-            p.drawString(150, y, "pH")
-            p.drawString(200, y, "EC")
-            p.drawString(250, y, "N")
-            p.drawString(300, y, "P")
-            p.drawString(350, y, "K")
-            p.drawString(400, y, "Soil Type")
-            y -= 15
-            p.line(50, y, 550, y)
-            y -= 10
-            
-            p.setFont("Helvetica", 9)
-            p.setFillColor(colors.black)
-            for report in soil_reports[:50]:  # Limit to prevent memory issues
-                if y < 100:
-                    p.showPage()
-                    y = height - 50
-                    p.setFont("Helvetica-Bold", 9)
-                    p.setFillColor(colors.HexColor("#2d5a3d"))
-                    p.drawString(50, y, "Field")
-                    p.drawString(150, y, "pH")
-                    p.drawString(200, y, "EC")
-                    p.drawString(250, y, "N")
-                    p.drawString(300, y, "P")
-                    p.drawString(350, y, "K")
-                    p.drawString(400, y, "Soil Type")
-                    y -= 15
-                    p.line(50, y, 550, y)
-                    y -= 10
-                    p.setFont("Helvetica", 9)
-                
-                field_name = (report.field.name if report.field else "-")[:25]
-                p.drawString(50, y, field_name)
-                p.drawString(150, y, f"{report.ph:.2f}" if report.ph else "-")
-                p.drawString(200, y, f"{report.ec:.2f}" if report.ec else "-")
-                p.drawString(250, y, f"{report.nitrogen:.2f}" if report.nitrogen else "-")
-                p.drawString(300, y, f"{report.phosphorous:.2f}" if report.phosphorous else "-")
-                p.drawString(350, y, f"{report.potassium:.2f}" if report.potassium else "-")
-                p.drawString(400, y, (report.soil_type.name if report.soil_type else "-")[:15])
-                y -= 15
-            
-            y -= 10
-        
-        # Analytics section if requested
-        if analytics_params:
-            try:
-                # Directly compute analytics instead of using view to avoid circular import
-                from django.db.models import Count
-                from apps.models_app.field import Field, FieldIrrigationMethod, FieldIrrigationPractice
-                
-                # Crop distribution
-                crop_counts = Field.objects.filter(user=resolved_user).values("crop__name").annotate(cnt=Count("id")).order_by("-cnt")
-                crop_distribution = [{"name": (row["crop__name"] or "Unassigned"), "value": row["cnt"]} for row in crop_counts]
-                
-                # Irrigation distribution
-                irrigation_counts = FieldIrrigationMethod.objects.filter(field__user=resolved_user).values("irrigation_method__name").annotate(cnt=Count("id")).order_by("-cnt")
-                irrigation_distribution = [{"name": (row["irrigation_method__name"] or "Unspecified"), "value": row["cnt"]} for row in irrigation_counts]
-                if not irrigation_distribution:
-                    practice_counts = FieldIrrigationPractice.objects.filter(field__user=resolved_user).values("irrigation_method__name").annotate(cnt=Count("id")).order_by("-cnt")
-                    irrigation_distribution = [{"name": (row["irrigation_method__name"] or "Unspecified"), "value": row["cnt"]} for row in practice_counts]
-                
-                analytics_data = {
-                    "crop_distribution": crop_distribution,
-                    "irrigation_distribution": irrigation_distribution,
-                }
-                
-                if y < 200:
-                    p.showPage()
-                    y = height - 50
-                
-                p.setFont("Helvetica-Bold", 14)
-                p.setFillColor(colors.HexColor("#1a5f3f"))
-                p.drawString(50, y, "ANALYTICS SUMMARY")
-                y -= 25
-                
-                if analytics_data.get("crop_distribution"):
-                    p.setFont("Helvetica-Bold", 11)
-                    p.setFillColor(colors.HexColor("#2d5a3d"))
-                    p.drawString(50, y, "Crop Distribution")
-                    y -= 15
-                    p.setFont("Helvetica", 9)
-                    p.setFillColor(colors.black)
-                    for item in analytics_data["crop_distribution"][:10]:
-                        p.drawString(70, y, f"{item.get('name', '-')}: {item.get('value', 0)} fields")
-                        y -= 12
-                    y -= 5
-                
-                if analytics_data.get("irrigation_distribution"):
-                    if y < 100:
-                        p.showPage()
-                        y = height - 50
-                    p.setFont("Helvetica-Bold", 11)
-                    p.setFillColor(colors.HexColor("#2d5a3d"))
-                    p.drawString(50, y, "Irrigation Distribution")
-                    y -= 15
-                    p.setFont("Helvetica", 9)
-                    p.setFillColor(colors.black)
-                    for item in analytics_data["irrigation_distribution"][:10]:
-                        p.drawString(70, y, f"{item.get('name', '-')}: {item.get('value', 0)} fields")
-                        y -= 12
-                    y -= 5
-                
-                if analytics_data.get("lifecycle_completion_percent") is not None:
-                    if y < 80:
-                        p.showPage()
-                        y = height - 50
-                    p.setFont("Helvetica-Bold", 11)
-                    p.setFillColor(colors.HexColor("#2d5a3d"))
-                    p.drawString(50, y, f"Lifecycle Completion: {analytics_data.get('lifecycle_completion_percent', 0)}%")
-                    y -= 15
-            except Exception:
-                pass
-        
-        # Footer
-        if y < 80:
-            p.showPage()
-            y = height - 50
-        
-        p.setFont("Helvetica", 8)
-        p.setFillColor(colors.grey)
-        p.drawString(50, y, "Report generated by OELP Agricultural Platform")
-        y -= 10
-        p.drawString(50, y, "For support, visit: https://oelp.com/support")
-        
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="oelp_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf"'
-        return response
+            resolved_user = resolve_token_user(token_from_request(request))
+        except Exception:
+            resolved_user = None
+        if resolved_user is None:
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+        job = ReportExportJob.objects.filter(pk=pk, user=resolved_user).first()
+        if job is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        if job.status != ReportExportJob.READY or not job.file:
+            return Response({"detail": f"Export is {job.status}"}, status=status.HTTP_409_CONFLICT)
+        if job.is_expired:
+            return Response({"detail": "Export has expired"}, status=status.HTTP_410_GONE)
+        return _report_file_response(job)
 
 def get_user_subscription_features(user):
     """Helper function to get user's active subscription features"""
@@ -2526,506 +2075,27 @@ def get_user_subscription_features(user):
     }
 
 
-def get_user_farm_data(user):
-    """Helper function to get user's farm data for AI context"""
-    try:
-        # Get user info
-        user_info = {
-            "name": user.full_name or user.username or "User",
-            "email": user.email,
-        }
-        
-        # Get subscription info
-        sub_info = get_user_subscription_features(user)
-        
-        # Get farms
-        farms = Farm.objects.filter(user=user).values("id", "name")
-        
-        # Get fields with related data
-        fields = Field.objects.filter(user=user).select_related(
-            "farm", "crop", "crop_variety", "soil_type"
-        )
-        
-        fields_data = []
-        total_acres = 0
-        crops_list = []
-        
-        for field in fields:
-            # Get irrigation method - FieldIrrigationMethod doesn't have related_name, use default
-            irrigation_method = None
-            try:
-                fim = FieldIrrigationMethod.objects.filter(field=field).select_related("irrigation_method").first()
-                if fim and fim.irrigation_method:
-                    irrigation_method = fim.irrigation_method.name
-            except Exception:
-                pass
-            
-            # Get size
-            size_acres = None
-            try:
-                hectares = (field.area or {}).get("hectares")
-                if isinstance(hectares, (int, float)):
-                    size_acres = round(float(hectares) * 2.47105, 4)
-                    total_acres += size_acres
-            except Exception:
-                pass
-            
-            # Get lifecycle dates
-            lifecycle = CropLifecycleDates.objects.filter(field=field).order_by("-id").first()
-            
-            field_data = {
-                "name": field.name,
-                "farm": field.farm.name if field.farm else None,
-                "crop": field.crop.name if field.crop else None,
-                "crop_variety": field.crop_variety.name if field.crop_variety else None,
-                "soil_type": field.soil_type.name if field.soil_type else None,
-                "irrigation_method": irrigation_method,
-                "size_acres": size_acres,
-                "location": field.location_name,
-                "is_active": field.is_active,
-                "sowing_date": str(lifecycle.sowing_date) if lifecycle and lifecycle.sowing_date else None,
-                "harvesting_date": str(lifecycle.harvesting_date) if lifecycle and lifecycle.harvesting_date else None,
-            }
-            fields_data.append(field_data)
-            
-            # Collect unique crops (only if crop is assigned)
-            if field.crop and hasattr(field.crop, 'name') and field.crop.name:
-                crop_name = field.crop.name
-                if crop_name and crop_name not in crops_list:
-                    crops_list.append(crop_name)
-        
-        # Get all crops (even if not assigned to fields)
-        all_crops = Crop.objects.all().values_list("name", flat=True).distinct()
-        
-        return {
-            "user": user_info,
-            "subscription": {
-                "plan_name": sub_info.get("plan_name", "Free"),
-                "features": sub_info.get("features", []),
-            },
-            "farms": list(farms),
-            "fields": fields_data,
-            "total_acres": round(total_acres, 2),
-            "crops_growing": crops_list,
-            "all_available_crops": list(all_crops),
-            "total_fields": len(fields_data),
-            "active_fields": len([f for f in fields_data if f.get("is_active")]),
-        }
-    except Exception as e:
-        import logging
-        import traceback
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error fetching user farm data: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        # Return empty but don't crash - let AI handle it
-        return {
-            "user": {"name": user.full_name or user.username or "User", "email": getattr(user, 'email', '')},
-            "subscription": {"plan_name": "Free", "features": []},
-            "farms": [],
-            "fields": [],
-            "total_acres": 0,
-            "crops_growing": [],
-            "all_available_crops": [],
-            "total_fields": 0,
-            "active_fields": 0,
-        }
-
-
 class AgribotView(APIView):
     authentication_classes = [TokenAuthentication]
     
     def post(self, request):
         """Handle Agribot chat requests with OpenAI"""
-        user = request.user
-        message = request.data.get("message", "").strip()
-        
-        if not message:
-            return Response({"detail": "Message is required"}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Check user's subscription
-        sub_info = get_user_subscription_features(user)
-        plan_name = sub_info.get("plan_name", "Free")
-        plan_type = sub_info.get("plan_type", "free")
-        features = sub_info.get("features", [])
-        
-        # Check if user has AI Assistant feature
-        has_ai_assistant = "AI Assistant" in features
-        
-        if not has_ai_assistant:
-            return Response({
-                "detail": "AI Assistant is only available with TopUp or Enterprise plans. Please upgrade your subscription.",
-                "error": "feature_not_available"
-            }, status=status.HTTP_403_FORBIDDEN)
-        
-        # Check if it's top-up plan (limited calls) or enterprise (unlimited)
-        is_enterprise = plan_name.lower() == "enterpriseplan" or plan_type == "enterprise"
-        is_topup = plan_name.lower() == "topupplan" or plan_type == "topup"
-        
-        # Track usage for top-up plan (6-8 calls per day)
-        usage = None
-        if is_topup:
-            from datetime import date
-            today = date.today()
-            user_plan = sub_info.get("user_plan")
-            
-            if user_plan:
-                # Get or create feature usage tracking
-                try:
-                    ai_feature = Feature.objects.get(name="AI Assistant")
-                    usage, created = PlanFeatureUsage.objects.get_or_create(
-                        user_plan=user_plan,
-                        feature=ai_feature,
-                        defaults={"max_count": 8, "used_count": 0, "duration_days": 1}
-                    )
-                    
-                    # Reset daily count if it's a new day (simplified - check if created today)
-                    if created or usage.updated_at.date() < today:
-                        usage.used_count = 0
-                        usage.save()
-                    
-                    # Check if limit exceeded
-                    if usage.used_count >= usage.max_count:
-                        return Response({
-                            "detail": f"You have reached your daily limit of {usage.max_count} AI prompts. Please try again tomorrow or upgrade to Enterprise for unlimited access.",
-                            "error": "limit_exceeded",
-                            "remaining": 0
-                        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
-                    
-                    # Increment usage (will save after successful API call)
-                except Feature.DoesNotExist:
-                    # Feature doesn't exist, allow but don't track
-                    pass
-                except Exception as e:
-                    # If tracking fails, still allow but log
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"Error tracking AI usage: {str(e)}")
-                    pass
-        
-        # Validate message is related to farming/agriculture
-        farming_keywords = [
-            "farm", "crop", "field", "soil", "irrigation", "harvest", "sowing", "agriculture",
-            "farming", "fertilizer", "pest", "disease", "yield", "acre", "hectare", "agricultural",
-            "farmer", "cultivation", "planting", "watering", "weather", "season", "agricultural",
-            "livestock", "cattle", "poultry", "organic", "sustainable", "agri", "agribot",
-            "cotton", "wheat", "rice", "corn", "maize", "vegetable", "fruit", "grain", "seed",
-            "suitable", "type", "grow", "growing", "plant", "plants", "crops", "farming"
-        ]
-        
-        message_lower = message.lower()
-        is_farming_related = any(keyword in message_lower for keyword in farming_keywords)
-        
-        if not is_farming_related:
-            return Response({
-                "response": "I'm Agribot, your agricultural assistant. Please ask me questions related to farming, agriculture, crops, soil management, irrigation, or anything related to this agricultural platform.",
-                "error": "off_topic"
-            }, status=status.HTTP_200_OK)
+        try:
+            turn = start_turn(request.user, request.data.get("message", ""))
+        except TurnRejected as rejected:
+            return Response(rejected.payload, status=rejected.status_code)
+        if turn.cached_response is not None:
+            return Response({"response": turn.cached_response, "cached": True})
         
-        # Get user's farm data for context
-        farm_data = get_user_farm_data(user)
+        # Providers are tried concurrently under one deadline (see agribot/providers.py)
+        ai_response, error = dispatch(turn.system_prompt, turn.message)
+        if error:
+            return Response(error_reply(error), status=status.HTTP_200_OK)
         
-        # Call AI API (Free alternatives: Groq, Hugging Face, or OpenAI)
-        try:
-            import os
-            import json
-            # Support multiple API providers (in order of preference: Groq > Hugging Face > OpenAI)
-            groq_api_key = os.getenv("GROQ_API_KEY")
-            huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY") or os.getenv("HF_API_KEY")
-            openai_api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_KEY")
-            
-            # Prepare prompt with user's farm data context
-            user_context = f"""=== FARMER INFORMATION ===
-Name: {farm_data['user']['name']}
-Subscription Plan: {farm_data['subscription']['plan_name']}
-Plan Features: {', '.join(farm_data['subscription']['features']) if farm_data['subscription']['features'] else 'Basic Reports'}
-
-=== FARM STATISTICS ===
-Total Fields: {farm_data['total_fields']}
-Active Fields: {farm_data['active_fields']}
-Total Land Area: {farm_data['total_acres']} acres
-Number of Farms: {len(farm_data['farms'])}
-
-=== CROPS CURRENTLY GROWING ===
-{f', '.join(farm_data['crops_growing']) if farm_data['crops_growing'] else 'No crops currently assigned to fields'}
-
-=== AVAILABLE CROPS IN SYSTEM ===
-{', '.join(farm_data['all_available_crops'][:30]) if farm_data['all_available_crops'] else 'None'}
-
-=== FIELD DETAILS ===
-"""
-            if farm_data['fields']:
-                for idx, field in enumerate(farm_data['fields'][:15], 1):  # Limit to 15 fields for context
-                    field_info = f"""
-Field #{idx}: "{field['name']}"
-  • Farm: {field['farm'] or 'Not assigned'}
-  • Crop: {field['crop'] or 'Not assigned'}
-  • Variety: {field['crop_variety'] or 'Not specified'}
-  • Size: {field['size_acres'] or 'Unknown'} acres
-  • Soil Type: {field['soil_type'] or 'Not specified'}
-  • Irrigation Method: {field['irrigation_method'] or 'Not specified'}
-  • Location: {field['location'] or 'Not specified'}
-  • Status: {'Active' if field['is_active'] else 'Inactive'}
-  • Sowing Date: {field['sowing_date'] or 'Not set'}
-  • Harvest Date: {field['harvesting_date'] or 'Not set'}
-"""
-                    user_context += field_info
-            else:
-                user_context += "No fields registered yet.\n"
-            
-            system_prompt = f"""You are Agribot, an AI assistant specialized in agriculture and farming. You have DIRECT ACCESS to this farmer's actual farm data.
-
-{user_context}
-
-CRITICAL INSTRUCTIONS - READ CAREFULLY:
-
-1. DISTINGUISHING QUESTION TYPES:
-   - Questions asking ABOUT THEIR FARM (use their data):
-     * "what crops am I growing?" / "list my crops" / "what crops i am growing" / "what am I growing?"
-     * "how many acres do I have?" / "what's my farm size?"
-     * "tell me about my fields" / "what fields do I have?"
-     * "what's my subscription plan?"
-   - Questions asking FOR GENERAL ADVICE (use general knowledge, NOT their data):
-     * "I am growing tomatoes, any tips?" / "I'm growing X, help me"
-     * "how to grow tomatoes?" / "tips for growing corn"
-     * "which soil type is best for corn?"
-     * "what irrigation method for wheat?"
-     * Any question that asks "how to", "tips for", "best for", "advice on" - these are GENERAL questions
-
-2. For questions ABOUT THEIR SPECIFIC FARM:
-   - ALWAYS check the "CROPS CURRENTLY GROWING" section above FIRST
-   - If crops are listed there, respond with THOSE EXACT crops - DO NOT say "no crops" if crops are listed
-   - If asked "what crops am I growing?" or "list my crops", respond with the EXACT crops from "CROPS CURRENTLY GROWING" section
-   - If asked about fields, reference the SPECIFIC field names and details from "FIELD DETAILS"
-   - If asked about farm size or acres, use the EXACT number: {farm_data['total_acres']} acres
-   - If asked about subscription/plan, mention their current plan: {farm_data['subscription']['plan_name']}
-   - Be specific and personal - use "your" when referring to their data
-   - IMPORTANT: If "CROPS CURRENTLY GROWING" shows crops, you MUST list them. Do NOT say "no crops" if crops are listed.
-
-3. For GENERAL AGRICULTURAL QUESTIONS (asking for advice/tips/how-to):
-   - Answer with general agricultural knowledge
-   - DO NOT reference their farm data unless it's directly relevant to the advice
-   - If they say "I am growing X" or "I'm growing X", they're asking for GENERAL ADVICE about growing X, NOT stating what's in their farm
-   - Provide helpful tips, best practices, and general information
-   - DO NOT correct them about what crops they're "actually" growing unless they specifically ask "what crops am I growing?"
-
-4. If the user asks about their data but the data shows empty/None:
-   - Still answer the general question
-   - Politely mention that they haven't set up that data yet
-   - Offer to help them set it up
-
-You help with:
-- Answering questions about their specific crops, fields, and farm (use their data)
-- General crop management and best practices (use agricultural knowledge)
-- Soil analysis and recommendations
-- Irrigation scheduling and methods
-- Pest and disease identification
-- Harvest planning
-- Agricultural best practices
-- General farming questions
-
-Keep responses concise, practical, and focused on agriculture. Use their actual data when they ask about THEIR farm, use general knowledge for general questions."""
-            
-            full_prompt = f"{system_prompt}\n\nUser Question: {message}\n\nAgribot Response:"
-            
-            # Try Groq API first (Free and Fast), then Hugging Face, then OpenAI
-            if groq_api_key:
-                # Use Groq API (Free, Fast, No Credit Card Required)
-                # Try multiple models in case one is unavailable
-                groq_models = ["llama-3.1-8b-instant", "llama-3.2-3b-preview", "mixtral-8x7b-32768"]
-                
-                for model_name in groq_models:
-                    try:
-                        response = requests.post(
-                            "https://api.groq.com/openai/v1/chat/completions",
-                            headers={
-                                "Authorization": f"Bearer {groq_api_key}",
-                                "Content-Type": "application/json"
-                            },
-                            json={
-                                "model": model_name,
-                                "messages": [
-                                    {"role": "system", "content": system_prompt},
-                                    {"role": "user", "content": message}
-                                ],
-                                "max_tokens": 500,
-                                "temperature": 0.7
-                            },
-                            timeout=30
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            ai_response = data.get("choices", [{}])[0].get("message", {}).get("content", "I'm sorry, I couldn't generate a response.")
-                            
-                            # Save usage increment after successful API call
-                            if usage:
-                                try:
-                                    usage.used_count += 1
-                                    usage.save()
-                                except Exception:
-                                    pass
-                            
-                            return Response({
-                                "response": ai_response,
-                                "remaining": (usage.max_count - usage.used_count) if usage else None
-                            })
-                        elif response.status_code in [404, 410]:  # Model not found or gone, try next model
-                            continue  # Try next model
-                        else:
-                            # For other errors, try to get error message but still try next model
-                            try:
-                                error_data = response.json()
-                                error_msg = error_data.get("error", {}).get("message", "")
-                                if "quota" in error_msg.lower() or "billing" in error_msg.lower():
-                                    # Quota error - don't try more models
-                                    return Response({
-                                        "response": "I'm currently unavailable due to service limitations. Please contact support or try again later.",
-                                        "error": "quota_exceeded"
-                                    }, status=status.HTTP_200_OK)
-                            except Exception:
-                                pass
-                            continue  # Try next model
-                    except Exception:
-                        continue  # Try next model
-            
-            # Try Hugging Face if Groq not available
-            if huggingface_api_key:
-                # Use Hugging Face Inference API - try multiple models
-                hf_models = [
-                    "google/flan-t5-large",  # Reliable text generation
-                    "microsoft/DialoGPT-large",  # Conversational
-                    "facebook/blenderbot-400M-distill"  # Chat model
-                ]
-                
-                for model_name in hf_models:
-                    try:
-                        response = requests.post(
-                            f"https://api-inference.huggingface.co/models/{model_name}",
-                            headers={
-                                "Authorization": f"Bearer {huggingface_api_key}",
-                                "Content-Type": "application/json"
-                            },
-                            json={
-                                "inputs": f"{system_prompt}\n\nUser: {message}\n\nAssistant:",
-                                "parameters": {
-                                    "max_new_tokens": 500,
-                                    "temperature": 0.7,
-                                    "return_full_text": False
-                                }
-                            },
-                            timeout=45
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            # Hugging Face returns generated text
-                            if isinstance(data, list) and len(data) > 0:
-                                ai_response = data[0].get("generated_text", "").strip()
-                            elif isinstance(data, dict):
-                                ai_response = data.get("generated_text", "").strip()
-                            else:
-                                ai_response = str(data).strip()
-                            
-                            # Clean up the response
-                            if "Assistant:" in ai_response:
-                                ai_response = ai_response.split("Assistant:")[-1].strip()
-                            
-                            if not ai_response or len(ai_response) < 10:
-                                continue  # Try next model if response is too short
-                            
-                            # Save usage increment after successful API call
-                            if usage:
-                                try:
-                                    usage.used_count += 1
-                                    usage.save()
-                                except Exception:
-                                    pass
-                            
-                            return Response({
-                                "response": ai_response,
-                                "remaining": (usage.max_count - usage.used_count) if usage else None
-                            })
-                        elif response.status_code not in [404, 410, 503]:  # Skip if model not found/gone/loading
-                            break  # Other errors, don't try more models
-                    except Exception:
-                        continue  # Try next model
-            
-            # Fallback to OpenAI if Hugging Face not configured
-            if openai_api_key:
-                response = requests.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {openai_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "gpt-3.5-turbo",
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": message}
-                        ],
-                        "max_tokens": 500,
-                        "temperature": 0.7
-                    },
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    ai_response = data.get("choices", [{}])[0].get("message", {}).get("content", "I'm sorry, I couldn't generate a response.")
-                    
-                    # Save usage increment after successful API call
-                    if usage:
-                        try:
-                            usage.used_count += 1
-                            usage.save()
-                        except Exception:
-                            pass
-                    
-                    return Response({
-                        "response": ai_response,
-                        "remaining": (usage.max_count - usage.used_count) if usage else None
-                    })
-            
-            # No API key configured
-            if not groq_api_key and not huggingface_api_key and not openai_api_key:
-                return Response({
-                    "response": "AI service is not configured. Please set GROQ_API_KEY, HUGGINGFACE_API_KEY, or OPENAI_API_KEY environment variable.",
-                    "error": "config_error"
-                }, status=status.HTTP_200_OK)
-            
-            # If we get here, all AI services failed - return helpful error
-            return Response({
-                "response": "I'm currently unable to process your request. The AI service may be temporarily unavailable or the model endpoint has changed. Please try again in a few moments or contact support.",
-                "error": "service_unavailable"
-            }, status=status.HTTP_200_OK)
-                
-        except requests.exceptions.Timeout:
-            return Response({
-                "response": "The AI service is taking too long to respond. Please try again later.",
-                "error": "timeout_error"
-            }, status=status.HTTP_200_OK)
-        except requests.exceptions.ConnectionError:
-            return Response({
-                "response": "Unable to connect to the AI service. Please check your internet connection and try again.",
-                "error": "connection_error"
-            }, status=status.HTTP_200_OK)
-        except requests.exceptions.RequestException as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Agribot request error: {str(e)}")
-            return Response({
-                "response": f"Error connecting to AI service: {str(e)}. Please try again later.",
-                "error": "connection_error"
-            }, status=status.HTTP_200_OK)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Agribot unexpected error: {str(e)}", exc_info=True)
-            return Response({
-                "response": f"I encountered an unexpected error. Please try again later or contact support. Error: {str(e)}",
-                "error": "unexpected_error"
-            }, status=status.HTTP_200_OK)
+        return Response({
+            "response": ai_response,
+            "remaining": finish_turn(turn, ai_response)
+        })
     
     def get(self, request):
         """Get user's AI usage status"""
@@ -3072,87 +2142,29 @@ Keep responses concise, practical, and focused on agriculture. Use their actual
         return Response(usage_info)
 
 
+class AgribotAnswerCacheView(APIView):
+    """Hit-rate figures of this worker's Agribot answer cache."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [HasRole]
+    required_roles = ["SuperAdmin", "Admin", "Developer"]
+
+    def get(self, request):
+        return Response(answer_cache.stats())
+
+
 class AnalyticsSummaryView(APIView):
     authentication_classes = [TokenAuthentication]
 
     def get(self, request):
         user = request.user
         try:
-            role_names = set(user.user_roles.select_related("role").values_list("role__name", flat=True))
+            role_names = set(get_role_names(user))
         except Exception:
             role_names = set()
         privileged = user.is_superuser or bool({"SuperAdmin", "Admin", "Agronomist", "Analyst", "Business", "Developer"} & role_names)
 
-        # Crop distribution by assigned crop on fields
-        crop_counts = (
-            (Field.objects.all() if privileged else Field.objects.filter(user=user))
-            .values("crop__name")
-            .annotate(cnt=Count("id"))
-            .order_by("-cnt")
-        )
-        crop_distribution = [
-            {"name": (row["crop__name"] or "Unassigned"), "value": row["cnt"]}
-            for row in crop_counts
-        ]
-
-        # Irrigation distribution: prefer explicit method mapping; fallback to practices
-        irrigation_counts = (
-            FieldIrrigationMethod.objects.filter(field__in=(Field.objects.all() if privileged else Field.objects.filter(user=user)))
-            .values("irrigation_method__name")
-            .annotate(cnt=Count("id"))
-            .order_by("-cnt")
-        )
-        irrigation_distribution = [
-            {"name": (row["irrigation_method__name"] or "Unspecified"), "value": row["cnt"]}
-            for row in irrigation_counts
-        ]
-        if not irrigation_distribution:
-            practice_counts = (
-                FieldIrrigationPractice.objects.filter(field__in=(Field.objects.all() if privileged else Field.objects.filter(user=user)))
-                .values("irrigation_method__name")
-                .annotate(cnt=Count("id"))
-                .order_by("-cnt")
-            )
-            irrigation_distribution = [
-                {"name": (row["irrigation_method__name"] or "Unspecified"), "value": row["cnt"]}
-                for row in practice_counts
-            ]
-
-        # Lifecycle completion breakdown and percent
-        lifecycle_base = CropLifecycleDates.objects.filter(field__in=(Field.objects.all() if privileged else Field.objects.filter(user=user)))
-        total_lifecycle = lifecycle_base.count()
-        completed_lifecycle = lifecycle_base.filter(harvesting_date__isnull=False).count()
-        remaining_lifecycle = max(total_lifecycle - completed_lifecycle, 0)
-        lifecycle_completion_percent = int(round((completed_lifecycle / total_lifecycle) * 100)) if total_lifecycle else 0
-        lifecycle_completion = [
-            {"name": "Completed", "value": completed_lifecycle},
-            {"name": "Remaining", "value": remaining_lifecycle},
-        ]
-
-        # Region distribution based on Field.location_name (fallback to Unknown)
-        region_counts = (
-            (Field.objects.all() if privileged else Field.objects.filter(user=user))
-            .values("location_name")
-            .annotate(cnt=Count("id"))
-            .order_by("-cnt")
-        )
-        region_distribution = [
-            {"name": (row["location_name"] or "Unknown"), "value": row["cnt"]}
-            for row in region_counts
-        ]
-
-        has_data = bool(crop_distribution or irrigation_distribution or region_distribution or total_lifecycle)
-
-        return Response(
-            {
-                "has_data": has_data,
-                "lifecycle_completion": lifecycle_completion,
-                "lifecycle_completion_percent": lifecycle_completion_percent,
-                "crop_distribution": crop_distribution,
-                "irrigation_distribution": irrigation_distribution,
-                "region_distribution": region_distribution,
-            }
-        )
+        # Computed in one grouped pass and cached per scope; field changes invalidate it
+        return Response(get_field_analytics(user.pk, privileged))
 
 # Support Ticket ViewSets
 
@@ -3166,32 +2178,48 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
     """
     authentication_classes = [TokenAuthentication]
     serializer_class = SupportTicketSerializer
+    # Actions that return flat ticket lists (no nested comments)
+    list_actions = {"list", "my_tickets", "assigned_to_me", "by_status", "forwarded_to_me"}
 
     def get_queryset(self):
         user = self.request.user
-        user_roles = list(user.user_roles.select_related("role").values_list("role__name", flat=True))
+        user_roles = get_role_names(user)
         
         # Support team sees all tickets
         if "Support" in user_roles or "Admin" in user_roles or "SuperAdmin" in user_roles:
-            return SupportTicket.objects.all().select_related(
-                "created_by", "assigned_to_support", "forwarded_to_user", "resolved_by"
-            ).prefetch_related("comments", "history").order_by("-created_at")
+            queryset = SupportTicket.objects.all()
+        else:
+            # Other roles see tickets forwarded to their role or tickets they created
+            queryset = SupportTicket.objects.filter(
+                Q(created_by=user) | 
+                Q(forwarded_to_role__in=user_roles) |
+                Q(forwarded_to_user=user)
+            )
         
-        # Other roles see tickets forwarded to their role or tickets they created
-        queryset = SupportTicket.objects.filter(
-            Q(created_by=user) | 
-            Q(forwarded_to_role__in=user_roles) |
-            Q(forwarded_to_user=user)
-        ).select_related(
+        return self._for_action(queryset)
+
+    def _for_action(self, queryset):
+        queryset = queryset.select_related(
             "created_by", "assigned_to_support", "forwarded_to_user", "resolved_by"
-        ).prefetch_related("comments", "history").order_by("-created_at")
-        
-        return queryset
+        ).order_by("-created_at")
+        if self.action in self.list_actions:
+            # Comment count and latest activity come from SQL, not from loading comments
+            return queryset.annotate(
+                comments_total=Count("comments"),
+                last_activity_at=Greatest(
+                    "updated_at", Coalesce(Max("comments__created_at"), "updated_at")
+                ),
+            )
+        return queryset.prefetch_related(
+            Prefetch("comments", queryset=TicketComment.objects.select_related("user"))
+        )
 
     def get_serializer_class(self):
         """Use simplified serializer for creating tickets"""
         if self.action == "create":
             return SupportTicketCreateSerializer
+        if self.action in self.list_actions:
+            return SupportTicketListSerializer
         return SupportTicketSerializer
 
     def perform_create(self, serializer):
@@ -3393,11 +2421,7 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="my-tickets")
     def my_tickets(self, request):
         """Get tickets created by current user"""
-        tickets = SupportTicket.objects.filter(
-            created_by=request.user
-        ).select_related(
-            "created_by", "assigned_to_support", "forwarded_to_user", "resolved_by"
-        ).order_by("-created_at")
+        tickets = self._for_action(SupportTicket.objects.filter(created_by=request.user))
         
         serializer = self.get_serializer(tickets, many=True)
         return Response(serializer.data)
@@ -3405,12 +2429,10 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="assigned-to-me")
     def assigned_to_me(self, request):
         """Get tickets assigned to current user"""
-        tickets = SupportTicket.objects.filter(
+        tickets = self._for_action(SupportTicket.objects.filter(
             Q(assigned_to_support=request.user) |
             Q(forwarded_to_user=request.user)
-        ).select_related(
-            "created_by", "assigned_to_support", "forwarded_to_user", "resolved_by"
-        ).order_by("-created_at")
+        ))
         
         serializer = self.get_serializer(tickets, many=True)
         return Response(serializer.data)
@@ -3420,7 +2442,7 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
         """Filter tickets by status"""
         ticket_status = request.query_params.get("status", "open")
         user = request.user
-        user_roles = list(user.user_roles.select_related("role").values_list("role__name", flat=True))
+        user_roles = get_role_names(user)
         
         # Base queryset based on role
         if "Support" in user_roles or "Admin" in user_roles or "SuperAdmin" in user_roles:
@@ -3433,9 +2455,7 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
             )
         
         # Filter by status
-        tickets = queryset.filter(status=ticket_status).select_related(
-            "created_by", "assigned_to_support", "forwarded_to_user", "resolved_by"
-        ).order_by("-created_at")
+        tickets = self._for_action(queryset.filter(status=ticket_status))
         
         serializer = self.get_serializer(tickets, many=True)
         return Response(serializer.data)
@@ -3444,15 +2464,13 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
     def forwarded_to_me(self, request):
         """Get tickets forwarded to current user's role (for Issues pages)"""
         user = request.user
-        user_roles = list(user.user_roles.select_related("role").values_list("role__name", flat=True))
+        user_roles = get_role_names(user)
         
         # Get tickets forwarded to user's role or specifically to user
-        tickets = SupportTicket.objects.filter(
+        tickets = self._for_action(SupportTicket.objects.filter(
             Q(forwarded_to_role__in=user_roles) | Q(forwarded_to_user=user),
             status__in=["in_progress", "assigned"]  # Only active forwarded tickets
-        ).select_related(
-            "created_by", "assigned_to_support", "forwarded_to_user", "resolved_by"
-        ).prefetch_related("comments", "history").order_by("-created_at")
+        ))
         
         serializer = self.get_serializer(tickets, many=True)
         return Response(serializer.data)
@@ -3461,7 +2479,7 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
     def notify_user(self, request, pk=None):
         """Support notifies user after ticket resolution"""
         ticket = self.get_object()
-        user_roles = list(request.user.user_roles.select_related("role").values_list("role__name", flat=True))
+        user_roles = get_role_names(request.user)
         
         # Only support/admin can notify users
         if "Support" not in user_roles and "Admin" not in user_roles and "SuperAdmin" not in user_roles:
@@ -3504,8 +2522,7 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="users-by-role")
     def users_by_role(self, request):
         role_name = request.query_params.get("role")
-        user_roles = list(request.user.user_roles.select_related("role")
-                          .values_list("role__name", flat=True))
+        user_roles = get_role_names(request.user)
     
         if "Support" not in user_roles and "Admin" not in user_roles and "SuperAdmin" not in user_roles:
             return Response({"error": "Access denied"}, status=403)
@@ -3528,7 +2545,7 @@ class TicketCommentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        user_roles = list(user.user_roles.select_related("role").values_list("role__name", flat=True))
+        user_roles = get_role_names(user)
         
         # Staff can see all comments including internal
         if "Support" in user_roles or "Admin" in user_roles or "SuperAdmin" in user_roles:
@@ -3587,10 +2604,11 @@ class TicketHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """View ticket history/audit log"""
     authentication_classes = [TokenAuthentication]
     serializer_class = TicketHistorySerializer
+    keyset_pagination = True
 
     def get_queryset(self):
         user = self.request.user
-        user_roles = list(user.user_roles.select_related("role").values_list("role__name", flat=True))
+        user_roles = get_role_names(user)
         
         # Staff can see all history
         if "Support" in user_roles or "Admin" in user_roles or "SuperAdmin" in user_roles:
@@ -2,15 +2,18 @@ from __future__ import annotations
 
 from django.contrib import admin
 
+from .analytics_snapshot import AnalyticsSnapshot, DailyTransactionRollup
 from .assets import Asset
 from .crop_variety import Crop, CropVariety
+from .dashboard_summary import DashboardSummary
 from .farm import Farm
 from .field import Field, Device, CropLifecycleDates, FieldIrrigationMethod, FieldIrrigationPractice
 from .feature import FeatureType, Feature
 from .feature_plan import PlanFeature
 from .irrigation import IrrigationMethods
-from .notifications import Notification, SupportRequest
+from .notifications import BroadcastNotification, Notification, SupportRequest
 from .plan import Plan
+from .report_export import ReportExportJob
 from .soil_report import SoilTexture, SoilReport
 from .token import UserAuthToken
 from .user import CustomUser, Role, UserRole
@@ -89,6 +92,22 @@ admin.site.register(FieldIrrigationMethod)
 admin.site.register(FieldIrrigationPractice)
 
 
+@admin.register(DashboardSummary)
+class DashboardSummaryAdmin(admin.ModelAdmin):
+    list_display = ("scope", "active_fields", "assigned_crops", "lifecycle_active_crops", "total_hectares", "updated_at")
+    search_fields = ("scope",)
+
+
+admin.site.register(AnalyticsSnapshot)
+admin.site.register(DailyTransactionRollup)
+
+
+@admin.register(ReportExportJob)
+class ReportExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "format", "status", "created_at", "expires_at")
+    list_filter = ("format", "status")
+
+
 @admin.register(IrrigationMethods)
 class IrrigationMethodsAdmin(admin.ModelAdmin):
     list_display = ("id", "name")
@@ -138,6 +157,13 @@ class NotificationAdmin(admin.ModelAdmin):
     search_fields = ("receiver__email", "message")
 
 
+@admin.register(BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "sender", "notification_type", "audience_size", "created_at")
+    list_filter = ("notification_type", "roles")
+    search_fields = ("message",)
+
+
 @admin.register(SupportRequest)
 class SupportRequestAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "category", "assigned_role", "created_at")
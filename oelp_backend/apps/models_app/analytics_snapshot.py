@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from django.db import models
+
+
+class DailyTransactionRollup(models.Model):
+    """Per-day transaction totals by status and type, rebuilt only for days that changed."""
+
+    day = models.DateField()
+    status = models.CharField(max_length=20, blank=True, null=True)
+    transaction_type = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Set when a transaction of this day is deleted, so the next refresh redoes the day
+    stale = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ("day", "status", "transaction_type")
+        ordering = ("day",)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"{self.day} {self.transaction_type}/{self.status}: {self.count}"
+
+
+class AnalyticsSnapshot(models.Model):
+    """Precomputed analytics payload (see apps/utils/analytics_utils.py)."""
+
+    ADMIN = "admin"
+
+    key = models.CharField(max_length=32, unique=True)
+    data = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+    # Transactions updated at or after this instant have not been rolled up yet
+    transactions_synced_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"Analytics snapshot ({self.key})"
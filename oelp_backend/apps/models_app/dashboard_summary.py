@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from django.db import models
+
+
+class DashboardSummary(models.Model):
+    """
+    Precomputed dashboard totals for one owner (``user:<id>``, ``user:none`` for
+    fields without an owner) or for every field (``global``, shown to privileged
+    roles). Kept current by signals; see apps/utils/dashboard_utils.py.
+    """
+
+    GLOBAL = "global"
+
+    scope = models.CharField(max_length=32, unique=True)
+    # Plain id rather than a FK: the row must outlive its owner's deletion long
+    # enough for the cascaded Field deletes to subtract themselves from "global".
+    owner_id = models.BigIntegerField(null=True, blank=True)
+    active_fields = models.IntegerField(default=0)
+    # Active fields with a crop assigned / with an unharvested lifecycle row
+    assigned_crops = models.IntegerField(default=0)
+    lifecycle_active_crops = models.IntegerField(default=0)
+    total_hectares = models.FloatField(default=0.0)
+    last_practice_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"Dashboard summary ({self.scope})"
+
+    @staticmethod
+    def scope_for_user(user_id) -> str:
+        return f"user:{user_id if user_id is not None else 'none'}"
+
+    @property
+    def active_crops(self) -> int:
+        return max(self.assigned_crops, self.lifecycle_active_crops)
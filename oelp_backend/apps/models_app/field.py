@@ -48,6 +48,12 @@ class Field(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Dashboards, analytics and the Agribot context read a user's active fields
+            models.Index(fields=["user"], condition=models.Q(is_active=True), name="field_user_active_idx"),
+        ]
+
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.name} ({self.farm.name})"
 
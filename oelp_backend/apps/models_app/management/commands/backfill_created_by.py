@@ -0,0 +1,50 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+
+from apps.models_app.models import UserActivity
+from apps.models_app.user import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Fill CustomUser.created_by from the earliest "create" UserActivity of each user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without saving')
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        ct = ContentType.objects.get_for_model(CustomUser)
+        pending = CustomUser.objects.filter(created_by__isnull=True).order_by('id').values_list('id', flat=True)
+
+        updated = 0
+        batch = []
+        for user_id in pending.iterator(chunk_size=batch_size):
+            batch.append(user_id)
+            if len(batch) >= batch_size:
+                updated += self._backfill(ct, batch, options['dry_run'])
+                batch = []
+        if batch:
+            updated += self._backfill(ct, batch, options['dry_run'])
+
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(f'{verb} created_by on {updated} users'))
+
+    def _backfill(self, ct, user_ids, dry_run):
+        # Earliest create activity per user wins, matching what the API used to report
+        creators = {}
+        rows = (
+            UserActivity.objects
+            .filter(content_type=ct, object_id__in=user_ids, action='create')
+            .order_by('id')
+            .values_list('object_id', 'user_id')
+        )
+        for object_id, creator_id in rows:
+            creators.setdefault(object_id, creator_id)
+        if dry_run or not creators:
+            return len(creators)
+        users = list(CustomUser.objects.filter(id__in=creators.keys()).only('id'))
+        for user in users:
+            user.created_by_id = creators[user.id]
+        CustomUser.objects.bulk_update(users, ['created_by'], batch_size=len(users))
+        return len(users)
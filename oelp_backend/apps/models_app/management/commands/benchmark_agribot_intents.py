@@ -0,0 +1,49 @@
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.api.agribot import intent
+
+BENCHMARK = Path(intent.__file__).with_name('intent_benchmark.jsonl')
+
+
+def load_benchmark(path=BENCHMARK):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class Command(BaseCommand):
+    help = 'Classify the labeled Agribot intent set and print accuracy, misses and time per message.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=str(BENCHMARK), help='JSON lines of {"message", "intent"}')
+        parser.add_argument('--repeat', type=int, default=200, help='Timing passes over the set')
+
+    def handle(self, *args, **options):
+        rows = load_benchmark(options['file'])
+        confusion = Counter()
+        for row in rows:
+            predicted = intent.classify(row['message'])
+            confusion[(row['intent'], predicted)] += 1
+            if predicted != row['intent']:
+                self.stdout.write(f"MISS {row['intent']} -> {predicted}: {row['message']}")
+
+        started = time.perf_counter()
+        for _ in range(options['repeat']):
+            for row in rows:
+                intent.classify(row['message'])
+        per_message = (time.perf_counter() - started) / (options['repeat'] * len(rows))
+
+        correct = sum(n for (label, predicted), n in confusion.items() if label == predicted)
+        labels = (intent.OFF_TOPIC, intent.GENERAL, intent.FARM_SPECIFIC)
+        for label in labels:
+            row = ', '.join(f'{predicted}={confusion[(label, predicted)]}' for predicted in labels)
+            self.stdout.write(f'{label}: {row}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{correct}/{len(rows)} correct ({correct / len(rows):.1%}); {per_message * 1e6:.1f} us per message'
+            )
+        )
@@ -0,0 +1,80 @@
+import resource
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+
+from apps.api.exports import parse_export_params, stream_report_csv
+from apps.models_app.farm import Farm
+from apps.models_app.field import Field, FieldIrrigationMethod
+from apps.models_app.irrigation import IrrigationMethods
+from apps.models_app.soil_report import SoilReport, SoilTexture
+from apps.models_app.user import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream the CSV report for a synthetic account and print peak memory, query count and size. '
+        'All generated rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fields', type=int, default=5000, help='Fields to generate')
+        parser.add_argument('--reports-per-field', type=int, default=2, help='Soil reports per field')
+        parser.add_argument('--analytics', action='store_true', help='Include the analytics section')
+
+    def handle(self, *args, **options):
+        n_fields = options['fields']
+        n_reports = options['reports_per_field']
+        with transaction.atomic():
+            user = CustomUser.objects.create(username='csv-benchmark', email='csv-benchmark@example.com')
+            farm = Farm.objects.create(name='Benchmark', user=user)
+            texture = SoilTexture.objects.create(name='Loam', icon='https://example.com/loam.png')
+            method = IrrigationMethods.objects.create(name='Drip')
+            Field.objects.bulk_create(
+                [
+                    Field(name=f'F{i}', farm=farm, user=user, location_name='Bench', area={'hectares': 1.5}, soil_type=texture)
+                    for i in range(n_fields)
+                ],
+                batch_size=1000,
+            )
+            field_ids = list(Field.objects.filter(user=user).values_list('id', flat=True))
+            FieldIrrigationMethod.objects.bulk_create(
+                [FieldIrrigationMethod(field_id=fid, irrigation_method=method) for fid in field_ids],
+                batch_size=1000,
+            )
+            SoilReport.objects.bulk_create(
+                [
+                    SoilReport(field_id=fid, ph=6.5, ec=1.2, nitrogen=40.0, soil_type=texture)
+                    for fid in field_ids
+                    for _ in range(n_reports)
+                ],
+                batch_size=1000,
+            )
+
+            params = parse_export_params(QueryDict('analytics=1' if options['analytics'] else ''))
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            tracemalloc.start()
+            started = time.perf_counter()
+            size = lines = 0
+            with CaptureQueriesContext(connection) as queries:
+                for chunk in stream_report_csv(user, params):
+                    size += len(chunk)
+                    lines += 1
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{n_fields} fields, {n_fields * n_reports} soil reports -> {lines} lines, {size / 1024:.1f} KiB '
+                f'in {elapsed:.2f}s; {len(queries)} queries; '
+                f'python heap peak {peak / 1024:.1f} KiB; '
+                f'max RSS {rss_after} KiB (+{max(rss_after - rss_before, 0)} KiB while streaming)'
+            )
+        )
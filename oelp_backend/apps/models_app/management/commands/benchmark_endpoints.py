@@ -0,0 +1,610 @@
+import json
+import logging
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.api import urls as api_urls
+from apps.api.auth import token_cache
+from apps.models_app.assets import Asset
+from apps.models_app.crop_variety import Crop, CropVariety
+from apps.models_app.farm import Farm
+from apps.models_app.feature import Feature, FeatureType
+from apps.models_app.feature_plan import PlanFeature
+from apps.models_app.field import CropLifecycleDates, Field, FieldIrrigationMethod, FieldIrrigationPractice
+from apps.models_app.irrigation import IrrigationMethods
+from apps.models_app.models import UserActivity
+from apps.models_app.notifications import BroadcastNotification, Notification, SupportRequest
+from apps.models_app.plan import Plan
+from apps.models_app.report_export import ReportExportJob
+from apps.models_app.soil_report import SoilReport, SoilTexture
+from apps.models_app.support_ticket import SupportTicket, TicketComment, TicketHistory
+from apps.models_app.token import UserAuthToken
+from apps.models_app.user import CustomUser, Role, UserRole
+from apps.models_app.user_plan import PaymentMethod, Transaction, UserPlan
+
+BASELINE = Path(api_urls.__file__).with_name('endpoint_baseline.json')
+
+# Rows seeded per run: `users` other end users (a farm and field each), and the
+# benchmark farmer's own fields, notifications, transactions and tickets
+PROFILES = {
+    # Small enough that every list still fits on one page after the growth re-seed
+    'test': {'users': 6, 'fields': 6, 'notifications': 8, 'transactions': 8, 'tickets': 6},
+    'default': {'users': 200, 'fields': 100, 'notifications': 300, 'transactions': 200, 'tickets': 60},
+}
+
+PASSWORD = 'Bench-pass-2024'
+NEW_PASSWORD = 'Bench-pass-2025'
+
+# Routes of apps/api/urls.py that are not measured, and why
+SKIPPED = {
+    'razorpay-create-order': 'calls the Razorpay API',
+    'agribot-stream': 'streams from the AI providers (see benchmark_agribot_intents for the local part)',
+    'event-stream': 'long-lived connection (see loadtest_event_stream)',
+}
+
+
+def endpoint(method, route, actor='farmer', kwargs=None, data=None, status=200, label=''):
+    """
+    One measured request. ``route`` is a URL name, or the path of an unnamed
+    route. ``{name}`` in kwargs and data is replaced with the pk of that seeded
+    object (see seed()).
+    """
+    key = f'{method.upper()} {route}' + (f' [{label}]' if label else '')
+    return {
+        'key': key, 'method': method, 'route': route, 'actor': actor,
+        'kwargs': kwargs or {}, 'data': data, 'status': status,
+    }
+
+
+ENDPOINTS = [
+    endpoint('get', '/api/', actor=None),
+    endpoint('get', 'api-root', actor=None),
+    # auth
+    endpoint('post', 'signup', actor=None, status=201, data={
+        'username': 'bench-signup', 'full_name': 'Bench Signup', 'phone_number': '9000000000', 'password': NEW_PASSWORD,
+    }),
+    endpoint('post', 'login', actor=None, data={'username': '{farmer_username}', 'password': PASSWORD}),
+    endpoint('post', 'logout'),
+    endpoint('get', 'suggest-password', actor=None),
+    endpoint('post', 'reset-password', actor=None, data={
+        'username': '{farmer_username}', 'new_password': NEW_PASSWORD, 'confirm_password': NEW_PASSWORD,
+    }),
+    endpoint('get', 'me'),
+    endpoint('put', 'me', data={'full_name': 'Bench Farmer'}),
+    endpoint('get', 'auth-me'),
+    endpoint('post', 'change-password', data={'current_password': PASSWORD, 'new_password': NEW_PASSWORD}),
+    endpoint('post', 'ensure-role', data={'role': 'End-App-User'}),
+    # dashboards and reports
+    endpoint('get', 'dashboard'),
+    endpoint('get', 'dashboard', actor='admin', label='staff'),
+    endpoint('get', 'menu'),
+    endpoint('get', 'analytics-summary'),
+    endpoint('get', 'analytics-summary', actor='admin', label='staff'),
+    endpoint('get', 'agribot'),
+    endpoint('get', 'export-csv'),
+    endpoint('get', 'export-pdf', status=202),
+    endpoint('post', 'report-export-create', data={'format': 'pdf'}, status=202),
+    endpoint('get', 'report-export-status', kwargs={'pk': '{job}'}),
+    endpoint('get', 'report-export-download', kwargs={'pk': '{job}'}),
+    endpoint('get', 'admin-analytics', actor='admin'),
+    endpoint('get', 'refunds-summary', actor='admin'),
+    endpoint('get', 'agribot-answer-cache', actor='admin'),
+    # subscriptions and payments
+    endpoint('get', '/api/subscriptions/recent/'),
+    endpoint('post', 'razorpay-payment-success', data={
+        'razorpay_order_id': '{order_id}', 'razorpay_payment_id': 'pay_bench', 'plan_id': '{plan}',
+    }),
+    # Signature checking rejects the request before any lookup; the success
+    # path's writes are the ones razorpay-payment-success measures
+    endpoint('post', 'razorpay-webhook', actor=None, data={'event': 'payment.captured'}, status=400),
+    endpoint('post', 'fake-charge', data={'plan_id': '{plan}', 'payment_method_id': '{payment_method}'}),
+    endpoint('get', 'user-plan-list'),
+    endpoint('get', 'user-plan-detail', kwargs={'pk': '{user_plan}'}),
+    endpoint('get', 'user-plan-refund-info', kwargs={'pk': '{user_plan}'}),
+    endpoint('post', 'user-plan-downgrade', kwargs={'pk': '{user_plan}'}, data={'request_refund': True}),
+    endpoint('get', 'plan-list'),
+    endpoint('get', 'plan-detail', kwargs={'pk': '{plan}'}),
+    endpoint('get', 'plan-feature-list', actor='admin'),
+    endpoint('get', 'plan-feature-detail', actor='admin', kwargs={'pk': '{plan_feature}'}),
+    endpoint('get', 'feature-list'),
+    endpoint('get', 'feature-detail', kwargs={'pk': '{feature}'}),
+    endpoint('get', 'feature-type-list'),
+    endpoint('get', 'feature-type-detail', kwargs={'pk': '{feature_type}'}),
+    endpoint('get', 'payment-method-list'),
+    endpoint('post', 'payment-method-list', status=201, data={
+        'brand': 'visa', 'last4': '4242', 'exp_month': 12, 'exp_year': 2030,
+    }),
+    endpoint('get', 'payment-method-detail', kwargs={'pk': '{payment_method}'}),
+    endpoint('get', 'transaction-list'),
+    endpoint('get', 'transaction-list', data={'cursor': ''}, label='cursor'),
+    endpoint('get', 'transaction-detail', kwargs={'pk': '{transaction}'}),
+    endpoint('get', 'transaction-invoice', kwargs={'pk': '{transaction}'}),
+    # reference data
+    endpoint('get', 'crop-list'),
+    endpoint('post', 'crop-list', data={'name': 'Bench Millet'}, status=201),
+    endpoint('get', 'crop-detail', kwargs={'pk': '{crop}'}),
+    endpoint('get', 'crop-variety-list'),
+    endpoint('get', 'crop-variety-detail', kwargs={'pk': '{variety}'}),
+    endpoint('get', 'soil-texture-list'),
+    endpoint('get', 'soil-texture-detail', kwargs={'pk': '{texture}'}),
+    endpoint('get', 'irrigation-method-list'),
+    endpoint('get', 'irrigation-method-detail', kwargs={'pk': '{method}'}),
+    endpoint('get', 'asset-list'),
+    endpoint('get', 'asset-detail', kwargs={'pk': '{asset}'}),
+    endpoint('get', 'practice-list'),
+    # farms and fields
+    endpoint('get', 'farm-list'),
+    endpoint('post', 'farm-list', data={'name': 'Bench Farm'}, status=201),
+    endpoint('get', 'farm-detail', kwargs={'pk': '{farm}'}),
+    endpoint('patch', 'farm-detail', kwargs={'pk': '{farm}'}, data={'name': 'Renamed'}),
+    endpoint('get', 'field-list'),
+    endpoint('post', 'field-list', status=201, data={
+        'name': 'Bench Field', 'farm': '{farm}', 'size_acres': 2.5, 'irrigation_method': '{method}',
+    }),
+    endpoint('get', 'field-detail', kwargs={'pk': '{field}'}),
+    endpoint('patch', 'field-detail', kwargs={'pk': '{field}'}, data={'name': 'Renamed', 'irrigation_method': '{method}'}),
+    endpoint('delete', 'field-detail', kwargs={'pk': '{field}'}, status=204),
+    endpoint('get', 'field-lifecycle', kwargs={'pk': '{field}'}),
+    endpoint('post', 'field-update-lifecycle', kwargs={'pk': '{field}'}, data={
+        'sowing_date': '2024-06-01', 'growth_start_date': '2024-06-15', 'flowering_date': '2024-08-01',
+        'harvesting_date': '2024-10-01', 'yield_amount': 12.5,
+    }),
+    endpoint('post', 'field-set-irrigation-method', kwargs={'pk': '{field}'}, data={'irrigation_method': '{method}'}),
+    endpoint('get', 'soil-report-list'),
+    endpoint('post', 'soil-report-list', status=201, data={
+        'field': '{field}', 'ph': 6.8, 'ec': 1.1, 'nitrogen': 40, 'soil_type': '{texture}',
+    }),
+    endpoint('get', 'soil-report-detail', kwargs={'pk': '{soil_report}'}),
+    endpoint('get', 'irrigation-practice-list'),
+    endpoint('post', 'irrigation-practice-list', data={'field': '{field}', 'notes': 'Bench'}, status=201),
+    endpoint('get', 'irrigation-practice-detail', kwargs={'pk': '{practice}'}),
+    endpoint('get', 'admin-fields-list', actor='agronomist'),
+    endpoint('get', 'admin-fields-detail', actor='agronomist', kwargs={'pk': '{field}'}),
+    # notifications
+    endpoint('get', 'notification-list'),
+    endpoint('get', 'notification-list', data={'unread_only': 'true'}, label='unread'),
+    endpoint('get', 'notification-list', data={'cursor': ''}, label='cursor'),
+    endpoint('get', 'notification-unread-count'),
+    endpoint('get', 'notification-detail', kwargs={'pk': '{notification}'}),
+    endpoint('post', 'notification-mark-read', kwargs={'pk': '{notification}'}),
+    endpoint('post', 'notification-mark-read', kwargs={'pk': 'b-{broadcast}'}, label='broadcast'),
+    endpoint('post', 'notification-mark-all-read'),
+    endpoint('post', 'notification-dismiss', kwargs={'pk': 'b-{broadcast}'}),
+    endpoint('get', 'notification-center-list', actor='admin'),
+    endpoint('get', 'notification-center-list', actor='admin', data={'type': 'sent'}, label='sent'),
+    endpoint('post', 'notification-center-list', actor='admin', status=201, data={
+        'message': 'Bench notice', 'receiver_roles': ['End-App-User'],
+    }),
+    endpoint('get', 'notification-center-allowed-receivers', actor='admin'),
+    endpoint('get', 'notification-center-detail', actor='admin', kwargs={'pk': '{notification}'}, data={'type': 'sent'}),
+    endpoint('get', 'admin-notifications-list', actor='admin'),
+    endpoint('get', 'admin-notifications-allowed-receivers', actor='admin'),
+    endpoint('get', 'admin-notifications-detail', actor='admin', kwargs={'pk': '{notification}'}, data={'type': 'sent'}),
+    # support
+    endpoint('get', 'support-list'),
+    endpoint('post', 'support-list', data={'category': 'crop', 'description': 'Leaves turning yellow'}, status=201),
+    endpoint('get', 'support-detail', kwargs={'pk': '{support_request}'}),
+    endpoint('get', 'support-ticket-list'),
+    endpoint('get', 'support-ticket-list', actor='support', label='staff'),
+    endpoint('post', 'support-ticket-list', status=201, data={
+        'title': 'Pump failure', 'description': 'The pump stopped', 'category': 'technical', 'priority': 'high',
+    }),
+    endpoint('get', 'support-ticket-detail', kwargs={'pk': '{ticket}'}),
+    endpoint('get', 'support-ticket-my-tickets'),
+    endpoint('get', 'support-ticket-by-status', data={'status': 'open'}),
+    endpoint('get', 'support-ticket-by-status', actor='support', data={'status': 'open'}, label='staff'),
+    endpoint('get', 'support-ticket-assigned-to-me', actor='support'),
+    endpoint('get', 'support-ticket-forwarded-to-me', actor='agronomist'),
+    endpoint('get', 'support-ticket-users-by-role', actor='support', data={'role': 'Support'}),
+    endpoint('post', 'support-ticket-assign-support', actor='support', kwargs={'pk': '{ticket}'},
+             data={'support_user_id': '{support}'}),
+    endpoint('post', 'support-ticket-forward-ticket', actor='support', kwargs={'pk': '{ticket}'},
+             data={'role': 'Agronomist', 'user_id': '{agronomist}'}),
+    endpoint('post', 'support-ticket-resolve-ticket', actor='support', kwargs={'pk': '{ticket}'},
+             data={'resolution_notes': 'Replaced the fuse'}),
+    endpoint('post', 'support-ticket-close-ticket', actor='support', kwargs={'pk': '{resolved_ticket}'}),
+    endpoint('post', 'support-ticket-reopen-ticket', actor='support', kwargs={'pk': '{resolved_ticket}'}),
+    endpoint('post', 'support-ticket-notify-user', actor='support', kwargs={'pk': '{resolved_ticket}'}),
+    endpoint('get', 'ticket-comment-list'),
+    endpoint('get', 'ticket-comment-list', actor='support', label='staff'),
+    endpoint('post', 'ticket-comment-list', data={'ticket': '{ticket}', 'comment': 'Any update?'}, status=201),
+    endpoint('get', 'ticket-comment-detail', kwargs={'pk': '{comment}'}),
+    endpoint('get', 'ticket-history-list'),
+    endpoint('get', 'ticket-history-list', actor='support', label='staff'),
+    endpoint('get', 'ticket-history-detail', kwargs={'pk': '{history}'}),
+    # user administration
+    endpoint('get', 'admin-users-list', actor='admin'),
+    endpoint('get', 'admin-users-detail', actor='admin', kwargs={'pk': '{end_user}'}),
+    endpoint('post', 'admin-users-assign-role', actor='admin', kwargs={'pk': '{end_user}'}, data={'role': 'Analyst'}),
+    endpoint('post', 'admin-users-create-admin', actor='admin', status=201, data={
+        'full_name': 'Bench Admin', 'username': 'bench-new-admin', 'password': NEW_PASSWORD,
+    }),
+    endpoint('post', 'admin-users-dedupe-roles', actor='admin', kwargs={'pk': '{end_user}'}),
+    endpoint('post', 'admin-users-dedupe-roles-bulk', actor='admin'),
+    endpoint('get', 'admin-roles-list', actor='admin'),
+    endpoint('get', 'admin-roles-detail', actor='admin', kwargs={'pk': '{role}'}),
+    endpoint('get', 'users-readonly-list', actor='support'),
+    endpoint('get', 'users-readonly-detail', actor='support', kwargs={'pk': '{end_user}'}),
+]
+
+
+def api_routes():
+    """Every route in apps/api/urls.py: its name, or its path when unnamed."""
+    routes = set()
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, prefix + str(pattern.pattern))
+            else:
+                routes.add(pattern.name or f'/api/{prefix}{pattern.pattern}')
+
+    walk(api_urls.urlpatterns, '')
+    return routes
+
+
+def _actor(name, roles):
+    user = CustomUser.objects.create_user(
+        username=f'bench-{name}', email=f'bench-{name}@example.com', full_name=f'Bench {name.title()}', password=PASSWORD,
+    )
+    for role in roles:
+        UserRole.objects.create(user=user, role=Role.objects.get_or_create(name=role)[0], userrole_id=user.email)
+    UserAuthToken.objects.create(user=user, access_token=f'bench-{name}-token')
+    return user
+
+
+def _reference_data(s):
+    s.farmer = _actor('farmer', ['End-App-User'])
+    s.admin = _actor('admin', ['SuperAdmin', 'Admin'])
+    s.support = _actor('support', ['Support'])
+    s.agronomist = _actor('agronomist', ['Agronomist'])
+    s.role = Role.objects.get(name='Admin')
+    s.crop = Crop.objects.create(name='Bench Wheat')
+    s.variety = CropVariety.objects.create(crop=s.crop, name='Bench Durum', is_primary=True)
+    s.texture = SoilTexture.objects.create(name='Bench Loam', icon='https://example.com/loam.png')
+    s.method = IrrigationMethods.objects.create(name='Bench Drip')
+    s.feature_type = FeatureType.objects.create(name='Bench Assistant')
+    s.feature = Feature.objects.create(name='Bench Reports', feature_type=s.feature_type)
+    s.free_plan = Plan.objects.get_or_create(name='Free', defaults={'price': 0, 'duration': 365})[0]
+    s.plan = Plan.objects.create(name='Bench Main', type=Plan.PlanType.MAIN, price=499, duration=30)
+    s.plan_feature = PlanFeature.objects.create(plan=s.plan, feature=s.feature, max_count=10, duration_days=30)
+    s.payment_method = PaymentMethod.objects.create(user=s.farmer, brand='visa', last4='4242', exp_month=12, exp_year=2030)
+    now = timezone.now()
+    s.user_plan = UserPlan.objects.create(
+        user=s.farmer, plan=s.plan, start_date=date.today(), end_date=date.today() + timedelta(days=30),
+        expire_at=now + timedelta(days=30), is_active=True,
+    )
+    UserPlan.objects.create(
+        user=s.farmer, plan=s.free_plan, start_date=date.today() - timedelta(days=60),
+        end_date=date.today() - timedelta(days=30), expire_at=now - timedelta(days=30), is_active=False,
+    )
+    s.farm = Farm.objects.create(name='Bench Home', user=s.farmer)
+    s.job = ReportExportJob(
+        user=s.farmer, format='pdf', params_hash='0' * 64, status=ReportExportJob.READY,
+        finished_at=now, expires_at=now + timedelta(hours=1),
+    )
+    s.job.file.save('bench_report.pdf', ContentFile(b'%PDF-1.4 bench'), save=True)
+    s.order_id = 'order_bench'
+    s.farmer_username = s.farmer.username
+    s.batches = 0
+
+
+def seed(volumes, seeded=None):
+    """
+    Seed ``volumes`` rows (see PROFILES) and return the objects the endpoints
+    refer to. Passing the result back in adds the same volumes again, for
+    actors and objects that already exist.
+    """
+    s = seeded or SimpleNamespace()
+    if seeded is None:
+        _reference_data(s)
+    s.batches += 1
+    tag = f'b{s.batches}'
+    now = timezone.now()
+
+    end_role = Role.objects.get(name='End-App-User')
+    users = CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench-{tag}-user-{i}', email=f'bench-{tag}-user-{i}@example.com', created_by=s.admin)
+        for i in range(volumes['users'])
+    )
+    UserRole.objects.bulk_create(UserRole(user=u, role=end_role, userrole_id=u.email) for u in users)
+    farms = Farm.objects.bulk_create(Farm(name=f'{tag}-{i}', user=u) for i, u in enumerate(users))
+    Field.objects.bulk_create(Field(name=f'{tag}-{i}', farm=f, user=f.user) for i, f in enumerate(farms))
+
+    fields = Field.objects.bulk_create(
+        Field(
+            name=f'{tag}-field-{i}', farm=s.farm, user=s.farmer, crop=s.crop, crop_variety=s.variety,
+            soil_type=s.texture, location_name='Bench', area={'hectares': 1.5},
+        )
+        for i in range(volumes['fields'])
+    )
+    FieldIrrigationMethod.objects.bulk_create(FieldIrrigationMethod(field=f, irrigation_method=s.method) for f in fields)
+    CropLifecycleDates.objects.bulk_create(
+        CropLifecycleDates(field=f, sowing_date=date.today() - timedelta(days=30)) for f in fields
+    )
+    practices = FieldIrrigationPractice.objects.bulk_create(
+        FieldIrrigationPractice(field=f, irrigation_method=s.method, notes='Bench') for f in fields
+    )
+    reports = SoilReport.objects.bulk_create(
+        SoilReport(field=f, ph=6.5, ec=1.2, nitrogen=40.0, soil_type=s.texture) for f in fields
+    )
+    field_type = ContentType.objects.get_for_model(Field)
+    UserActivity.objects.bulk_create(
+        UserActivity(user=s.farmer, action='update', content_type=field_type, object_id=f.pk) for f in fields
+    )
+
+    notifications = Notification.objects.bulk_create(
+        Notification(sender=s.admin, receiver=s.farmer, message=f'{tag} notice {i}', is_read=i % 2 == 0)
+        for i in range(volumes['notifications'])
+    )
+    broadcasts = BroadcastNotification.objects.bulk_create(
+        BroadcastNotification(sender=s.admin, message=f'{tag} broadcast {i}', audience_size=len(users) + 1)
+        for i in range(max(volumes['notifications'] // 4, 1))
+    )
+    BroadcastNotification.roles.through.objects.bulk_create(
+        BroadcastNotification.roles.through(broadcastnotification=b, role=end_role) for b in broadcasts
+    )
+
+    statuses = ['success', 'paid', 'pending', 'failed']
+    transactions = Transaction.objects.bulk_create(
+        Transaction(
+            user=s.farmer, plan=s.plan, amount=499, currency='INR', status=statuses[i % len(statuses)],
+            transaction_type='refund' if i % 5 == 4 else 'payment', provider_order_id=f'order_{tag}_{i}',
+        )
+        for i in range(volumes['transactions'])
+    )
+    Transaction.objects.filter(pk__in=[t.pk for t in transactions[:1]]).update(provider_order_id=s.order_id)
+
+    ticket_statuses = ['open', 'assigned', 'in_progress', 'resolved']
+    tickets = SupportTicket.objects.bulk_create(
+        SupportTicket(
+            ticket_number=f'TKT-BENCH-{tag}-{i}', title=f'Ticket {i}', description='Bench', created_by=s.farmer,
+            status=ticket_statuses[i % len(ticket_statuses)],
+            assigned_to_support=s.support if i % 2 else None,
+            forwarded_to_role='Agronomist' if i % 4 == 2 else None,
+            resolved_at=now if i % 4 == 3 else None,
+        )
+        for i in range(volumes['tickets'])
+    )
+    comments = TicketComment.objects.bulk_create(
+        TicketComment(ticket=t, user=user, comment='Bench', is_internal=user == s.support)
+        for t in tickets
+        for user in (s.farmer, s.support)
+    )
+    histories = TicketHistory.objects.bulk_create(
+        TicketHistory(ticket=t, user=s.farmer, action='created', description='Bench') for t in tickets
+    )
+    requests = SupportRequest.objects.bulk_create(
+        SupportRequest(user=s.farmer, category='crop', description='Bench') for _ in range(max(volumes['tickets'] // 2, 1))
+    )
+
+    if seeded is None:
+        s.end_user = users[0]
+        s.field, s.practice, s.soil_report = fields[0], practices[0], reports[0]
+        s.notification = next(n for n in notifications if not n.is_read)
+        s.broadcast = broadcasts[0]
+        s.transaction = transactions[0]
+        s.ticket = tickets[0]
+        s.resolved_ticket = next(t for t in tickets if t.status == 'resolved')
+        s.comment, s.history, s.support_request = comments[0], histories[0], requests[0]
+        s.asset = Asset.objects.create(file='assets/bench.png', content_type=field_type, object_id=s.field.pk)
+    return s
+
+
+def _refs(seeded):
+    return {name: getattr(value, 'pk', value) for name, value in vars(seeded).items()}
+
+
+def _resolve(value, refs):
+    if isinstance(value, dict):
+        return {k: _resolve(v, refs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, refs) for v in value]
+    if isinstance(value, str) and '{' in value:
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in refs:
+            return refs[value[1:-1]]
+        return value.format_map(refs)
+    return value
+
+
+def _path(ep, refs):
+    if ep['route'].startswith('/'):
+        return ep['route']
+    return reverse(ep['route'], kwargs=_resolve(ep['kwargs'], refs))
+
+
+def _call(client, ep, refs):
+    """Make the request on a clean cache and roll its writes back: (status, seconds, queries)."""
+    cache.clear()
+    token_cache.clear()
+    extra = {'HTTP_AUTHORIZATION': f"Token bench-{ep['actor']}-token"} if ep['actor'] else {}
+    data = _resolve(ep['data'], refs)
+    path = _path(ep, refs)
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            if ep['method'] == 'get':
+                response = client.get(path, data, **extra)
+            else:
+                response = getattr(client, ep['method'])(path, data, format='json', **extra)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+    return response.status_code, elapsed, len(queries)
+
+
+def measure(seeded, endpoints=ENDPOINTS, repeat=3, memory=True):
+    """
+    Per endpoint: status, queries and median wall time (ms) over ``repeat``
+    requests after a warm-up, and with ``memory`` the Python heap peak (KiB)
+    of one more. Every request starts with empty caches, so the numbers are
+    those of a cache miss.
+    """
+    client = APIClient()
+    refs = _refs(seeded)
+    results = {}
+    for ep in endpoints:
+        _call(client, ep, refs)
+        runs = [_call(client, ep, refs) for _ in range(repeat)]
+        result = {
+            'status': runs[-1][0],
+            'queries': max(run[2] for run in runs),
+            'time_ms': round(statistics.median(run[1] for run in runs) * 1000, 2),
+        }
+        if memory:
+            tracemalloc.start()
+            _call(client, ep, refs)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result['memory_kb'] = round(peak / 1024, 1)
+        results[ep['key']] = result
+    return results
+
+
+def run_benchmark(volumes, endpoints=ENDPOINTS, repeat=3, memory=True):
+    """
+    Seed ``volumes``, measure ``endpoints``, then seed the same volumes again
+    and count queries once more. Call inside a transaction that is rolled
+    back. Returns (results, grown) where ``grown`` maps each endpoint whose
+    query count rose with the data to (before, after).
+    """
+    request_log = logging.getLogger('django.request')
+    level = request_log.level
+    # Expected 4xx responses would otherwise be logged as warnings
+    request_log.setLevel(logging.ERROR)
+    try:
+        with tempfile.TemporaryDirectory() as media, override_settings(
+            MEDIA_ROOT=media,
+            ALLOWED_HOSTS=['testserver'],
+            # A local cache that can be cleared freely, and a cheap hasher so
+            # password endpoints measure the view rather than PBKDF2
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}},
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        ):
+            seeded = seed(volumes)
+            results = measure(seeded, endpoints, repeat=repeat, memory=memory)
+            seed(volumes, seeded)
+            again = measure(seeded, endpoints, repeat=1, memory=False)
+    finally:
+        request_log.setLevel(level)
+    grown = {
+        key: (result['queries'], again[key]['queries'])
+        for key, result in results.items()
+        if again[key]['queries'] > result['queries']
+    }
+    return results, grown
+
+
+def load_baseline(path=BASELINE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def compare(results, grown, baseline, endpoints=ENDPOINTS):
+    """Regressions against ``baseline`` (one profile's ``endpoints`` entry), as messages."""
+    time_factor = settings.ENDPOINT_BENCHMARK_TIME_FACTOR
+    time_slack = settings.ENDPOINT_BENCHMARK_TIME_SLACK_MS
+    memory_factor = settings.ENDPOINT_BENCHMARK_MEMORY_FACTOR
+    memory_slack = settings.ENDPOINT_BENCHMARK_MEMORY_SLACK_KB
+    failures = []
+    for ep in endpoints:
+        key = ep['key']
+        result = results[key]
+        if result['status'] != ep['status']:
+            failures.append(f"{key}: HTTP {result['status']}, expected {ep['status']}")
+        if key in grown:
+            before, after = grown[key]
+            failures.append(f'{key}: queries grow with the data ({before} -> {after}), likely N+1')
+        expected = baseline.get(key)
+        if expected is None:
+            failures.append(f'{key}: no baseline (run benchmark_endpoints --update-baseline)')
+            continue
+        if result['queries'] > expected['queries']:
+            failures.append(f"{key}: {result['queries']} queries, baseline {expected['queries']}")
+        limit = expected['time_ms'] * time_factor + time_slack
+        if result['time_ms'] > limit:
+            failures.append(f"{key}: {result['time_ms']:.1f} ms, baseline {expected['time_ms']:.1f} ms (limit {limit:.1f})")
+        if 'memory_kb' in result and 'memory_kb' in expected:
+            limit = expected['memory_kb'] * memory_factor + memory_slack
+            if result['memory_kb'] > limit:
+                failures.append(
+                    f"{key}: {result['memory_kb']:.0f} KiB peak, baseline {expected['memory_kb']:.0f} KiB (limit {limit:.0f})"
+                )
+    return failures
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every API endpoint against seeded data and report queries, wall time and peak Python heap '
+        'per endpoint; fails on an N+1 or on a regression against the committed baseline. '
+        'All generated rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', choices=sorted(PROFILES), default='default', help='Data volumes and baseline')
+        for name in PROFILES['default']:
+            parser.add_argument(f'--{name}', type=int, help=f'Override the profile\'s {name} volume (skips the baseline)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per endpoint')
+        parser.add_argument('--endpoint', action='append', default=[], help='Only endpoints whose key contains this')
+        parser.add_argument('--baseline', default=str(BASELINE))
+        parser.add_argument('--update-baseline', action='store_true', help='Record this run as the profile baseline')
+
+    def handle(self, *args, **options):
+        profile = options['profile']
+        volumes = {name: options[name] if options[name] is not None else n for name, n in PROFILES[profile].items()}
+        custom = volumes != PROFILES[profile]
+        endpoints = [ep for ep in ENDPOINTS if not options['endpoint'] or any(s in ep['key'] for s in options['endpoint'])]
+        if not endpoints:
+            raise CommandError('No endpoint matches --endpoint')
+        if options['update_baseline'] and (custom or len(endpoints) != len(ENDPOINTS)):
+            raise CommandError('--update-baseline records whole profiles only; drop the volume and --endpoint options')
+
+        with transaction.atomic():
+            results, grown = run_benchmark(volumes, endpoints, repeat=options['repeat'])
+            transaction.set_rollback(True)
+
+        for ep in endpoints:
+            r = results[ep['key']]
+            self.stdout.write(
+                f"{ep['key']:<60} {r['status']} {r['queries']:>4} q {r['time_ms']:>9.2f} ms {r['memory_kb']:>9.1f} KiB"
+            )
+        baseline = load_baseline(options['baseline'])
+        if options['update_baseline']:
+            baseline[profile] = {'volumes': volumes, 'endpoints': results}
+            with open(options['baseline'], 'w', encoding='utf-8') as f:
+                json.dump(baseline, f, indent=1, sort_keys=True)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline for {profile!r} written to {options["baseline"]}'))
+            return
+
+        recorded = baseline.get(profile)
+        if recorded is None or recorded['volumes'] != volumes:
+            self.stdout.write(self.style.WARNING('No baseline for these volumes; only statuses and N+1 growth are checked'))
+            failures = compare(results, grown, results, endpoints)
+            summary = f'{len(endpoints)} endpoints without N+1 growth'
+        else:
+            failures = compare(results, grown, recorded['endpoints'], endpoints)
+            summary = f'{len(endpoints)} endpoints within the {profile!r} baseline'
+        if failures:
+            raise CommandError('\n'.join(['Endpoint regressions:', *failures]))
+        self.stdout.write(self.style.SUCCESS(summary))
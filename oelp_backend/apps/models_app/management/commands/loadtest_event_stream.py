@@ -0,0 +1,119 @@
+import asyncio
+import resource
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def rss_kb(pid):
+    """Resident memory of a local process, from /proc (Linux), or None."""
+    try:
+        with open(f'/proc/{pid}/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Open many idle connections to the live event stream of a running server and report how many '
+        'it holds, how fast they connect and (with --pid) the server memory per connection.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/events/stream/')
+        parser.add_argument('--token', required=True, help='Access token of any active user')
+        parser.add_argument('--connections', type=int, default=1000)
+        parser.add_argument('--ramp', type=int, default=200, help='New connections per second')
+        parser.add_argument('--hold', type=float, default=30, help='Seconds to keep them open once started')
+        parser.add_argument('--pid', type=int, help='Server process id, to sample its memory (Linux)')
+
+    def handle(self, *args, **options):
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            raise CommandError('httpx is required (pip install -r requirements.txt)')
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < options['connections'] + 50:
+            self.stdout.write(self.style.WARNING(
+                f'Open file limit is {soft}; raise it (ulimit -n) on both ends for {options["connections"]} connections'
+            ))
+        asyncio.run(self._run(options))
+
+    async def _run(self, options):
+        import httpx
+
+        count = options['connections']
+        connected = []
+        errors = []
+        open_now = 0
+        stop = asyncio.Event()
+
+        async def connect(client):
+            nonlocal open_now
+            started = time.perf_counter()
+            try:
+                async with client.stream('GET', options['url'], params={'token': options['token']}) as response:
+                    if response.status_code != 200:
+                        errors.append(f'HTTP {response.status_code}')
+                        return
+                    reader = response.aiter_text()
+                    # Connected once the initial unread_count event arrives
+                    while 'unread_count' not in await reader.__anext__():
+                        pass
+                    connected.append(time.perf_counter() - started)
+                    open_now += 1
+                    try:
+                        # Idle: only keep-alive comments should arrive
+                        async def drain():
+                            async for _ in reader:
+                                pass
+                        drain_task = asyncio.ensure_future(drain())
+                        stop_task = asyncio.ensure_future(stop.wait())
+                        done, pending = await asyncio.wait({drain_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+                        for task in pending:
+                            task.cancel()
+                        if drain_task in done:
+                            errors.append('closed by server')
+                    finally:
+                        open_now -= 1
+            except (httpx.HTTPError, StopAsyncIteration, OSError) as exc:
+                errors.append(type(exc).__name__)
+
+        before = rss_kb(options['pid']) if options['pid'] else None
+        limits = httpx.Limits(max_connections=count, max_keepalive_connections=0)
+        timeout = httpx.Timeout(30, read=None)
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            tasks = []
+            started = time.perf_counter()
+            for i in range(count):
+                tasks.append(asyncio.ensure_future(connect(client)))
+                if options['ramp'] and (i + 1) % options['ramp'] == 0:
+                    await asyncio.sleep(1)
+            await asyncio.sleep(options['hold'])
+            held = open_now
+            after = rss_kb(options['pid']) if options['pid'] else None
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f'connected {len(connected)}/{count}, still open after the hold: {held}')
+        if connected:
+            ordered = sorted(connected)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self.stdout.write(
+                f'connect time median {statistics.median(ordered) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms'
+            )
+        if errors:
+            summary = ', '.join(f'{name} x{errors.count(name)}' for name in sorted(set(errors)))
+            self.stdout.write(self.style.WARNING(f'errors: {summary}'))
+        if before is not None and after is not None and held:
+            self.stdout.write(
+                f'server RSS {before / 1024:.1f} MiB -> {after / 1024:.1f} MiB, '
+                f'{(after - before) / held:.1f} KiB per open connection'
+            )
+        self.stdout.write(self.style.SUCCESS(f'done in {elapsed:.1f}s'))
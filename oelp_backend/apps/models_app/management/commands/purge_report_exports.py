@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.api.exports import purge_expired_exports
+
+
+class Command(BaseCommand):
+    help = 'Delete expired report export jobs and their stored files'
+
+    def handle(self, *args, **kwargs):
+        removed = purge_expired_exports()
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} expired report exports'))
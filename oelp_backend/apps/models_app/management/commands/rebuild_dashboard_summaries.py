@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.utils.dashboard_utils import rebuild_all_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute every DashboardSummary row (per owner and global) from the fields table'
+
+    def handle(self, *args, **kwargs):
+        summary = rebuild_all_summaries()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt dashboard summaries: {summary.active_fields} active fields, '
+                f'{round(summary.total_hectares, 4)} ha in total'
+            )
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.utils.analytics_utils import refresh_admin_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Refresh the admin analytics snapshot, re-rolling up only days with changed transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every daily rollup from scratch')
+
+    def handle(self, *args, **options):
+        snapshot = refresh_admin_snapshot(full=options['full'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Analytics snapshot refreshed at {snapshot.computed_at.isoformat()} "
+                f"({snapshot.data.get('days_rebuilt', 0)} days re-rolled up)"
+            )
+        )
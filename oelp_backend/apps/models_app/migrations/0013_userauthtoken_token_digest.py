@@ -0,0 +1,25 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_token_digest(apps, schema_editor):
+    UserAuthToken = apps.get_model("models_app", "UserAuthToken")
+    for tok in UserAuthToken.objects.filter(token_digest__isnull=True).only("id", "access_token").iterator():
+        digest = hashlib.sha256((tok.access_token or "").encode("utf-8")).hexdigest()
+        UserAuthToken.objects.filter(pk=tok.pk).update(token_digest=digest)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("models_app", "0012_notification_metadata_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userauthtoken",
+            name="token_digest",
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_token_digest, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("models_app", "0013_userauthtoken_token_digest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="created_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="created_users",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
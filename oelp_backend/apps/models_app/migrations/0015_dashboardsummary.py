@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("models_app", "0014_customuser_created_by"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardSummary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("scope", models.CharField(max_length=32, unique=True)),
+                ("owner_id", models.BigIntegerField(blank=True, null=True)),
+                ("active_fields", models.IntegerField(default=0)),
+                ("assigned_crops", models.IntegerField(default=0)),
+                ("lifecycle_active_crops", models.IntegerField(default=0)),
+                ("total_hectares", models.FloatField(default=0.0)),
+                ("last_practice_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
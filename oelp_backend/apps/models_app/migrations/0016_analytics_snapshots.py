@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("models_app", "0015_dashboardsummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalyticsSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=32, unique=True)),
+                ("data", models.JSONField(default=dict)),
+                ("computed_at", models.DateTimeField()),
+                ("transactions_synced_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyTransactionRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("status", models.CharField(blank=True, max_length=20, null=True)),
+                ("transaction_type", models.CharField(max_length=20)),
+                ("count", models.IntegerField(default=0)),
+                ("amount", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("stale", models.BooleanField(default=False)),
+            ],
+            options={
+                "ordering": ("day",),
+                "unique_together": {("day", "status", "transaction_type")},
+            },
+        ),
+    ]
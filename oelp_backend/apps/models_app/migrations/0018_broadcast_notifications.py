@@ -0,0 +1,81 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("models_app", "0017_reportexportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BroadcastNotification",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("message", models.TextField()),
+                (
+                    "notification_type",
+                    models.CharField(
+                        choices=[
+                            ("general", "General"),
+                            ("alert", "Alert"),
+                            ("update", "Update"),
+                            ("support", "Support"),
+                            ("reminder", "Reminder"),
+                        ],
+                        default="general",
+                        max_length=32,
+                    ),
+                ),
+                ("cause", models.CharField(blank=True, max_length=64, null=True)),
+                ("tags", models.JSONField(blank=True, default=dict)),
+                ("region", models.CharField(blank=True, max_length=100, null=True)),
+                ("crop_type", models.CharField(blank=True, max_length=100, null=True)),
+                ("metadata", models.JSONField(blank=True, default=dict)),
+                ("audience_size", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("roles", models.ManyToManyField(related_name="broadcasts", to="models_app.role")),
+                (
+                    "sender",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="sent_broadcasts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-created_at",),
+            },
+        ),
+        migrations.CreateModel(
+            name="BroadcastReceipt",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("is_read", models.BooleanField(default=False)),
+                ("is_dismissed", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "broadcast",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="receipts",
+                        to="models_app.broadcastnotification",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="broadcast_receipts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("broadcast", "user")},
+            },
+        ),
+    ]
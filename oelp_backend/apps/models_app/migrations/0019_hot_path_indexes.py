@@ -0,0 +1,65 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("models_app", "0018_broadcast_notifications"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["receiver", "is_read", "-created_at"], name="notif_receiver_read_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["receiver", "-created_at", "-id"], name="notif_receiver_feed_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["user", "-created_at", "-id"], name="txn_user_feed_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "transaction_type", "status", "-created_at"],
+                name="txn_user_type_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("status__in", ["success", "paid", "completed"]), ("transaction_type", "payment")),
+                fields=["user", "-created_at"],
+                name="txn_user_paid_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("provider_order_id__isnull", False)),
+                fields=["provider_order_id"],
+                name="txn_provider_order_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userplan",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["user", "-created_at"],
+                name="userplan_user_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="useractivity",
+            index=models.Index(fields=["user", "-created_at"], name="activity_user_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="field",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["user"],
+                name="field_user_active_idx",
+            ),
+        ),
+    ]
@@ -19,9 +19,12 @@ from .user_plan import (
     PaymentMethod,
     Transaction,
 )  # noqa: F401
-from .notifications import Notification, SupportRequest  # noqa: F401
+from .notifications import BroadcastNotification, BroadcastReceipt, Notification, SupportRequest  # noqa: F401
 from .support_ticket import SupportTicket, TicketComment, TicketHistory  # noqa: F401
 from .token import UserAuthToken  # noqa: F401
+from .dashboard_summary import DashboardSummary  # noqa: F401
+from .analytics_snapshot import AnalyticsSnapshot, DailyTransactionRollup  # noqa: F401
+from .report_export import ReportExportJob  # noqa: F401
 from django.contrib.contenttypes.fields import GenericForeignKey  # noqa: F401
 from django.contrib.contenttypes.models import ContentType  # noqa: F401
 
@@ -44,3 +47,6 @@ class UserActivity(models.Model):
     class Meta:
         app_label = "models_app"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="activity_user_created_idx"),
+        ]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from django.db import models
 
-from .user import CustomUser
+from .user import CustomUser, Role
 
 
 class NotificationType(models.TextChoices):
@@ -41,6 +41,12 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Unread filters and the unread counter rebuild
+            models.Index(fields=["receiver", "is_read", "-created_at"], name="notif_receiver_read_idx"),
+            # A user's feed, newest first (also the keyset cursor)
+            models.Index(fields=["receiver", "-created_at", "-id"], name="notif_receiver_feed_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"Notification to {self.receiver}"
@@ -61,6 +67,59 @@ class Notification(models.Model):
         super().save(*args, **kwargs)
 
 
+class BroadcastNotification(models.Model):
+    """
+    A role notification stored once for its whole audience (fan-out on read).
+    Members are the users holding one of ``roles`` (End-App-User only for
+    users with no other role), narrowed by ``region``/``crop_type`` like
+    direct role notifications, who had joined before it was sent. Per-user
+    state lives in BroadcastReceipt and is only written when a user reads
+    or dismisses it.
+    """
+
+    sender = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="sent_broadcasts",
+    )
+    roles = models.ManyToManyField(Role, related_name="broadcasts")
+    message = models.TextField()
+    notification_type = models.CharField(
+        max_length=32,
+        choices=NotificationType.choices,
+        default=NotificationType.GENERAL,
+    )
+    cause = models.CharField(max_length=64, blank=True, null=True)
+    tags = models.JSONField(default=dict, blank=True)
+    region = models.CharField(max_length=100, blank=True, null=True)
+    crop_type = models.CharField(max_length=100, blank=True, null=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    # Matching recipients when it was sent (for the sender's summary)
+    audience_size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"Broadcast #{self.pk}"
+
+
+class BroadcastReceipt(models.Model):
+    broadcast = models.ForeignKey(BroadcastNotification, on_delete=models.CASCADE, related_name="receipts")
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="broadcast_receipts")
+    is_read = models.BooleanField(default=False)
+    is_dismissed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("broadcast", "user")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"Receipt({self.broadcast_id}, {self.user_id})"
+
+
 class SupportCategory(models.TextChoices):
     CROP = "crop", "Crop"
     TRANSACTION = "transaction", "Transaction"
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from django.db import models
+from django.utils import timezone
+
+from .user import CustomUser
+
+
+class ReportExportJob(models.Model):
+    """
+    A report rendered outside the request cycle (see apps/api/exports.py and
+    apps/api/tasks.py). Jobs with the same ``params_hash`` are reused until
+    ``expires_at``, so repeated downloads of the same report render once.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (READY, "Ready"),
+        (FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="report_exports")
+    format = models.CharField(max_length=8, default="pdf")
+    params = models.JSONField(default=dict)
+    # sha256 of (user, format, params); identical requests share a job
+    params_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    file = models.FileField(upload_to="report_exports/", blank=True, null=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"{self.format} export #{self.pk} ({self.status})"
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= timezone.now()
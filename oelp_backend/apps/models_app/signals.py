@@ -275,4 +275,270 @@ def block_support_ticket_notifications(sender, instance, **kwargs):
         'support request' in message.lower() or
         notification_type == 'support_ticket' or
         related_type == 'support_ticket'):
-        raise ValidationError("Support ticket notifications are blocked. Use Support Tickets page.")
\ No newline at end of file
+        raise ValidationError("Support ticket notifications are blocked. Use Support Tickets page.")
+
+# Keep the in-process auth token cache honest when accounts change
+from django.db.models.signals import post_delete
+from .token import UserAuthToken
+from .user import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+def drop_cached_tokens_on_user_change(sender, instance, created, **kwargs):
+    if created:
+        return
+    from apps.api.auth import invalidate_user_tokens  # local import: api depends on models
+
+    # The cache holds the whole user row, so any save (password, roles, profile) drops it
+    invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=UserAuthToken)
+def drop_cached_token_on_save(sender, instance, **kwargs):
+    from apps.api.auth import invalidate_user_tokens, token_cache  # local import: api depends on models
+
+    # A reissued token string may have resolved to a different (since deleted) user
+    token_cache.delete(instance.token_digest)
+    # and a rotated token must stop resolving; a user has one token, so drop all of theirs
+    invalidate_user_tokens(instance.user_id)
+
+
+@receiver(post_delete, sender=UserAuthToken)
+def drop_cached_token_on_delete(sender, instance, **kwargs):
+    from apps.api.auth import invalidate_user_tokens  # local import: api depends on models
+
+    invalidate_user_tokens(instance.user_id)
+
+
+# Cached role names (apps/utils/role_utils.py) follow UserRole changes
+from .user import Role, UserRole
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def drop_cached_roles_on_change(sender, instance, **kwargs):
+    from apps.utils.role_utils import invalidate_role_names
+    from apps.utils.unread_counts import forget_unread
+
+    invalidate_role_names(instance.user_id)
+    # Roles decide which broadcasts the user sees
+    forget_unread([instance.user_id])
+
+
+@receiver(post_save, sender=Role)
+def drop_cached_roles_on_rename(sender, instance, created, **kwargs):
+    if created:
+        return
+    from apps.utils.role_utils import invalidate_role_names_many
+
+    invalidate_role_names_many(UserRole.objects.filter(role=instance).values_list("user_id", flat=True))
+
+
+# Keep DashboardSummary rows (apps/utils/dashboard_utils.py) in step with fields
+from .field import CropLifecycleDates, Field, FieldIrrigationPractice
+
+
+def _refresh_dashboard(*user_ids):
+    from apps.utils.dashboard_utils import refresh_user_summary
+
+    for user_id in dict.fromkeys(user_ids):
+        try:
+            refresh_user_summary(user_id)
+        except Exception:
+            # A stale summary is repaired by `manage.py rebuild_dashboard_summaries`
+            pass
+
+
+@receiver(pre_save, sender=Field)
+def remember_field_owner(sender, instance, **kwargs):
+    instance._previous_owner_id = (
+        Field.objects.filter(pk=instance.pk).values_list("user_id", flat=True).first()
+        if instance.pk else instance.user_id
+    )
+
+
+@receiver(post_save, sender=Field)
+def refresh_dashboard_on_field_save(sender, instance, **kwargs):
+    _refresh_dashboard(instance.user_id, getattr(instance, "_previous_owner_id", instance.user_id))
+
+
+@receiver(post_delete, sender=Field)
+def refresh_dashboard_on_field_delete(sender, instance, **kwargs):
+    _refresh_dashboard(instance.user_id)
+
+
+@receiver(post_save, sender=CropLifecycleDates)
+@receiver(post_delete, sender=CropLifecycleDates)
+@receiver(post_save, sender=FieldIrrigationPractice)
+@receiver(post_delete, sender=FieldIrrigationPractice)
+def refresh_dashboard_on_field_detail_change(sender, instance, **kwargs):
+    owner = list(Field.objects.filter(pk=instance.field_id).values_list("user_id", flat=True)[:1])
+    # Nothing to do when the field itself is being deleted; its own signal covers it
+    if owner:
+        _refresh_dashboard(owner[0])
+
+
+# Deleted transactions flag their day for the next analytics rollup refresh
+from .user_plan import Transaction
+
+
+@receiver(post_delete, sender=Transaction)
+def flag_analytics_day_on_transaction_delete(sender, instance, **kwargs):
+    from apps.utils.analytics_utils import mark_transaction_day_stale
+
+    try:
+        mark_transaction_day_stale(instance.created_at)
+    except Exception:
+        pass
+
+
+# Cached field analytics (apps/utils/analytics_utils.py) follow field data changes
+from .field import FieldIrrigationMethod
+
+
+@receiver(post_save, sender=Field)
+@receiver(post_delete, sender=Field)
+def drop_field_analytics_on_field_change(sender, instance, **kwargs):
+    from apps.utils.analytics_utils import invalidate_field_analytics
+
+    invalidate_field_analytics(instance.user_id, getattr(instance, "_previous_owner_id", None))
+
+
+@receiver(post_save, sender=FieldIrrigationMethod)
+@receiver(post_delete, sender=FieldIrrigationMethod)
+@receiver(post_save, sender=CropLifecycleDates)
+@receiver(post_delete, sender=CropLifecycleDates)
+@receiver(post_save, sender=FieldIrrigationPractice)
+@receiver(post_delete, sender=FieldIrrigationPractice)
+def drop_field_analytics_on_detail_change(sender, instance, **kwargs):
+    from apps.utils.analytics_utils import invalidate_field_analytics
+
+    owner = list(Field.objects.filter(pk=instance.field_id).values_list("user_id", flat=True)[:1])
+    invalidate_field_analytics(*owner)
+
+
+# Cached Agribot farm context (apps/api/agribot/context.py) follows the data it summarises
+from .crop_variety import Crop
+from .farm import Farm
+from .feature_plan import PlanFeature
+from .user_plan import UserPlan
+
+
+@receiver(post_save, sender=Field)
+@receiver(post_delete, sender=Field)
+def drop_agribot_context_on_field_change(sender, instance, **kwargs):
+    from apps.api.agribot.context import invalidate_farm_context
+
+    invalidate_farm_context(instance.user_id, getattr(instance, "_previous_owner_id", None))
+
+
+@receiver(post_save, sender=FieldIrrigationMethod)
+@receiver(post_delete, sender=FieldIrrigationMethod)
+@receiver(post_save, sender=CropLifecycleDates)
+@receiver(post_delete, sender=CropLifecycleDates)
+def drop_agribot_context_on_field_detail_change(sender, instance, **kwargs):
+    from apps.api.agribot.context import invalidate_farm_context
+
+    owner = list(Field.objects.filter(pk=instance.field_id).values_list("user_id", flat=True)[:1])
+    invalidate_farm_context(*owner)
+
+
+@receiver(post_save, sender=Farm)
+@receiver(post_delete, sender=Farm)
+@receiver(post_save, sender=UserPlan)
+@receiver(post_delete, sender=UserPlan)
+def drop_agribot_context_on_owner_change(sender, instance, **kwargs):
+    from apps.api.agribot.context import invalidate_farm_context
+
+    invalidate_farm_context(instance.user_id)
+
+
+@receiver(post_save, sender=CustomUser)
+def drop_agribot_context_on_user_change(sender, instance, created, **kwargs):
+    from apps.api.agribot.context import invalidate_farm_context
+
+    if not created:
+        invalidate_farm_context(instance.pk)
+
+
+@receiver(post_save, sender=PlanFeature)
+@receiver(post_delete, sender=PlanFeature)
+def drop_agribot_context_on_plan_features_change(sender, instance, **kwargs):
+    from apps.api.agribot.context import invalidate_farm_context
+
+    try:
+        invalidate_farm_context(*UserPlan.objects.filter(plan_id=instance.plan_id, is_active=True).values_list("user_id", flat=True))
+    except Exception:
+        pass
+
+
+@receiver(post_save, sender=Crop)
+@receiver(post_delete, sender=Crop)
+def drop_agribot_crop_catalog(sender, instance, **kwargs):
+    from apps.api.agribot.context import invalidate_crop_catalog
+
+    invalidate_crop_catalog()
+
+
+# Unread counters (apps/utils/unread_counts.py) follow single-row writes;
+# bulk writes and read-state changes adjust them where they happen
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    from apps.utils.notification_utils import announce_notification
+    from apps.utils.unread_counts import adjust_unread
+
+    if not created:
+        return
+    announce_notification([instance.receiver_id], instance)
+    if not instance.is_read:
+        adjust_unread(instance.receiver_id, 1)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    from apps.utils.unread_counts import adjust_unread
+
+    if not instance.is_read:
+        adjust_unread(instance.receiver_id, -1)
+
+
+@receiver(post_save, sender=Field)
+@receiver(post_delete, sender=Field)
+def drop_unread_count_on_field_change(sender, instance, **kwargs):
+    # Region and crop filters decide which broadcasts the owner sees
+    from apps.utils.unread_counts import forget_unread
+
+    forget_unread([instance.user_id, getattr(instance, "_previous_owner_id", None)])
+
+
+# Ticket status changes go out to the live event stream (apps/api/events.py)
+@receiver(pre_save, sender=SupportTicket)
+def remember_ticket_status(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and "status" not in update_fields):
+        instance._previous_status = instance.status
+        return
+    instance._previous_status = (
+        SupportTicket.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=SupportTicket)
+def announce_ticket_status(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_status", None)
+    if not created and previous == instance.status:
+        return
+    from apps.utils.event_bus import publish
+
+    publish(
+        [instance.created_by_id, instance.assigned_to_support_id, instance.forwarded_to_user_id],
+        {
+            "type": "ticket",
+            "ticket": {
+                "id": instance.pk,
+                "ticket_number": instance.ticket_number,
+                "status": instance.status,
+                "previous_status": None if created else previous,
+                "updated_at": instance.updated_at.isoformat() if instance.updated_at else None,
+            },
+        },
+    )
@@ -1,17 +1,32 @@
 from __future__ import annotations
 
+import hashlib
+
 from django.db import models
 from django.utils import timezone
 
 from .user import CustomUser
 
 
+def token_digest(token: str) -> str:
+    """Fixed-length SHA-256 hex digest used to look tokens up through an index."""
+    return hashlib.sha256((token or "").encode("utf-8")).hexdigest()
+
+
 class UserAuthToken(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name="auth_token")
     access_token = models.TextField()
+    # Indexed digest of access_token; the raw TextField is not indexable cheaply
+    token_digest = models.CharField(max_length=64, db_index=True, null=True, blank=True, editable=False)
     last_login = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:  # pragma: no cover - trivial
         username = self.user.username or self.user.email
         return f"{username} - Auth Token"
 
+    def save(self, *args, **kwargs):
+        self.token_digest = token_digest(self.access_token)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "access_token" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "token_digest"}
+        super().save(*args, **kwargs)
@@ -44,6 +44,10 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    # Admin who created this account; older rows are filled by `manage.py backfill_created_by`
+    created_by = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="created_users"
+    )
 
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS: list[str] = ["email"]
@@ -18,6 +18,16 @@ class UserPlan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Current plan lookups always filter is_active=True
+            models.Index(
+                fields=["user", "-created_at"],
+                condition=models.Q(is_active=True),
+                name="userplan_user_active_idx",
+            ),
+        ]
+
 
 class PlanFeatureUsage(models.Model):
     user_plan = models.ForeignKey(UserPlan, on_delete=models.CASCADE, related_name="feature_usages")
@@ -58,6 +68,28 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # A user's transaction history, newest first (also the keyset cursor)
+            models.Index(fields=["user", "-created_at", "-id"], name="txn_user_feed_idx"),
+            models.Index(
+                fields=["user", "transaction_type", "status", "-created_at"],
+                name="txn_user_type_status_idx",
+            ),
+            # "Latest successful payment" (dashboard, user plans, downgrade/refund)
+            models.Index(
+                fields=["user", "-created_at"],
+                condition=models.Q(transaction_type="payment", status__in=["success", "paid", "completed"]),
+                name="txn_user_paid_idx",
+            ),
+            # Razorpay verification and webhooks look transactions up by order id
+            models.Index(
+                fields=["provider_order_id"],
+                condition=models.Q(provider_order_id__isnull=False),
+                name="txn_provider_order_idx",
+            ),
+        ]
+
 
 class RefundPolicy(models.Model):
     plan_type = models.CharField(max_length=16, choices=Plan.PlanType.choices)
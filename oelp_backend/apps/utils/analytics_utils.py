@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.models_app.analytics_snapshot import AnalyticsSnapshot, DailyTransactionRollup
+from apps.models_app.field import Field, FieldIrrigationMethod, FieldIrrigationPractice
+from apps.models_app.user import CustomUser, Role
+from apps.models_app.user_plan import Transaction, UserPlan
+
+# Status sets the admin dashboard has always used
+PAYMENT_STATUSES = ["success", "paid", "completed", "refunded"]
+REFUND_STATUSES = ["success", "paid", "completed"]
+PRIVILEGED_ROLES = ["SuperAdmin", "Admin", "Analyst", "Business", "Developer", "Support", "Agronomist", "Manager"]
+EMPLOYEE_ROLES = ["Analyst", "Agronomist", "Support", "Business", "Developer"]
+
+
+def _rebuild_rollups(days: Optional[Iterable]) -> int:
+    """Recompute rollup rows for ``days`` (every day when None). Returns the days redone."""
+    qs = Transaction.objects.annotate(day=TruncDate("created_at"))
+    if days is not None:
+        days = set(days)
+        if not days:
+            return 0
+        qs = qs.filter(day__in=days)
+    grouped = (
+        qs.values("day", "status", "transaction_type")
+        .annotate(n=Count("id"), total=Sum("amount"))
+        .order_by()
+    )
+    rows = [
+        DailyTransactionRollup(
+            day=row["day"],
+            status=row["status"],
+            transaction_type=row["transaction_type"],
+            count=row["n"],
+            amount=row["total"] or 0,
+        )
+        for row in grouped
+    ]
+    with transaction.atomic():
+        existing = DailyTransactionRollup.objects.all()
+        if days is not None:
+            existing = existing.filter(day__in=days)
+        existing.delete()
+        DailyTransactionRollup.objects.bulk_create(rows)
+    return len(days) if days is not None else len({r.day for r in rows})
+
+
+def _revenue_total() -> float:
+    sums = DailyTransactionRollup.objects.aggregate(
+        payments=Sum("amount", filter=Q(transaction_type="payment", status__in=PAYMENT_STATUSES)),
+        refunds=Sum("amount", filter=Q(transaction_type="refund", status__in=REFUND_STATUSES)),
+    )
+    return float((sums["payments"] or Decimal(0)) - (sums["refunds"] or Decimal(0)))
+
+
+def _transactions_by_status() -> List[Dict]:
+    rows = (
+        DailyTransactionRollup.objects.values("status")
+        .annotate(cnt=Sum("count"))
+        .order_by("-cnt")
+    )
+    return [{"name": (row["status"] or "unknown"), "value": row["cnt"]} for row in rows]
+
+
+def _headcounts() -> Dict:
+    active_users = CustomUser.objects.filter(is_active=True)
+    role_headcounts = {
+        row["name"]: row["n"]
+        for row in Role.objects.annotate(
+            n=Count("role_users__user", filter=Q(role_users__user__is_active=True), distinct=True)
+        ).values("name", "n")
+    }
+    # Active end-users: users who have ONLY the End-App-User role (no other roles)
+    end_user_ids = active_users.filter(user_roles__role__name="End-App-User").values("id")
+    mixed_ids = CustomUser.objects.filter(
+        id__in=end_user_ids, user_roles__role__name__in=PRIVILEGED_ROLES
+    ).values("id")
+    return {
+        "role_headcounts": role_headcounts,
+        "active_end_users": CustomUser.objects.filter(id__in=end_user_ids).exclude(id__in=mixed_ids).count(),
+        "active_admins": role_headcounts.get("Admin", 0),
+        "active_employees": active_users.filter(user_roles__role__name__in=EMPLOYEE_ROLES).distinct().count(),
+    }
+
+
+def refresh_admin_snapshot(full: bool = False) -> AnalyticsSnapshot:
+    """
+    Bring the admin analytics snapshot up to date.
+
+    Only days with transactions created/updated since the previous run (or
+    flagged stale by a delete) are re-rolled up; ``full`` redoes every day.
+    Headcounts and plan distribution are current-state counts and are simply
+    recomputed. Refreshes hold the snapshot row's lock, so concurrent runs
+    (the beat task, the management command, a queued refresh) take turns
+    instead of rewriting the same rollup rows at once.
+    """
+    started = timezone.now()
+    with transaction.atomic():
+        snapshot, created = AnalyticsSnapshot.objects.select_for_update().get_or_create(
+            key=AnalyticsSnapshot.ADMIN, defaults={"data": {}, "computed_at": started}
+        )
+        if not full and not created and snapshot.computed_at > started:
+            # Another refresh finished while we waited for the lock
+            return snapshot
+        since = None if (full or created) else snapshot.transactions_synced_at
+        if since is None:
+            days = None
+        else:
+            touched = (
+                Transaction.objects.filter(updated_at__gte=since)
+                .annotate(day=TruncDate("created_at"))
+                .values_list("day", flat=True)
+                .distinct()
+            )
+            stale = DailyTransactionRollup.objects.filter(stale=True).values_list("day", flat=True).distinct()
+            days = set(touched) | set(stale)
+        days_rebuilt = _rebuild_rollups(days)
+
+        plan_distribution = [
+            {"name": (row["plan__name"] or "Unknown"), "value": row["cnt"]}
+            for row in UserPlan.objects.filter(is_active=True).values("plan__name").annotate(cnt=Count("id")).order_by("-cnt")
+        ]
+        snapshot.data = {
+            "total_revenue": _revenue_total(),
+            "total_fields": Field.objects.count(),
+            "transactions_by_status": _transactions_by_status(),
+            "plan_distribution": plan_distribution,
+            **_headcounts(),
+            "days_rebuilt": days_rebuilt,
+        }
+        snapshot.computed_at = timezone.now()
+        snapshot.transactions_synced_at = started
+        snapshot.save()
+    cache.delete(REFRESH_QUEUED_KEY)
+    return snapshot
+
+
+REFRESH_QUEUED_KEY = "analytics-snapshot:refresh-queued"
+
+
+def _max_age() -> int:
+    return getattr(settings, "ANALYTICS_SNAPSHOT_MAX_AGE", 300)
+
+
+def request_snapshot_refresh() -> None:
+    """Queue a background refresh; further requests are dropped until it has run."""
+    from apps.api.tasks import refresh_analytics_snapshot
+
+    if cache.add(REFRESH_QUEUED_KEY, 1, _max_age()):
+        transaction.on_commit(refresh_analytics_snapshot.delay)
+
+
+def get_admin_snapshot() -> AnalyticsSnapshot:
+    """
+    The stored snapshot, never computed on the request. The beat schedule
+    refreshes it every ANALYTICS_SNAPSHOT_REFRESH_INTERVAL; one found missing or
+    older than ANALYTICS_SNAPSHOT_MAX_AGE (worker down, schedule not running)
+    queues a refresh and is served as it is meanwhile. Before the first refresh
+    an empty, unsaved snapshot stands in.
+    """
+    snapshot = AnalyticsSnapshot.objects.filter(key=AnalyticsSnapshot.ADMIN).first()
+    if snapshot is None or snapshot.computed_at < timezone.now() - timedelta(seconds=_max_age()):
+        request_snapshot_refresh()
+    return snapshot or AnalyticsSnapshot(key=AnalyticsSnapshot.ADMIN, data={}, computed_at=None)
+
+
+def revenue_by_day(days: int = 7) -> List[Dict]:
+    """Net revenue (payments minus refunds) per day for the last ``days`` days, zero-filled."""
+    today = timezone.localdate()
+    first = today - timedelta(days=days - 1)
+    rows = (
+        DailyTransactionRollup.objects
+        .filter(day__gte=first, status__in=PAYMENT_STATUSES)
+        .values("day")
+        .annotate(
+            payments=Sum("amount", filter=Q(transaction_type="payment")),
+            refunds=Sum("amount", filter=Q(transaction_type="refund")),
+        )
+    )
+    by_day = {row["day"]: float((row["payments"] or 0) - (row["refunds"] or 0)) for row in rows}
+    return [
+        {"name": (first + timedelta(days=i)).isoformat(), "value": by_day.get(first + timedelta(days=i), 0)}
+        for i in range(days)
+    ]
+
+
+def mark_transaction_day_stale(created_at) -> None:
+    if created_at is None:
+        return
+    day = timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+    DailyTransactionRollup.objects.filter(day=day).update(stale=True)
+
+
+# ------------------- Field analytics summary -------------------
+
+def _summary_cache_key(user_id: Optional[int]) -> str:
+    return "analytics-summary:global" if user_id is None else f"analytics-summary:user:{user_id}"
+
+
+def _ranked(counts: Dict[str, int]) -> List[Dict]:
+    return [{"name": name, "value": value} for name, value in sorted(counts.items(), key=lambda kv: -kv[1])]
+
+
+def compute_field_analytics(fields) -> Dict:
+    """
+    Crop, region and lifecycle figures for ``fields`` from a single grouped
+    query, plus the irrigation breakdown (which groups by a different table).
+    """
+    grouped = (
+        fields.values("crop__name", "location_name")
+        .annotate(
+            cnt=Count("id", distinct=True),
+            lifecycle_total=Count("croplifecycledates", distinct=True),
+            lifecycle_done=Count(
+                "croplifecycledates",
+                filter=Q(croplifecycledates__harvesting_date__isnull=False),
+                distinct=True,
+            ),
+        )
+        .order_by()
+    )
+    crops: Dict[str, int] = {}
+    regions: Dict[str, int] = {}
+    total_lifecycle = completed_lifecycle = 0
+    for row in grouped:
+        crop = row["crop__name"] or "Unassigned"
+        region = row["location_name"] or "Unknown"
+        crops[crop] = crops.get(crop, 0) + row["cnt"]
+        regions[region] = regions.get(region, 0) + row["cnt"]
+        total_lifecycle += row["lifecycle_total"]
+        completed_lifecycle += row["lifecycle_done"]
+
+    # Irrigation distribution: prefer explicit method mapping; fallback to practices
+    irrigation_distribution = []
+    for model in (FieldIrrigationMethod, FieldIrrigationPractice):
+        rows = (
+            model.objects.filter(field__in=fields)
+            .values("irrigation_method__name")
+            .annotate(cnt=Count("id"))
+            .order_by("-cnt")
+        )
+        irrigation_distribution = [
+            {"name": (row["irrigation_method__name"] or "Unspecified"), "value": row["cnt"]} for row in rows
+        ]
+        if irrigation_distribution:
+            break
+
+    crop_distribution = _ranked(crops)
+    region_distribution = _ranked(regions)
+    return {
+        "has_data": bool(crop_distribution or irrigation_distribution or region_distribution or total_lifecycle),
+        "lifecycle_completion": [
+            {"name": "Completed", "value": completed_lifecycle},
+            {"name": "Remaining", "value": max(total_lifecycle - completed_lifecycle, 0)},
+        ],
+        "lifecycle_completion_percent": (
+            int(round((completed_lifecycle / total_lifecycle) * 100)) if total_lifecycle else 0
+        ),
+        "crop_distribution": crop_distribution,
+        "irrigation_distribution": irrigation_distribution,
+        "region_distribution": region_distribution,
+    }
+
+
+def get_field_analytics(user_id: Optional[int], privileged: bool) -> Dict:
+    """Cached field analytics for one user, or for every field when ``privileged``."""
+    if not privileged and user_id is None:
+        return compute_field_analytics(Field.objects.none())
+    key = _summary_cache_key(None if privileged else user_id)
+    data = cache.get(key)
+    if data is None:
+        fields = Field.objects.all() if privileged else Field.objects.filter(user_id=user_id)
+        data = compute_field_analytics(fields)
+        cache.set(key, data, getattr(settings, "ANALYTICS_SUMMARY_CACHE_TTL", 600))
+    return data
+
+
+def invalidate_field_analytics(*user_ids) -> None:
+    """Drop the cached summaries of the given owners and the global one."""
+    keys = {_summary_cache_key(None)}
+    keys.update(_summary_cache_key(uid) for uid in user_ids if uid is not None)
+    cache.delete_many(list(keys))
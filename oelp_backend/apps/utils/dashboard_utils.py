@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.models_app.dashboard_summary import DashboardSummary
+from apps.models_app.field import CropLifecycleDates, Field, FieldIrrigationPractice
+
+# Counters that the global row holds as the sum over every owner row
+COUNTERS = ("active_fields", "assigned_crops", "lifecycle_active_crops", "total_hectares")
+
+
+def _hectares(area) -> float:
+    try:
+        hectares = (area or {}).get("hectares")
+        if isinstance(hectares, (int, float)):
+            return float(hectares)
+    except Exception:
+        pass
+    return 0.0
+
+
+def _empty_totals() -> Dict[str, object]:
+    return {
+        "active_fields": 0,
+        "assigned_crops": 0,
+        "lifecycle_active_crops": 0,
+        "total_hectares": 0.0,
+        "last_practice_at": None,
+    }
+
+
+def totals_by_owner(fields) -> Dict[Optional[int], Dict[str, object]]:
+    """
+    Dashboard totals for ``fields`` grouped by owner, in a fixed number of
+    queries. The rules are the ones DashboardView always applied: only active
+    fields count, and a crop is active if assigned or its lifecycle is unharvested.
+    """
+    active = fields.filter(is_active=True)
+    totals: Dict[Optional[int], Dict[str, object]] = defaultdict(_empty_totals)
+    for user_id, area, has_crop in active.values_list("user_id", "area", "crop_id").iterator():
+        row = totals[user_id]
+        row["active_fields"] += 1
+        row["assigned_crops"] += 1 if has_crop is not None else 0
+        row["total_hectares"] += _hectares(area)
+    lifecycle_rows = (
+        CropLifecycleDates.objects
+        .filter(field__in=active, field__crop__isnull=False, harvesting_date__isnull=True)
+        .values("field__user_id")
+        .annotate(n=Count("field_id", distinct=True))
+    )
+    for row in lifecycle_rows:
+        totals[row["field__user_id"]]["lifecycle_active_crops"] = row["n"]
+    practice_rows = (
+        FieldIrrigationPractice.objects
+        .filter(field__in=active)
+        .values("field__user_id")
+        .annotate(last=Max("performed_at"))
+    )
+    for row in practice_rows:
+        totals[row["field__user_id"]]["last_practice_at"] = row["last"]
+    return totals
+
+
+def _owner_fields(user_id):
+    if user_id is None:
+        return Field.objects.filter(user__isnull=True)
+    return Field.objects.filter(user_id=user_id)
+
+
+def refresh_user_summary(user_id) -> DashboardSummary:
+    """
+    Recompute one owner's summary and fold the difference into the global row.
+
+    Only that owner's fields are read, so the cost does not grow with the size
+    of the platform.
+    """
+    scope = DashboardSummary.scope_for_user(user_id)
+    with transaction.atomic():
+        summary, _ = DashboardSummary.objects.select_for_update().get_or_create(
+            scope=scope, defaults={"owner_id": user_id}
+        )
+        totals = totals_by_owner(_owner_fields(user_id)).get(user_id) or _empty_totals()
+        delta = {name: totals[name] - getattr(summary, name) for name in COUNTERS}
+        previous_practice = summary.last_practice_at
+        for name, value in totals.items():
+            setattr(summary, name, value)
+        summary.save()
+
+        updates = {name: F(name) + value for name, value in delta.items() if value}
+        latest = totals["last_practice_at"]
+        if previous_practice is not None and (latest is None or latest < previous_practice):
+            # This owner's latest practice went away and may have been the platform's latest
+            updates["last_practice_at"] = _latest_practice(Field.objects.all())
+        elif latest is not None:
+            updates["last_practice_at"] = Greatest(Coalesce(F("last_practice_at"), Value(latest)), Value(latest))
+        if updates:
+            # No global row yet is fine: every row is rebuilt on the first privileged read
+            DashboardSummary.objects.filter(scope=DashboardSummary.GLOBAL).update(**updates)
+    return summary
+
+
+def _latest_practice(fields):
+    return FieldIrrigationPractice.objects.filter(field__in=fields.filter(is_active=True)).aggregate(
+        last=Max("performed_at")
+    )["last"]
+
+
+def _grand_totals(per_owner) -> Dict[str, object]:
+    grand = _empty_totals()
+    for totals in per_owner.values():
+        for name in COUNTERS:
+            grand[name] += totals[name]
+        if totals["last_practice_at"] and (
+            grand["last_practice_at"] is None or totals["last_practice_at"] > grand["last_practice_at"]
+        ):
+            grand["last_practice_at"] = totals["last_practice_at"]
+    return grand
+
+
+def rebuild_all_summaries() -> DashboardSummary:
+    """Recompute every owner row and the global row from scratch; returns the global row."""
+    per_owner = totals_by_owner(Field.objects.all())
+    rows = [
+        DashboardSummary(scope=DashboardSummary.scope_for_user(user_id), owner_id=user_id, **totals)
+        for user_id, totals in per_owner.items()
+    ]
+    rows.append(DashboardSummary(scope=DashboardSummary.GLOBAL, owner_id=None, **_grand_totals(per_owner)))
+    with transaction.atomic():
+        DashboardSummary.objects.all().delete()
+        DashboardSummary.objects.bulk_create(rows)
+    return rows[-1]
+
+
+def _create_global_summary() -> DashboardSummary:
+    """
+    First privileged read on a deployment whose summaries were never built
+    (e.g. straight after migrating a database with fields). Every owner row is
+    built together with the global row: a global row built alone would count
+    each owner a second time when their missing row is first refreshed.
+    """
+    try:
+        with transaction.atomic():
+            return rebuild_all_summaries()
+    except IntegrityError:
+        # A concurrent first read built them; its rows are as good as ours
+        return DashboardSummary.objects.get(scope=DashboardSummary.GLOBAL)
+
+
+def get_dashboard_summary(user_id: Optional[int], privileged: bool) -> DashboardSummary:
+    """Summary row shown on the dashboard, built on first use."""
+    scope = DashboardSummary.GLOBAL if privileged else DashboardSummary.scope_for_user(user_id)
+    summary = DashboardSummary.objects.filter(scope=scope).first()
+    if summary is not None:
+        return summary
+    return _create_global_summary() if privileged else refresh_user_summary(user_id)
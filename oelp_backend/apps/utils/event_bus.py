@@ -0,0 +1,174 @@
+"""
+Pub/sub behind the live event stream (apps/api/events.py).
+
+Producers call ``publish(user_ids, message)`` from ordinary sync code (views,
+signals, Celery tasks); the message goes out once the surrounding
+transaction commits. Each open stream holds a ``Subscription`` and awaits
+the messages for its user. ``EVERYONE`` in ``user_ids`` reaches every open
+stream.
+
+``InProcessBus`` (the default) only reaches streams served by the same
+process, which is all a single-node deployment needs. ``RedisBus`` relays
+through one Redis pub/sub channel so any process, including Celery workers,
+reaches every stream; select it with EVENT_BUS_BACKEND.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+EVERYONE = "*"
+
+
+class Subscription:
+    def __init__(self, user_id, maxsize: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.loop = asyncio.get_running_loop()
+
+    async def get(self) -> Dict:
+        return await self.queue.get()
+
+    def deliver(self, message: Dict) -> None:
+        """Queue ``message`` from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The stream's event loop is gone; it is unsubscribed shortly
+            pass
+
+    def _put(self, message: Dict) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client that stopped reading loses events rather than growing memory
+            pass
+
+
+class InProcessBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[object, Set[Subscription]] = {}
+
+    def _queue_size(self) -> int:
+        return getattr(settings, "EVENT_STREAM_QUEUE_SIZE", 100)
+
+    async def subscribe(self, user_id) -> Subscription:
+        subscription = Subscription(user_id, self._queue_size())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def connected(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def deliver(self, user_ids: Iterable, message: Dict) -> None:
+        """Hand ``message`` to this process's subscribers for ``user_ids``."""
+        with self._lock:
+            if EVERYONE in user_ids:
+                targets = [sub for subscribers in self._subscribers.values() for sub in subscribers]
+            else:
+                targets = [sub for uid in user_ids for sub in self._subscribers.get(uid, ())]
+        for subscription in targets:
+            subscription.deliver(message)
+
+    def publish(self, user_ids: Iterable, message: Dict) -> None:
+        self.deliver(list(user_ids), message)
+
+
+class RedisBus(InProcessBus):
+    """
+    Messages travel through Redis: ``publish`` sends them to one channel and
+    a single listener task per process feeds the local subscribers, so a
+    process holds one Redis connection however many streams it serves.
+    """
+
+    channel = "oelp-events"
+
+    def __init__(self, url: Optional[str] = None):
+        super().__init__()
+        self.url = url or getattr(settings, "EVENT_BUS_URL", None) or "redis://localhost:6379/0"
+        self._client = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def publish(self, user_ids: Iterable, message: Dict) -> None:
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(self.channel, json.dumps({"users": list(user_ids), "message": message}))
+
+    async def subscribe(self, user_id) -> Subscription:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return await super().subscribe(user_id)
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            async for item in pubsub.listen():
+                if item.get("type") != "message":
+                    continue
+                try:
+                    payload = json.loads(item["data"])
+                except (TypeError, ValueError):
+                    continue
+                self.deliver(payload.get("users") or [], payload.get("message") or {})
+        except Exception:
+            # The next subscribe() starts a new listener
+            logger.exception("Event bus listener stopped")
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                backend = getattr(settings, "EVENT_BUS_BACKEND", "apps.utils.event_bus.InProcessBus")
+                _bus = import_string(backend)()
+    return _bus
+
+
+def publish(user_ids: Iterable, message: Dict) -> None:
+    """Send ``message`` to the streams of ``user_ids`` once the current transaction commits."""
+    ids = [uid for uid in dict.fromkeys(user_ids) if uid is not None]
+    if not ids:
+        return
+
+    def send():
+        try:
+            get_bus().publish(ids, message)
+        except Exception:
+            # Live events are best effort; clients catch up on their next fetch
+            logger.exception("Could not publish %s event", message.get("type"))
+
+    transaction.on_commit(send)
@@ -1,13 +1,23 @@
-from typing import Dict, List, Optional, Tuple
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models import Q, Count
+from django.db.models import BooleanField, Exists, OuterRef, Q, Value
+from django.utils import timezone
 
 from apps.models_app.field import Field
+from apps.utils.event_bus import EVERYONE, publish
+from apps.utils.role_utils import get_role_names
+from apps.utils.unread_counts import forget_unread, retire_all_unread
 
 User = get_user_model()
 
+END_USER_ROLE = "End-App-User"
+# A user holding any of these is not an end user, whatever else they hold
+NON_END_USER_ROLES = ["SuperAdmin", "Admin", "Business", "Support", "Agronomist", "Analyst", "Developer"]
+
 
 def normalize_role(role: str | None) -> str | None:
     """
@@ -59,13 +69,13 @@ def get_allowed_receivers(sender_role: str) -> Dict[str, List[str]]:
     return {"roles": flow.get(key or sender_role, [])}
 
 
-def get_users_by_roles(
+def recipients_queryset(
     roles: List[str],
     region: Optional[str] = None,
     crop_type: Optional[str] = None,
-) -> List[User]:
+):
     """
-    Get users by roles. Special handling for End-App-User:
+    Active users matching ``roles`` and the optional region/crop filters. Special handling for End-App-User:
     - If sending to "End-App-User", only include users who have End-App-User as their ONLY role
     - This prevents notifications intended for end-users from going to Business/Admin/etc users
     - For other roles, include all users who have that role (even if they have multiple roles)
@@ -80,20 +90,16 @@ def get_users_by_roles(
     if is_targeting_end_users:
         # When targeting End-App-User, only get users who have End-App-User as their ONLY role
         # This excludes users who have both End-App-User and other roles (like Business, Admin, etc.)
-        end_user_role_name = "End-App-User"
-        # Get all non-end-user role names to exclude
-        non_end_user_roles = ["SuperAdmin", "Admin", "Business", "Support", "Agronomist", "Analyst", "Developer"]
-        
         # Get users who have End-App-User role
         users_with_end_user_role = User.objects.filter(
             is_active=True, 
-            user_roles__role__name=end_user_role_name
+            user_roles__role__name=END_USER_ROLE
         ).distinct()
         
         # Exclude users who also have any non-end-user role
         users_with_other_roles = User.objects.filter(
             is_active=True,
-            user_roles__role__name__in=non_end_user_roles
+            user_roles__role__name__in=NON_END_USER_ROLES
         ).values_list("id", flat=True)
         
         qs = users_with_end_user_role.exclude(id__in=users_with_other_roles)
@@ -114,11 +120,50 @@ def get_users_by_roles(
         ).values_list("user_id", flat=True)
         qs = qs.filter(id__in=crop_user_ids)
 
-    return list(qs.distinct())
+    return qs.distinct()
 
 
-def send_notification(
-    sender: User,
+def get_users_by_roles(
+    roles: List[str],
+    region: Optional[str] = None,
+    crop_type: Optional[str] = None,
+) -> List[User]:
+    """Users matching ``roles``; use ``recipients_queryset`` for large audiences."""
+    return list(recipients_queryset(roles, region=region, crop_type=crop_type))
+
+
+def announce_notification(receiver_ids, notification, with_id: bool = True) -> None:
+    """
+    Push a new Notification to open event streams. For a batch sharing its
+    content, one row stands for all of them and its id is left out.
+    """
+    publish(receiver_ids, {
+        "type": "notification",
+        "notification": {
+            "id": notification.pk if with_id else None,
+            "sender": notification.sender_id,
+            "message": notification.message,
+            "notification_type": notification.notification_type,
+            "cause": notification.cause,
+            "created_at": notification.created_at.isoformat() if notification.created_at else None,
+        },
+    })
+
+
+def _batch_size() -> int:
+    return getattr(settings, "NOTIFICATION_BATCH_SIZE", 1000)
+
+
+def _iter_batches(ids: Iterator[int], size: int) -> Iterator[List[int]]:
+    while True:
+        batch = list(islice(ids, size))
+        if not batch:
+            return
+        yield batch
+
+
+def deliver_notification(
+    sender_id: Optional[int],
     message: str,
     receiver_roles: List[str],
     notification_type: str = "general",
@@ -127,46 +172,229 @@ def send_notification(
     region: Optional[str] = None,
     crop_type: Optional[str] = None,
     metadata: Optional[Dict] = None,
-) -> Tuple[int, List[Dict]]:
+) -> int:
+    """
+    Insert one Notification per recipient. Recipient ids are streamed from the
+    database and rows written NOTIFICATION_BATCH_SIZE at a time, so memory stays
+    flat however large the audience. Returns the number of rows written.
+    """
     from apps.models_app.notifications import Notification
 
-    normalized_roles = [normalize_role(r) for r in receiver_roles]
-    users = get_users_by_roles(normalized_roles, region=region, crop_type=crop_type)
-    
-    tags_payload = tags.copy() if isinstance(tags, dict) else {}
-    if region:
-        tags_payload["region"] = region
-    if crop_type:
-        tags_payload["crop_type"] = crop_type
-    
-    notifications: List[Notification] = []
-    details: List[Dict] = []
-    
-    with transaction.atomic():
-        for user in users:
-            notifications.append(
+    tags_payload = _tags_payload(tags, region, crop_type)
+    size = _batch_size()
+    ids = (
+        recipients_queryset(receiver_roles, region=region, crop_type=crop_type)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .iterator(chunk_size=size)
+    )
+    sent = 0
+    for batch in _iter_batches(ids, size):
+        rows = Notification.objects.bulk_create(
+            [
                 Notification(
-                sender=sender,
-                receiver=user,
-                message=message,
-                notification_type=notification_type,
-                cause=cause,
+                    sender_id=sender_id,
+                    receiver_id=receiver_id,
+                    message=message,
+                    notification_type=notification_type,
+                    cause=cause,
                     tags=tags_payload,
-                region=region,
-                crop_type=crop_type,
+                    region=region,
+                    crop_type=crop_type,
                     metadata=metadata or {},
                 )
+                for receiver_id in batch
+            ],
+            batch_size=size,
+        )
+        forget_unread(batch)
+        announce_notification(batch, rows[0], with_id=False)
+        sent += len(batch)
+    return sent
+
+
+def _tags_payload(tags, region, crop_type) -> Dict:
+    payload = tags.copy() if isinstance(tags, dict) else {}
+    if region:
+        payload["region"] = region
+    if crop_type:
+        payload["crop_type"] = crop_type
+    return payload
+
+
+def broadcast_roles(roles: List[str]) -> List[str]:
+    """
+    Roles a broadcast to ``roles`` is stored against. As in
+    ``recipients_queryset``, targeting End-App-User reaches end users only.
+    """
+    normalized = [normalize_role(r) for r in roles if r]
+    if END_USER_ROLE in normalized:
+        return [END_USER_ROLE]
+    return normalized
+
+
+def create_broadcast(
+    sender_id: Optional[int],
+    message: str,
+    receiver_roles: List[str],
+    notification_type: str = "general",
+    cause: str = "user_action",
+    tags: Optional[Dict[str, str]] = None,
+    region: Optional[str] = None,
+    crop_type: Optional[str] = None,
+    metadata: Optional[Dict] = None,
+    audience_size: int = 0,
+):
+    """Store a role notification once; recipients see it through ``visible_broadcasts``."""
+    from apps.models_app.notifications import BroadcastNotification
+    from apps.models_app.user import Role
+
+    broadcast = BroadcastNotification.objects.create(
+        sender_id=sender_id,
+        message=message,
+        notification_type=notification_type,
+        cause=cause,
+        tags=_tags_payload(tags, region, crop_type),
+        region=region,
+        crop_type=crop_type,
+        metadata=metadata or {},
+        audience_size=audience_size,
+    )
+    broadcast.roles.set(Role.objects.filter(name__in=broadcast_roles(receiver_roles)))
+    retire_all_unread()
+    # Each open stream checks whether its user is in the audience
+    publish([EVERYONE], {"type": "broadcast", "id": broadcast.pk})
+    return broadcast
+
+
+def _receipts(user):
+    from apps.models_app.notifications import BroadcastReceipt
+
+    return BroadcastReceipt.objects.filter(broadcast=OuterRef("pk"), user_id=user.pk)
+
+
+def visible_broadcasts(user):
+    """
+    Broadcasts ``user`` would have been sent a Notification row for, newest
+    first, minus the ones they dismissed; each carries an ``is_read``
+    annotation from their receipt. Region and crop filters are matched
+    against the user's fields as they are now.
+    """
+    from apps.models_app.notifications import BroadcastNotification
+
+    names = {normalize_role(name) for name in get_role_names(user)}
+    if names & set(NON_END_USER_ROLES):
+        names.discard(END_USER_ROLE)
+    if not names:
+        # Same shape as below, so callers can still filter on is_read
+        return BroadcastNotification.objects.annotate(is_read=Value(False, output_field=BooleanField())).none()
+
+    targeted = BroadcastNotification.roles.through.objects.filter(role__name__in=names)
+    fields = Field.objects.filter(user_id=user.pk)
+    in_region = Exists(fields.filter(
+        Q(location_name__icontains=OuterRef("region")) | Q(farm__name__icontains=OuterRef("region"))
+    ))
+    grows_crop = Exists(fields.filter(
+        Q(crop__name__icontains=OuterRef("crop_type")) | Q(crop_variety__name__icontains=OuterRef("crop_type"))
+    ))
+    receipts = _receipts(user)
+    return (
+        BroadcastNotification.objects
+        .filter(pk__in=targeted.values("broadcastnotification_id"), created_at__gte=user.date_joined)
+        .filter(Q(region__isnull=True) | Q(region="") | in_region)
+        .filter(Q(crop_type__isnull=True) | Q(crop_type="") | grows_crop)
+        .exclude(Exists(receipts.filter(is_dismissed=True)))
+        .annotate(is_read=Exists(receipts.filter(is_read=True)))
+        .order_by("-created_at")
+    )
+
+
+def broadcast_feed(user, scope: str = "received"):
+    """Broadcasts for a notification list: received (``visible_broadcasts``), sent, or all."""
+    from apps.models_app.notifications import BroadcastNotification
+
+    if scope == "received":
+        qs = visible_broadcasts(user)
+    else:
+        qs = BroadcastNotification.objects.filter(sender_id=user.pk)
+        if scope == "all":
+            qs = BroadcastNotification.objects.filter(
+                Q(sender_id=user.pk) | Q(pk__in=visible_broadcasts(user).values("pk"))
             )
-            details.append(
-                {
-                    "receiver": user.id,
-                    "receiver_username": user.username,
-                    "message": message,
-                    "type": notification_type,
-                    "cause": cause,
-                }
-            )
+        qs = qs.annotate(is_read=Exists(_receipts(user).filter(is_read=True))).order_by("-created_at")
+    return qs.select_related("sender").prefetch_related("roles")
 
-        Notification.objects.bulk_create(notifications)
-    
-    return len(notifications), details
+
+def mark_broadcasts(user, broadcast_ids: List[int], **state) -> None:
+    """Set receipt ``state`` (is_read / is_dismissed) for ``user`` on the given broadcasts."""
+    from apps.models_app.notifications import BroadcastReceipt
+
+    if not broadcast_ids:
+        return
+    BroadcastReceipt.objects.bulk_create(
+        [BroadcastReceipt(broadcast_id=pk, user_id=user.pk, **state) for pk in broadcast_ids],
+        ignore_conflicts=True,
+    )
+    BroadcastReceipt.objects.filter(user_id=user.pk, broadcast_id__in=broadcast_ids).update(
+        updated_at=timezone.now(), **state
+    )
+
+
+def send_notification(
+    sender: User,
+    message: str,
+    receiver_roles: List[str],
+    notification_type: str = "general",
+    cause: str = "user_action",
+    tags: Optional[Dict[str, str]] = None,
+    region: Optional[str] = None,
+    crop_type: Optional[str] = None,
+    metadata: Optional[Dict] = None,
+) -> Tuple[int, Dict]:
+    """
+    Notify everyone matching ``receiver_roles``. Audiences of at least
+    NOTIFICATION_BROADCAST_THRESHOLD are stored once as a broadcast; below
+    that, one row per recipient is written, by a background job once the
+    surrounding transaction commits when the audience is above
+    NOTIFICATION_ASYNC_THRESHOLD. Returns ``(recipients, summary)``.
+    """
+    normalized_roles = [normalize_role(r) for r in receiver_roles]
+    audience = recipients_queryset(normalized_roles, region=region, crop_type=crop_type).count()
+    summary = {
+        "sent": audience,
+        "queued": False,
+        "broadcast": False,
+        "receiver_roles": normalized_roles,
+        "type": notification_type,
+        "cause": cause,
+    }
+    if not audience:
+        return 0, summary
+
+    kwargs = dict(
+        sender_id=getattr(sender, "pk", None),
+        message=message,
+        receiver_roles=normalized_roles,
+        notification_type=notification_type,
+        cause=cause,
+        tags=tags,
+        region=region,
+        crop_type=crop_type,
+        metadata=metadata,
+    )
+    broadcast_threshold = getattr(settings, "NOTIFICATION_BROADCAST_THRESHOLD", 1000)
+    if broadcast_threshold and audience >= broadcast_threshold:
+        create_broadcast(audience_size=audience, **kwargs)
+        summary["broadcast"] = True
+        return audience, summary
+
+    if audience > getattr(settings, "NOTIFICATION_ASYNC_THRESHOLD", 250):
+        from apps.api.tasks import fan_out_notification
+
+        transaction.on_commit(lambda: fan_out_notification.delay(**kwargs))
+        summary["queued"] = True
+        return audience, summary
+
+    with transaction.atomic():
+        summary["sent"] = deliver_notification(**kwargs)
+    return summary["sent"], summary
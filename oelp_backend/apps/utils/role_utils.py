@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.models_app.user import UserRole
+
+# Memo attribute set on a user instance; request.user is a fresh copy per request
+# (see apps.api.auth.resolve_token_user), so this lives for one request only.
+_MEMO_ATTR = "_role_names_memo"
+
+_END_USER_KEYS = {"endappuser", "enduser", "endusers"}
+
+
+def _cache_key(user_id) -> str:
+    return f"user-roles:{user_id}"
+
+
+def _role_cache_ttl() -> int:
+    return getattr(settings, "ROLE_CACHE_TTL", 30)
+
+
+def get_role_names(user) -> List[str]:
+    """
+    Role names of ``user``, in assignment order.
+
+    Loaded at most once per request (memoised on the user instance) and shared
+    across requests through the Django cache for ``ROLE_CACHE_TTL`` seconds.
+    """
+    if user is None or not getattr(user, "is_authenticated", False) or user.pk is None:
+        return []
+    memo = getattr(user, _MEMO_ATTR, None)
+    if memo is not None:
+        return list(memo)
+    names = cache.get(_cache_key(user.pk))
+    if names is None:
+        names = list(
+            UserRole.objects.filter(user_id=user.pk).order_by("id").values_list("role__name", flat=True)
+        )
+        cache.set(_cache_key(user.pk), names, _role_cache_ttl())
+    setattr(user, _MEMO_ATTR, tuple(names))
+    return list(names)
+
+
+def role_names_for_users(user_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Role names for many users at once: cache hits first, one query for the rest."""
+    ids = {uid for uid in user_ids if uid is not None}
+    if not ids:
+        return {}
+    cached = cache.get_many([_cache_key(uid) for uid in ids])
+    result: Dict[int, List[str]] = {}
+    missing = set()
+    for uid in ids:
+        names = cached.get(_cache_key(uid))
+        if names is None:
+            missing.add(uid)
+        else:
+            result[uid] = list(names)
+    if missing:
+        loaded: Dict[int, List[str]] = {uid: [] for uid in missing}
+        rows = (
+            UserRole.objects.filter(user_id__in=missing)
+            .order_by("id")
+            .values_list("user_id", "role__name")
+        )
+        for uid, name in rows:
+            loaded[uid].append(name)
+        cache.set_many({_cache_key(uid): names for uid, names in loaded.items()}, _role_cache_ttl())
+        result.update(loaded)
+    return result
+
+
+def primary_role(role_names: List[str]) -> Optional[str]:
+    """First non end-user role, else the first role (e.g. End-App-User), else None."""
+    if not role_names:
+        return None
+    for name in role_names:
+        if name and name.lower().replace("-", "").replace("_", "").replace(" ", "") not in _END_USER_KEYS:
+            return name
+    return role_names[0]
+
+
+def invalidate_role_names(user_or_id) -> None:
+    """Forget cached roles after a role is granted or revoked."""
+    if user_or_id is None:
+        return
+    user_id = getattr(user_or_id, "pk", user_or_id)
+    if hasattr(user_or_id, _MEMO_ATTR):
+        delattr(user_or_id, _MEMO_ATTR)
+    cache.delete(_cache_key(user_id))
+
+
+def invalidate_role_names_many(user_ids: Iterable[int]) -> None:
+    cache.delete_many([_cache_key(uid) for uid in set(user_ids) if uid is not None])
@@ -0,0 +1,102 @@
+"""
+Per-user unread notification counters kept in the Django cache.
+
+``unread_count`` is a single key read once the counter exists; a missing
+counter is rebuilt from the Notification and BroadcastReceipt tables.
+Writers keep counters in step: ``adjust_unread`` for a known change to one
+user, ``forget_unread`` when the new value is not known (it is rebuilt on
+the next read). A new broadcast reaches a whole audience, so it bumps a
+generation number instead, retiring every counter in one write. Both wait for
+the surrounding transaction to commit: cleared earlier, a concurrent read would
+rebuild the counter from the old rows and keep it for the whole TTL.
+NOTIFICATION_UNREAD_TTL bounds how long a counter can drift after a
+rolled-back write. Every change is also announced to the user's open
+event streams, which send the fresh count.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.utils.event_bus import publish
+
+GENERATION_KEY = "notif-unread-generation"
+
+
+def _generation() -> int:
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def _key(user_id, generation=None) -> str:
+    return f"notif-unread:{generation or _generation()}:{user_id}"
+
+
+def _ttl() -> int:
+    return getattr(settings, "NOTIFICATION_UNREAD_TTL", 3600)
+
+
+def count_unread(user) -> int:
+    """Unread direct notifications plus unread visible broadcasts, from the tables."""
+    from apps.models_app.notifications import Notification
+    from apps.utils.notification_utils import visible_broadcasts
+
+    direct = Notification.objects.filter(receiver_id=user.pk, is_read=False).count()
+    return direct + visible_broadcasts(user).filter(is_read=False).count()
+
+
+def unread_count(user) -> int:
+    key = _key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = count_unread(user)
+        cache.add(key, count, _ttl())
+    return count
+
+
+def adjust_unread(user_id, delta: int) -> None:
+    """Move a user's counter by ``delta``; a missing counter is left to be rebuilt."""
+    if user_id is None or not delta:
+        return
+    key = _key(user_id)
+    try:
+        if cache.incr(key, delta) < 0:
+            cache.delete(key)
+    except ValueError:
+        pass
+    publish([user_id], {"type": "unread"})
+
+
+def reset_unread(user_id) -> None:
+    """The user has nothing unread left (mark_all_read)."""
+    cache.set(_key(user_id), 0, _ttl())
+    publish([user_id], {"type": "unread"})
+
+
+def forget_unread(user_ids: Iterable[int]) -> None:
+    ids = [uid for uid in set(user_ids) if uid is not None]
+
+    def forget():
+        generation = _generation()
+        cache.delete_many([_key(uid, generation) for uid in ids])
+
+    transaction.on_commit(forget)
+    publish(ids, {"type": "unread"})
+
+
+def retire_all_unread() -> None:
+    """Every counter is rebuilt on its next read (a broadcast was sent)."""
+
+    def retire():
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.add(GENERATION_KEY, 2, None)
+
+    transaction.on_commit(retire)
@@ -1,7 +1,22 @@
 import os
+
+from asgiref.wsgi import WsgiToAsgi
 from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "oelp_backend.settings")
 
-application = get_asgi_application()
+django_asgi_app = get_asgi_application()
+django_wsgi_app = WsgiToAsgi(get_wsgi_application())
+
+# Only the server-sent event views are async. Everything else goes through the
+# WSGI handler: Django's ASGI handler buffers sync streaming responses whole,
+# which would defeat the streamed CSV export and invoice downloads.
+ASYNC_PATHS = (reverse("agribot-stream"), reverse("event-stream"))
+
 
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] not in ASYNC_PATHS:
+        return await django_wsgi_app(scope, receive, send)
+    return await django_asgi_app(scope, receive, send)
@@ -182,13 +182,102 @@ if not DEBUG:
 
 SPECTACULAR_SETTINGS = {"TITLE": "OELP API", "VERSION": "1.0.0"}
 
+# In-process cache of resolved auth tokens (see apps/api/auth.py)
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "2048"))
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+
 # ------------------- THIRD PARTY KEYS -------------------
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID", "")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "")
 
+# ------------------- CACHE -------------------
+# Shared cache when Redis is configured; per-process memory otherwise
+CACHE_URL = os.getenv("CACHE_URL") or os.getenv("REDIS_URL")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+
+# Seconds a user's role names stay cached (see apps/utils/role_utils.py)
+ROLE_CACHE_TTL = int(os.getenv("ROLE_CACHE_TTL", "30"))
+
+# The admin analytics snapshot is refreshed by Celery beat this often (seconds);
+# a read finding it older than ANALYTICS_SNAPSHOT_MAX_AGE queues an extra refresh
+ANALYTICS_SNAPSHOT_REFRESH_INTERVAL = int(os.getenv("ANALYTICS_SNAPSHOT_REFRESH_INTERVAL", "240"))
+ANALYTICS_SNAPSHOT_MAX_AGE = int(os.getenv("ANALYTICS_SNAPSHOT_MAX_AGE", "300"))
+# Seconds the per-scope field analytics summary stays cached
+ANALYTICS_SUMMARY_CACHE_TTL = int(os.getenv("ANALYTICS_SUMMARY_CACHE_TTL", "600"))
+# Upper bound (seconds) on how long an Agribot farm context snapshot is kept;
+# signals drop it sooner when the underlying data changes
+AGRIBOT_CONTEXT_CACHE_TTL = int(os.getenv("AGRIBOT_CONTEXT_CACHE_TTL", "900"))
+# Estimated tokens of farm data (fields, crop names) sent with a farm-specific question
+AGRIBOT_CONTEXT_TOKEN_BUDGET = int(os.getenv("AGRIBOT_CONTEXT_TOKEN_BUDGET", "1200"))
+# One Agribot reply may take at most AGRIBOT_DEADLINE seconds across all AI providers;
+# the next candidate model starts after AGRIBOT_HEDGE_DELAY seconds without an answer
+AGRIBOT_DEADLINE = float(os.getenv("AGRIBOT_DEADLINE", "25"))
+AGRIBOT_HEDGE_DELAY = float(os.getenv("AGRIBOT_HEDGE_DELAY", "3"))
+# Seconds a model that answered 404/410 or a quota error is skipped
+AGRIBOT_BREAKER_COOLDOWN = int(os.getenv("AGRIBOT_BREAKER_COOLDOWN", "600"))
+# Worker threads (and pooled connections per provider) for AI calls
+AGRIBOT_MAX_CONCURRENCY = int(os.getenv("AGRIBOT_MAX_CONCURRENCY", "8"))
+# Per-process LRU cache of answers to general (not farm-specific) Agribot questions
+AGRIBOT_ANSWER_CACHE_SIZE = int(os.getenv("AGRIBOT_ANSWER_CACHE_SIZE", "1024"))
+AGRIBOT_ANSWER_CACHE_TTL = int(os.getenv("AGRIBOT_ANSWER_CACHE_TTL", "3600"))
+
 # ------------------- CELERY -------------------
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
+# Without an explicit broker, tasks run in-process (local dev, tests)
+CELERY_TASK_ALWAYS_EAGER = os.getenv(
+    "CELERY_TASK_ALWAYS_EAGER", "false" if os.getenv("CELERY_BROKER_URL") else "true"
+).lower() == "true"
+CELERY_TASK_IGNORE_RESULT = True
+# Periodic jobs, run by the worker's embedded beat (see render.yaml)
+CELERY_BEAT_SCHEDULE = {
+    "refresh-admin-analytics": {
+        "task": "analytics.refresh_snapshot",
+        "schedule": ANALYTICS_SNAPSHOT_REFRESH_INTERVAL,
+    },
+}
+
+# Rendered report exports are reused for identical requests for this long (seconds)
+REPORT_EXPORT_TTL = int(os.getenv("REPORT_EXPORT_TTL", "3600"))
+# Notification rows inserted per batch, and the audience size above which a
+# role notification is written by a Celery job instead of the request. Keep it
+# below NOTIFICATION_BROADCAST_THRESHOLD: larger audiences become broadcasts.
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "1000"))
+NOTIFICATION_ASYNC_THRESHOLD = int(os.getenv("NOTIFICATION_ASYNC_THRESHOLD", "250"))
+# Audiences at least this large get one BroadcastNotification read by every
+# recipient instead of a row each (0 always writes rows)
+NOTIFICATION_BROADCAST_THRESHOLD = int(os.getenv("NOTIFICATION_BROADCAST_THRESHOLD", "1000"))
+# Cached per-user unread counters are rebuilt from the tables at least this often (seconds)
+NOTIFICATION_UNREAD_TTL = int(os.getenv("NOTIFICATION_UNREAD_TTL", "3600"))
+
+# Live event stream (apps/api/events.py). The in-process bus only reaches
+# streams in the same process; use apps.utils.event_bus.RedisBus when running
+# more than one web process or publishing from Celery workers.
+EVENT_BUS_BACKEND = os.getenv("EVENT_BUS_BACKEND", "apps.utils.event_bus.InProcessBus")
+EVENT_BUS_URL = os.getenv("EVENT_BUS_URL") or CACHE_URL or "redis://localhost:6379/0"
+# Seconds between keep-alive comments, and before a stream is ended for the client to reconnect
+EVENT_STREAM_HEARTBEAT = int(os.getenv("EVENT_STREAM_HEARTBEAT", "20"))
+EVENT_STREAM_MAX_AGE = int(os.getenv("EVENT_STREAM_MAX_AGE", "600"))
+# Reconnect delay advertised to EventSource (ms), and events buffered per slow client
+EVENT_STREAM_RETRY_MS = int(os.getenv("EVENT_STREAM_RETRY_MS", "3000"))
+EVENT_STREAM_QUEUE_SIZE = int(os.getenv("EVENT_STREAM_QUEUE_SIZE", "100"))
+
+# Allowed slowdown over apps/api/endpoint_baseline.json (manage.py benchmark_endpoints):
+# an endpoint fails above baseline * FACTOR + SLACK. Query counts must not exceed the baseline.
+ENDPOINT_BENCHMARK_TIME_FACTOR = float(os.getenv("ENDPOINT_BENCHMARK_TIME_FACTOR", "3"))
+ENDPOINT_BENCHMARK_TIME_SLACK_MS = float(os.getenv("ENDPOINT_BENCHMARK_TIME_SLACK_MS", "25"))
+ENDPOINT_BENCHMARK_MEMORY_FACTOR = float(os.getenv("ENDPOINT_BENCHMARK_MEMORY_FACTOR", "1.5"))
+ENDPOINT_BENCHMARK_MEMORY_SLACK_KB = float(os.getenv("ENDPOINT_BENCHMARK_MEMORY_SLACK_KB", "256"))
 
 # ------------------- PASSWORDS -------------------
 PASSWORD_HASHERS = [